@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Performance benchmarks for llmos-cli. Run with `python -m benchmarks.run_benchmarks --help`.
@@ -0,0 +1,106 @@
+# benchmarks/bench_startup.py
+# Startup cost of the CLI: wall time and `python -X importtime` breakdown of `--help`, `diff --help` and a tiny-repo run.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+from .run_benchmarks import _git_commit
+from .synth_repo import generate_synthetic_repo
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that only some runs need; reported as imported/not imported per scenario.
+DEFERRED_MODULES = ("yaml", "toml", "sqlite3", "tree_sitter", "tree_sitter_languages", "concurrent.futures.process",
+                    "importlib.util", "tempfile", "src.output")
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """Module name -> (self us, cumulative us) from `-X importtime` output (first import only)."""
+    modules: Dict[str, Tuple[int, int]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.setdefault(name.strip(), (int(self_us), int(cumulative_us)))
+    return modules
+
+def run_scenario(command: List[str], repeat: int) -> Dict[str, Any]:
+    """Runs `python -X importtime -m src.cli <command>` `repeat` times; keeps the fastest run's breakdown."""
+    runs = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-X", "importtime", "-m", "src.cli", *command],
+                                   cwd=PROJECT_ROOT, capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        if completed.returncode != 0:
+            raise RuntimeError(f"{' '.join(command)} exited with {completed.returncode}:\n{completed.stdout}")
+        runs.append((elapsed, parse_importtime(completed.stderr)))
+    best_seconds, modules = min(runs, key=lambda run: run[0])
+    top = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)[:10]
+    return {
+        "wall_seconds_min": round(best_seconds, 4),
+        "wall_seconds_median": round(statistics.median(run[0] for run in runs), 4),
+        "modules_imported": len(modules),
+        "import_seconds": round(sum(self_us for self_us, _ in modules.values()) / 1e6, 4),
+        "top_self_us": {name: self_us for name, (self_us, _) in top},
+        "deferred_imported": {name: name in modules for name in DEFERRED_MODULES},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark llmos-cli startup (imports, grammar loading) in fresh interpreters.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--files", type=int, default=3, help="Synthetic file count for the tiny-repo run.")
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per scenario; the fastest is reported.")
+    parser.add_argument("--output-json", default=None, help="Optional path for the JSON results.")
+    parser.add_argument("--compare", default=None, metavar="BASELINE_JSON",
+                        help="Print per-scenario deltas against an earlier results file.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="llmos_startup_bench_") as tmp:
+        tmp_path = Path(tmp)
+        repo_root = tmp_path / "repo"
+        generate_synthetic_repo(repo_root, files=args.files, packages=1)
+        scenarios = {
+            "help": ["--help"],
+            "diff_help": ["diff", "--help"],
+            "tiny_repo": ["--repo-path", str(repo_root), "-o", str(tmp_path / "ir.yaml")],
+        }
+        results = {name: run_scenario(command, args.repeat) for name, command in scenarios.items()}
+
+    report = {"commit": _git_commit(), "python": sys.version.split()[0], "cpu_count": os.cpu_count(),
+              "repeat": args.repeat, "scenarios": results}
+
+    for name, stats in results.items():
+        print(f"{name:<10} wall {stats['wall_seconds_min'] * 1000:>8.1f} ms (median {stats['wall_seconds_median'] * 1000:.1f} ms)"
+              f"  imports {stats['import_seconds'] * 1000:>7.1f} ms across {stats['modules_imported']} modules")
+        print("  slowest (self):  " + ", ".join(f"{module} {us / 1000:.1f} ms" for module, us in stats["top_self_us"].items()))
+        print("  deferred loaded: " + (", ".join(module for module, loaded in stats["deferred_imported"].items() if loaded) or "none"))
+
+    if args.output_json:
+        with open(args.output_json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output_json}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\nComparison against {args.compare} (commit {baseline.get('commit')}):")
+        print(f"{'scenario':<10} {'baseline ms':>12} {'current ms':>12} {'change':>9}")
+        for name, stats in results.items():
+            old = baseline.get("scenarios", {}).get(name, {}).get("wall_seconds_min")
+            if old is None:
+                continue
+            new = stats["wall_seconds_min"]
+            print(f"{name:<10} {old * 1000:>12.1f} {new * 1000:>12.1f} {(new - old) / old * 100:>+8.1f}%")
+
+if __name__ == "__main__":
+    main()
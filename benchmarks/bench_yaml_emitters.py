@@ -0,0 +1,84 @@
+# benchmarks/bench_yaml_emitters.py
+# Compares the pure-Python YAML dumper with the libyaml + literal-block dumper on a large IR.
+
+import argparse
+import contextlib
+import io
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from src import cli
+from src.ast_utils import initialize_parsers
+from src.output import YAML_EMITTERS, YAML_LIBYAML_AVAILABLE, save_to_yaml
+from src.walker import walk_source_files
+
+from .synth_repo import generate_synthetic_repo
+
+def build_ir(repo_root: Path) -> dict:
+    cli.repo_ir = {"schema_version": "bench", "project_name": repo_root.name, "language_primary": "python",
+                   "languages_present": set(), "metadata": {}, "components": {}}
+    for file_path in walk_source_files(repo_root):
+        file_record = cli.extract_file(file_path, repo_root, repo_root.name)
+        if file_record:
+            cli.merge_file_record(file_record)
+    repo_ir = cli.repo_ir
+    repo_ir["components"] = list(repo_ir["components"].values())
+    return repo_ir
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark YAML emitters used by save_to_yaml.")
+    parser.add_argument("--repo-path", default=None, help="Extract this tree instead of a synthetic one.")
+    parser.add_argument("--files", type=int, default=150, help="Synthetic file count (default: 150).")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per emitter; the fastest is kept (default: 1).")
+    parser.add_argument("--output-json", default=None, help="Optional path for the JSON results.")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        initialize_parsers()
+
+    with tempfile.TemporaryDirectory(prefix="llmos_yaml_bench_") as tmp:
+        tmp_path = Path(tmp)
+        if args.repo_path:
+            repo_root = Path(args.repo_path).resolve()
+        else:
+            repo_root = tmp_path / "repo"
+            generate_synthetic_repo(repo_root, files=args.files)
+        with contextlib.redirect_stdout(io.StringIO()):
+            repo_ir = build_ir(repo_root)
+
+        results = {"libyaml_available": YAML_LIBYAML_AVAILABLE, "emitters": {}}
+        loaded = {}
+        for emitter in YAML_EMITTERS:
+            output_path = tmp_path / f"ir_{emitter}.yaml"
+            best = None
+            for _ in range(max(1, args.repeat)):
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    save_to_yaml(repo_ir, output_path, emitter)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            size = output_path.stat().st_size
+            results["emitters"][emitter] = {"seconds": round(best, 4), "bytes": size,
+                                            "mb_per_s": round(size / 1e6 / best, 3)}
+            loader = yaml.CSafeLoader if YAML_LIBYAML_AVAILABLE else yaml.SafeLoader
+            with open(output_path, 'r', encoding='utf-8') as f:
+                loaded[emitter] = yaml.load(f, Loader=loader)
+
+    results["round_trip_equal"] = loaded["fast"] == loaded["python"]
+    python_s, fast_s = results["emitters"]["python"]["seconds"], results["emitters"]["fast"]["seconds"]
+    results["speedup"] = round(python_s / fast_s, 2) if fast_s else None
+
+    for emitter, stats in results["emitters"].items():
+        print(f"{emitter:<8} {stats['seconds']:>9.3f}s  {stats['bytes'] / 1e6:>8.2f} MB  {stats['mb_per_s']:>8.3f} MB/s")
+    print(f"Speedup: {results['speedup']}x (libyaml: {YAML_LIBYAML_AVAILABLE}); "
+          f"documents load identically: {results['round_trip_equal']}")
+    if args.output_json:
+        with open(args.output_json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# benchmarks/run_benchmarks.py
+# Times each pipeline stage on a synthetic (or existing) tree and records results as JSON.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from src import cli
+from src.ast_utils import initialize_parsers, parse_code
+from src.config import LANG_MAP, SCHEMA_VERSION
+from src.extract_python import PY_FILE_ENGINES
+from src.output import save_to_yaml, save_to_llm_context_file
+from src.walker import walk_source_files, new_walk_stats
+
+from .synth_repo import DEFAULT_SHAPE, generate_synthetic_repo
+
+STAGES = ("walk", "read", "parse", "extract", "serialize_yaml", "write_llm_context")
+
+class StageTimer:
+    """Times a stage and, when enabled, its tracemalloc peak."""
+
+    def __init__(self, trace_memory: bool):
+        self.trace_memory = trace_memory
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = None
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            self.results[name] = {"seconds": elapsed, "peak_traced_bytes": peak}
+
+def _max_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError: # Windows
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent, check=True).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_pipeline(repo_root: Path, target_name: str, out_dir: Path, engine: str, trace_memory: bool) -> Dict[str, Any]:
+    """Runs walk -> read -> parse -> extract -> YAML -> LLM context, one stage at a time."""
+    timer = StageTimer(trace_memory)
+    walk_stats = new_walk_stats()
+
+    with timer.stage("walk"):
+        file_paths = list(walk_source_files(repo_root, walk_stats))
+
+    with timer.stage("read"):
+        contents = [path.read_bytes() for path in file_paths]
+
+    with timer.stage("parse"):
+        root_nodes = [parse_code(content, LANG_MAP[path.suffix.lower()]) for path, content in zip(file_paths, contents)]
+
+    cli.repo_ir = {
+        "schema_version": SCHEMA_VERSION, "project_name": target_name, "language_primary": "python",
+        "languages_present": set(), "metadata": {}, "components": {},
+    }
+    extract_engine = PY_FILE_ENGINES[engine]
+    with timer.stage("extract"):
+        for path, content, root_node in zip(file_paths, contents, root_nodes):
+            if root_node is None:
+                continue
+            rel_path_str = str(path.relative_to(repo_root))
+            component_id = cli.find_component_id_for_lib(rel_path_str, target_name)
+            is_test_file = "test" in path.name.lower() or any(p.lower() in {"test", "tests"} for p in path.parts)
+            structs, funcs, tests = extract_engine(root_node, path, repo_root, content, component_id, is_test_file)
+            cli.merge_file_record({"component_id": component_id, "language": "python",
+                                   "data_structures": structs, "functions": funcs, "test_specifications": tests})
+    repo_ir = cli.repo_ir
+    repo_ir["languages_present"] = sorted(repo_ir["languages_present"])
+    repo_ir["components"] = list(repo_ir["components"].values())
+
+    yaml_path = out_dir / "bench_ir.yaml"
+    llm_path = out_dir / "bench_context.txt"
+    with contextlib.redirect_stdout(io.StringIO()): # The writers print progress lines
+        with timer.stage("serialize_yaml"):
+            save_to_yaml(repo_ir, yaml_path)
+        with timer.stage("write_llm_context"):
+            save_to_llm_context_file(repo_ir, llm_path)
+
+    source_bytes = sum(len(content) for content in contents)
+    symbols = sum(len(c["functions"]) + len(c["data_structures"]) + len(c["test_specifications"])
+                  for c in repo_ir["components"])
+    stages = {}
+    for name in STAGES:
+        seconds = timer.results[name]["seconds"]
+        stages[name] = {
+            "seconds": round(seconds, 6),
+            "files_per_s": round(len(file_paths) / seconds, 1) if seconds else None,
+            "mb_per_s": round(source_bytes / 1e6 / seconds, 3) if seconds else None,
+            "peak_traced_bytes": timer.results[name]["peak_traced_bytes"],
+        }
+    return {
+        "files": len(file_paths),
+        "source_bytes": source_bytes,
+        "symbols": symbols,
+        "walk_stats": walk_stats,
+        "yaml_bytes": yaml_path.stat().st_size,
+        "llm_context_bytes": llm_path.stat().st_size,
+        "total_seconds": round(sum(stage["seconds"] for stage in stages.values()), 6),
+        "stages": stages,
+    }
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    lines = [f"{'stage':<20} {'baseline s':>12} {'current s':>12} {'change':>9}"]
+    for name in STAGES + ("total",):
+        if name == "total":
+            old, new = baseline["results"]["total_seconds"], current["results"]["total_seconds"]
+        else:
+            old_stage = baseline["results"]["stages"].get(name)
+            new_stage = current["results"]["stages"].get(name)
+            if not old_stage or not new_stage:
+                continue
+            old, new = old_stage["seconds"], new_stage["seconds"]
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        lines.append(f"{name:<20} {old:>12.4f} {new:>12.4f} {change:>9}")
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark llmos-cli pipeline stages on a synthetic Python tree.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--repo-path", default=None,
+                        help="Benchmark an existing tree instead of generating a synthetic one.")
+    for key, default in DEFAULT_SHAPE.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=type(default), default=default,
+                            help="Synthetic repository shape.")
+    parser.add_argument("--engine", choices=sorted(PY_FILE_ENGINES), default="walk", help="Python extraction engine.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the fastest total is reported.")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Record per-stage tracemalloc peaks (slows every stage down).")
+    parser.add_argument("--output-json", default="bench_results.json", help="Where to write the results.")
+    parser.add_argument("--compare", default=None, metavar="BASELINE_JSON",
+                        help="Print per-stage deltas against an earlier results file.")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        initialize_parsers()
+
+    with tempfile.TemporaryDirectory(prefix="llmos_bench_") as tmp:
+        tmp_path = Path(tmp)
+        shape: Dict[str, Any] = {}
+        if args.repo_path:
+            repo_root = Path(args.repo_path).resolve()
+        else:
+            repo_root = tmp_path / "repo"
+            shape = generate_synthetic_repo(repo_root, **{key: getattr(args, key) for key in DEFAULT_SHAPE})
+        out_dir = tmp_path / "out"
+        out_dir.mkdir()
+
+        runs = []
+        for run_index in range(max(1, args.repeat)):
+            result = run_pipeline(repo_root, repo_root.name, out_dir, args.engine, args.trace_memory)
+            runs.append(result)
+            print(f"Run {run_index + 1}: {result['total_seconds']:.3f}s for {result['files']} files")
+        best = min(runs, key=lambda run: run["total_seconds"])
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "engine": args.engine,
+        "repo_path": args.repo_path,
+        "shape": shape,
+        "repeat": args.repeat,
+        "peak_rss_bytes": _max_rss_bytes(),
+        "results": best,
+    }
+
+    print(f"\n{'stage':<20} {'seconds':>10} {'files/s':>12} {'MB/s':>10}")
+    for name, stage in best["stages"].items():
+        print(f"{name:<20} {stage['seconds']:>10.4f} {stage['files_per_s'] or 0:>12.1f} {stage['mb_per_s'] or 0:>10.3f}")
+    print(f"{'total':<20} {best['total_seconds']:>10.4f}")
+    if report["peak_rss_bytes"]:
+        print(f"Peak RSS: {report['peak_rss_bytes'] / 1e6:.1f} MB")
+
+    output_path = Path(args.output_json)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output_path}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\nComparison against {args.compare} (commit {baseline.get('commit')}):")
+        for line in compare_results(baseline, report):
+            print(line)
+
+if __name__ == "__main__":
+    main()
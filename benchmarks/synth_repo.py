@@ -0,0 +1,120 @@
+# benchmarks/synth_repo.py
+# Generates synthetic Python source trees of configurable shape for benchmarking.
+
+import argparse
+import random
+from pathlib import Path
+from typing import Dict, Any
+
+DEFAULT_SHAPE: Dict[str, Any] = {
+    "files": 100,
+    "packages": 10,
+    "classes_per_file": 4,
+    "methods_per_class": 8,
+    "functions_per_file": 6,
+    "docstring_lines": 6,
+    "nesting_depth": 2,
+    "test_file_ratio": 0.1,
+    "seed": 1234,
+}
+
+_WORDS = ("value", "index", "buffer", "config", "result", "node", "token", "state",
+          "request", "handler", "item", "count", "cache", "parser", "record", "stream")
+
+def _docstring(rng: random.Random, lines: int, indent: str) -> str:
+    if lines <= 0:
+        return ""
+    body = [" ".join(rng.choice(_WORDS) for _ in range(10)) for _ in range(lines)]
+    text = f"\n{indent}".join(body)
+    return f'{indent}"""{text}\n{indent}"""\n'
+
+def _nested_block(rng: random.Random, depth: int, indent: str) -> str:
+    """Closures, nested classes and TYPE_CHECKING/try blocks down to `depth` levels."""
+    if depth <= 0:
+        return f"{indent}return {rng.choice(_WORDS)}_{rng.randint(0, 99)}\n"
+    kind = depth % 3
+    inner_indent = indent + "    "
+    if kind == 0:
+        head = f"{indent}class _Inner{depth}:\n{inner_indent}def run(self):\n"
+        return head + _nested_block(rng, depth - 1, inner_indent + "    ") + f"{indent}return _Inner{depth}().run()\n"
+    if kind == 1:
+        head = f"{indent}def _closure_{depth}({rng.choice(_WORDS)}=None):\n"
+        return head + _nested_block(rng, depth - 1, inner_indent) + f"{indent}return _closure_{depth}()\n"
+    head = f"{indent}try:\n{inner_indent}{rng.choice(_WORDS)} = len([])\n{indent}except Exception:\n{inner_indent}pass\n"
+    return head + _nested_block(rng, depth - 1, indent)
+
+def _function(rng: random.Random, name: str, shape: Dict[str, Any], indent: str, is_method: bool) -> str:
+    params = ["self"] if is_method else []
+    has_default = False
+    for i in range(rng.randint(1, 4)):
+        word = rng.choice(_WORDS)
+        choices = (f"{word}{i}: str = 'x'", f"{word}{i}=None")
+        if not has_default:
+            choices += (f"{word}{i}", f"{word}{i}: int")
+        param = rng.choice(choices)
+        has_default = has_default or "=" in param
+        params.append(param)
+    body_indent = indent + "    "
+    source = f"{indent}def {name}({', '.join(params)}) -> int:\n"
+    source += _docstring(rng, shape["docstring_lines"], body_indent)
+    for i in range(rng.randint(2, 8)):
+        source += f"{body_indent}{rng.choice(_WORDS)}_{i} = {rng.randint(0, 1000)} + len(str({params[-1].split(':')[0].split('=')[0]}))\n"
+    source += _nested_block(rng, shape["nesting_depth"], body_indent)
+    return source + "\n"
+
+def _module_source(rng: random.Random, module_index: int, shape: Dict[str, Any], is_test: bool) -> str:
+    parts = [f'"""Synthetic module {module_index}."""\n', "import os\nfrom typing import TYPE_CHECKING\n\n",
+             "if TYPE_CHECKING:\n    from collections import OrderedDict\n\n"]
+    if is_test:
+        for i in range(shape["functions_per_file"]):
+            parts.append(f"def test_case_{i}():\n    assert helper_{i}(1) == {i}\n    assert Model{i}().run() is not None\n\n")
+        return "".join(parts)
+    for c in range(shape["classes_per_file"]):
+        parts.append(f"class Model{module_index}_{c}(object):\n")
+        parts.append(_docstring(rng, shape["docstring_lines"], "    "))
+        parts.append(f"    kind = 'model_{c}'\n    version = {c}\n\n")
+        for m in range(shape["methods_per_class"]):
+            parts.append(_function(rng, f"method_{m}", shape, "    ", is_method=True))
+    for f in range(shape["functions_per_file"]):
+        parts.append(_function(rng, f"helper_{f}", shape, "", is_method=False))
+    return "".join(parts)
+
+def generate_synthetic_repo(root: Path, **overrides: Any) -> Dict[str, Any]:
+    """Writes a synthetic package tree under `root` and returns the shape used plus byte totals."""
+    shape = dict(DEFAULT_SHAPE)
+    shape.update({key: value for key, value in overrides.items() if value is not None})
+    rng = random.Random(shape["seed"])
+    root = Path(root)
+    total_bytes = 0
+    packages = max(1, shape["packages"])
+    for package_index in range(packages):
+        package_dir = root / "synthpkg" / f"pkg_{package_index}"
+        package_dir.mkdir(parents=True, exist_ok=True)
+        (package_dir / "__init__.py").write_text(f'"""Package {package_index}."""\n', encoding="utf-8")
+    tests_dir = root / "tests"
+    tests_dir.mkdir(parents=True, exist_ok=True)
+    for module_index in range(shape["files"]):
+        is_test = rng.random() < shape["test_file_ratio"]
+        if is_test:
+            module_path = tests_dir / f"test_module_{module_index}.py"
+        else:
+            module_path = root / "synthpkg" / f"pkg_{module_index % packages}" / f"module_{module_index}.py"
+        source = _module_source(rng, module_index, shape, is_test)
+        module_path.write_text(source, encoding="utf-8")
+        total_bytes += len(source.encode("utf-8"))
+    shape["total_source_bytes"] = total_bytes
+    return shape
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Python repository for benchmarking.")
+    parser.add_argument("output_dir", help="Directory to write the synthetic tree into.")
+    for key, default in DEFAULT_SHAPE.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=type(default), default=None,
+                            help=f"(default: {default})")
+    args = parser.parse_args()
+    overrides = {key: getattr(args, key) for key in DEFAULT_SHAPE}
+    shape = generate_synthetic_repo(Path(args.output_dir), **overrides)
+    print(f"Generated {shape['files']} files ({shape['total_source_bytes'] / 1e6:.2f} MB) in {args.output_dir}")
+
+if __name__ == "__main__":
+    main()
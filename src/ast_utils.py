@@ -1,21 +1,33 @@
 # src/ast_utils.py
 # Tree-sitter setup and generic AST helper functions
 
+from __future__ import annotations
+
 import sys
-from tree_sitter import Parser, Node
-from typing import Dict, Any, Optional, List, Tuple
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Tuple
 import textwrap
 
 # Import config loading function, but LANG_CONFIG itself will be populated here
-from .config import LANG_CONFIG, load_language_configs
+from .config import LANG_CONFIG, load_language_configs, load_language_config
+
+if TYPE_CHECKING: # tree_sitter is imported when the first parser is created
+    from tree_sitter import Parser, Node, Tree
 
 # --- Global Variables ---
+# Parsers and queries are created per language on first use (parse_tree/run_query), so a run
+# only loads the grammars and compiles the queries it actually needs.
 parsers: Dict[str, Parser] = {}
-_queries_compiled: Dict[str, Dict[str, Any]] = {} # Cache compiled queries
+_queries_compiled: Dict[str, Dict[str, Any]] = {} # Cache compiled queries (None: failed to compile)
+_failed_parsers = set()
+SOURCE_MODES = ("inline", "spans")
+source_mode = "inline" # "spans": records carry byte spans instead of source text (see source_fields)
 
 # --- Initialization ---
 def initialize_parsers():
-    """Load language configs and initialize parsers. Call this once at startup."""
+    """Eagerly load every language config and parser (tools that want all of them up front).
+
+    Not needed before parsing: `parse_tree` and `run_query` initialize a language on first use.
+    """
     if not LANG_CONFIG: # Ensure configs are loaded if not already
         load_language_configs()
     
@@ -27,41 +39,57 @@ def initialize_parsers():
         _initialize_parser(lang_name)
 
 def _initialize_parser(lang_name: str):
-    """Initialize parser for a single language if not already done."""
-    if lang_name not in parsers:
-        if lang_name not in LANG_CONFIG or "language" not in LANG_CONFIG[lang_name]:
-            print(f"Warning: Language object for '{lang_name}' not found in LANG_CONFIG. Skipping parser initialization.")
+    """Initialize parser for a single language if not already done (failures are reported once)."""
+    if lang_name not in parsers and lang_name not in _failed_parsers:
+        if not load_language_config(lang_name):
+            print(f"Warning: Language object for '{lang_name}' not available. Skipping parser initialization.")
+            _failed_parsers.add(lang_name)
             return None
         try:
-            # print(f"Initializing parser for: {lang_name}")
+            from tree_sitter import Parser
             parser = Parser()
             parser.set_language(LANG_CONFIG[lang_name]["language"])
             parsers[lang_name] = parser
-            
-            # Pre-compile queries
             _queries_compiled[lang_name] = {}
-            for query_name, query_string in LANG_CONFIG[lang_name].get("queries", {}).items():
-                try:
-                    _queries_compiled[lang_name][query_name] = LANG_CONFIG[lang_name]["language"].query(query_string)
-                except Exception as e:
-                    print(f"Warning: Failed to compile query '{query_name}' for {lang_name}: {e}")
         except Exception as e:
             print(f"ERROR initializing parser for {lang_name}: {e}")
+            _failed_parsers.add(lang_name)
             return None
     return parsers.get(lang_name)
 
+def _get_query(lang: str, query_key: str):
+    """The compiled query, compiled on first use."""
+    lang_queries = _queries_compiled.get(lang)
+    if lang_queries is None:
+        return None # No parser for this language, so there is nothing to query either
+    if query_key not in lang_queries:
+        query_string = LANG_CONFIG[lang].get("queries", {}).get(query_key)
+        query = None
+        if query_string is not None:
+            try:
+                query = LANG_CONFIG[lang]["language"].query(query_string)
+            except Exception as e:
+                print(f"Warning: Failed to compile query '{query_key}' for {lang}: {e}")
+        lang_queries[query_key] = query
+    return lang_queries[query_key]
+
 # --- AST Parsing ---
 def parse_code(content_bytes: bytes, lang: str) -> Optional[Node]:
     """Parse code bytes using the appropriate tree-sitter parser."""
+    tree = parse_tree(content_bytes, lang)
+    return tree.root_node if tree else None
+
+def parse_tree(content_bytes: bytes, lang: str, old_tree: Optional[Tree] = None) -> Optional[Tree]:
+    """Parse code bytes into a Tree. Pass the previous tree (after `Tree.edit`) to reparse incrementally."""
     parser = parsers.get(lang)
     if not parser:
-        # Attempt to initialize on-the-fly if not already
+        # First file of this language in this process
         parser = _initialize_parser(lang)
         if not parser:
-            print(f"Warning: Parser for language '{lang}' not available or failed to initialize.")
             return None
-    tree = parser.parse(content_bytes)
-    return tree.root_node
+    if old_tree is not None:
+        return parser.parse(content_bytes, old_tree)
+    return parser.parse(content_bytes)
 
 # --- AST Traversal & Helpers ---
 def get_node_text(node: Optional[Node], content_bytes: bytes) -> Optional[str]:
@@ -80,10 +108,23 @@ def get_node_text(node: Optional[Node], content_bytes: bytes) -> Optional[str]:
             return "" # Return empty string for invalid ranges or empty nodes
     return None
 
+def set_source_mode(mode: str):
+    """Selects how extractors store symbol source: inline text or byte spans into the file."""
+    global source_mode
+    if mode not in SOURCE_MODES:
+        raise ValueError(f"Unknown source mode '{mode}', expected one of {SOURCE_MODES}")
+    source_mode = mode
+
+def source_fields(node: Node, content_bytes: bytes) -> Dict[str, Any]:
+    """The source entry for an IR record: {'source_code': text}, or in spans mode
+    {'source_span': {'start_byte', 'end_byte'}} into the record's source_file."""
+    if source_mode == "spans":
+        return {"source_span": {"start_byte": node.start_byte, "end_byte": node.end_byte}}
+    return {"source_code": get_node_text(node, content_bytes)}
+
 def run_query(query_key: str, lang: str, node: Node) -> List[Tuple[Node, str]]:
-    """Run a pre-compiled tree-sitter query. Returns list of (node, capture_name) tuples."""
-    lang_queries = _queries_compiled.get(lang, {})
-    query = lang_queries.get(query_key)
+    """Run a tree-sitter query (compiled on first use). Returns list of (node, capture_name) tuples."""
+    query = _get_query(lang, query_key)
     if query and node:
         try:
             return query.captures(node)
@@ -91,6 +132,16 @@ def run_query(query_key: str, lang: str, node: Node) -> List[Tuple[Node, str]]:
             print(f"Error running query '{query_key}' (lang: {lang}) on node type {node.type}: {e}")
     return []
 
+def run_query_matches(query_key: str, lang: str, node: Node) -> List[Tuple[int, Dict[str, Any]]]:
+    """Run a tree-sitter query (compiled on first use). Returns list of (pattern_index, {capture_name: node}) matches."""
+    query = _get_query(lang, query_key)
+    if query and node:
+        try:
+            return query.matches(node)
+        except Exception as e:
+            print(f"Error running query '{query_key}' (lang: {lang}) on node type {node.type}: {e}")
+    return []
+
 def get_lang_config_val(lang: str, key: str, default: Any = None) -> Any:
     """Get language specific config value (e.g., node types dict)."""
     if lang not in LANG_CONFIG:
@@ -110,7 +161,8 @@ def find_child_by_field_name(node: Optional[Node], field_name: str) -> Optional[
     if not node: return None
     return node.child_by_field_name(field_name)
 
-def get_docstring_from_python_node(body_node: Optional[Node], content_bytes: bytes) -> Optional[str]:
+def find_python_docstring_node(body_node: Optional[Node]) -> Optional[Node]:
+    """Returns the 'string' node of a block's leading docstring statement, if any."""
     if not body_node or not is_node_type(body_node, "python", "block") or not body_node.named_children:
         return None
 
@@ -119,43 +171,51 @@ def get_docstring_from_python_node(body_node: Optional[Node], content_bytes: byt
     if is_node_type(first_statement, "python", "expression_statement") and \
        first_statement.named_children and \
        is_node_type(first_statement.named_children[0], "python", "string"): # Check the child of expression_statement
+        return first_statement.named_children[0] # This is the 'string' node
+    return None
+
+def get_python_docstring_text(string_node_container: Optional[Node], content_bytes: bytes) -> Optional[str]:
+    """Cleans the text of a docstring 'string' node (see `find_python_docstring_node`)."""
+    if not string_node_container:
+        return None
         
-        string_node_container = first_statement.named_children[0] # This is the 'string' node
-        
-        # The 'string' node can have multiple children if it's a concatenated string
-        # e.g., (string (string_content) (string_content)) for "abc" "def"
-        # or children like '"""', (string_content), '"""' for triple-quoted.
-        docstring_parts = []
-        for child_string_node in string_node_container.children:
-            # We want the actual content, not the quote characters themselves.
-            # Tree-sitter python grammar typically has 'string_content' or 'escape_sequence'
-            # as children of 'string' for the actual text.
-            # The exact child type name for content might vary slightly based on tree-sitter-python version or string type.
-            # A more robust way is to check if it's NOT a quote character.
-            node_type_str = child_string_node.type
-            if node_type_str not in ('"""', "'''", '"', "'", 'r"', "r'", 'u"', "u'", 'f"', "f'"): # Skip quotes and prefixes
-                text_part = get_node_text(child_string_node, content_bytes)
-                if text_part is not None:
-                    docstring_parts.append(text_part)
-        
-        raw_docstring = "".join(docstring_parts)
+    # The 'string' node can have multiple children if it's a concatenated string
+    # e.g., (string (string_content) (string_content)) for "abc" "def"
+    # or children like '"""', (string_content), '"""' for triple-quoted.
+    docstring_parts = []
+    for child_string_node in string_node_container.children:
+        # We want the actual content, not the quote characters themselves.
+        # Tree-sitter python grammar typically has 'string_content' or 'escape_sequence'
+        # as children of 'string' for the actual text.
+        # The exact child type name for content might vary slightly based on tree-sitter-python version or string type.
+        # A more robust way is to check if it's NOT a quote character.
+        node_type_str = child_string_node.type
+        if node_type_str not in ('"""', "'''", '"', "'", 'r"', "r'", 'u"', "u'", 'f"', "f'"): # Skip quotes and prefixes
+            text_part = get_node_text(child_string_node, content_bytes)
+            if text_part is not None:
+                docstring_parts.append(text_part)
+    
+    raw_docstring = "".join(docstring_parts)
+    
+    if raw_docstring:
+        # Clean common quotes if they were accidentally included by get_node_text
+        # if (raw_docstring.startswith('"""') and raw_docstring.endswith('"""')) or \
+        #    (raw_docstring.startswith("'''") and raw_docstring.endswith("'''")):
+        #    if len(raw_docstring) >= 6:
+        #        raw_docstring = raw_docstring[3:-3]
+        # elif (raw_docstring.startswith('"') and raw_docstring.endswith('"')) or \
+        #      (raw_docstring.startswith("'") and raw_docstring.endswith("'")):
+        #    if len(raw_docstring) >= 2:
+        #        raw_docstring = raw_docstring[1:-1]
         
-        if raw_docstring:
-            # Clean common quotes if they were accidentally included by get_node_text
-            # if (raw_docstring.startswith('"""') and raw_docstring.endswith('"""')) or \
-            #    (raw_docstring.startswith("'''") and raw_docstring.endswith("'''")):
-            #    if len(raw_docstring) >= 6:
-            #        raw_docstring = raw_docstring[3:-3]
-            # elif (raw_docstring.startswith('"') and raw_docstring.endswith('"')) or \
-            #      (raw_docstring.startswith("'") and raw_docstring.endswith("'")):
-            #    if len(raw_docstring) >= 2:
-            #        raw_docstring = raw_docstring[1:-1]
-            
-            # Unindent the docstring
-            return textwrap.dedent(raw_docstring).strip()
+        # Unindent the docstring
+        return textwrap.dedent(raw_docstring).strip()
             
     return None
 
+def get_docstring_from_python_node(body_node: Optional[Node], content_bytes: bytes) -> Optional[str]:
+    return get_python_docstring_text(find_python_docstring_node(body_node), content_bytes)
+
 def get_docstring_from_rust_node(item_node: Node, content_bytes: bytes) -> Optional[str]:
     """
     Extracts a docstring from a Rust item (function, struct, enum).
@@ -168,8 +228,8 @@ def get_docstring_from_rust_node(item_node: Node, content_bytes: bytes) -> Optio
     # These are typically sibling comment nodes *before* the item node
     prev_sibling = item_node.prev_named_sibling
     temp_doc_lines = []
-    while prev_sibling and prev_sibling.type in ("line_comment", "block_comment"):
-        comment_text = get_node_text(prev_sibling, content_bytes)
+    while prev_sibling and prev_sibling.type in ("line_comment", "block_comment", "attribute_item"):
+        comment_text = get_node_text(prev_sibling, content_bytes) if prev_sibling.type != "attribute_item" else None
         if comment_text:
             if prev_sibling.type == "line_comment" and comment_text.startswith("///"):
                 temp_doc_lines.append(comment_text[3:].strip()) # Remove /// and space
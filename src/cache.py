@@ -0,0 +1,56 @@
+# src/cache.py
+# Content-hash keyed on-disk cache of per-file extraction results.
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from .config import SCHEMA_VERSION, EXTRACTOR_VERSION
+
+DEFAULT_CACHE_DIRNAME = ".llmos_cache"
+
+class ExtractionCache:
+    """Stores the partial component record produced by `cli.extract_file` for each file.
+
+    Entries are keyed by the SHA-256 of the file content plus everything else the record
+    depends on (relative path, FQN target name, language, SCHEMA_VERSION, EXTRACTOR_VERSION),
+    so a hit can be returned without parsing. Entries are plain JSON files written atomically,
+    which makes the cache safe to share between --jobs workers. Hits and misses are counted
+    by the caller in RunStats (`cache_hits`/`cache_misses`), which also covers worker processes.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def content_hash(content_bytes: bytes) -> str:
+        return hashlib.sha256(content_bytes).hexdigest()
+
+    def make_key(self, content_hash: str, rel_path_str: str, target_name: str, lang: str) -> str:
+        key_material = "\0".join((content_hash, rel_path_str, target_name, lang, SCHEMA_VERSION, EXTRACTOR_VERSION))
+        return hashlib.sha256(key_material.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._entry_path(key), 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return record
+
+    def put(self, key: str, record: Dict[str, Any]):
+        import tempfile # Deferred: only cache writes need it
+        entry_path = self._entry_path(key)
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=entry_path.parent, suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(record, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, entry_path)
+        except OSError as e:
+            print(f"Warning: Could not write cache entry {entry_path}: {e}")
@@ -3,27 +3,34 @@ import argparse
 import traceback
 import sys
 from pathlib import Path
-import importlib.util 
 import os
+import time
+from typing import Dict, Any, List, Optional, Tuple, Iterator
 
 from .config import (
-    LANG_MAP, IGNORE_DIRS, IGNORE_FILES,
+    LANG_MAP,
     DEFAULT_YAML_OUTPUT_FILENAME, # DEFAULT_LLM_CONTEXT_FILENAME removed as default for CLI arg is None
+    DEFAULT_JSONL_OUTPUT_FILENAME,
     SCHEMA_VERSION,
-    LANG_CONFIG
+    SUPPORTED_LANGUAGES,
+    YAML_EMITTERS,
+    JSONL_GRANULARITIES,
+    LLM_DETAIL_LEVELS,
+    DEFAULT_LLM_SHARD_MAX_TOKENS
 )
-from .ast_utils import initialize_parsers, parse_code 
-from .metadata_parser import parse_project_metadata
-from .extract_python import (
-    extract_py_data_structure, extract_py_function_details,
-    extract_py_test_specifications
-)
-# from .extract_rust import ( # Rust extractors commented out
-#     extract_rs_data_structure, extract_rs_function_details,
-#     extract_rs_test_specifications
-# )
-from .output import save_to_yaml, save_to_llm_context_file
+from .ast_utils import parse_code 
 from . import ast_utils as astu
+from .metadata_parser import parse_project_metadata
+from .extract_python import PY_FILE_ENGINES, retarget_py_file_record, collect_py_references, collect_py_imports
+from .extract_rust import extract_rs_file, find_crate_root, attach_rs_impl_methods
+from .walker import walk_source_files, new_walk_stats, is_ignored_path
+from .cache import ExtractionCache, DEFAULT_CACHE_DIRNAME
+from .profiling import RunStats
+from .source_store import SourceStore, BlobStore
+from .symbols import SymbolIndex, resolve_dependencies, link_test_coverage, resolve_relative_import, module_package
+from .import_graph import ModuleResolver, link_component_imports, save_import_graph
+# .output (yaml, sqlite3) is imported in run_analysis (and by watch only when it writes), so `--help`
+# and the diff/query subcommands do not pay for it; tree-sitter grammars load on the first parse of each language.
 
 repo_ir = {
     "schema_version": SCHEMA_VERSION,
@@ -34,6 +41,14 @@ repo_ir = {
     "components": {} 
 }
 DEBUG_MODE = False
+extraction_cache: Optional[ExtractionCache] = None
+py_engine = "walk" # Key into extract_python.PY_FILE_ENGINES
+run_stats = RunStats()
+# --dedupe: dedupe key -> file record of the first file with that content (None if it failed)
+dedupe_records: Optional[Dict[str, Optional[Dict[str, Any]]]] = None
+resolve_deps = False # --resolve-deps: collect references and import tables per file
+collect_imports = False # --emit-import-graph: collect imported module names per file
+link_tests = False # --link-tests: collect test body references, setup, calls and assertions
 
 def find_component_id_for_lib(rel_path_str: str, library_name: str) -> str:
     p = Path(rel_path_str)
@@ -51,86 +66,291 @@ def find_component_id_for_lib(rel_path_str: str, library_name: str) -> str:
         return library_name 
     return f"{library_name}{'.' if parts else ''}{'.'.join(parts)}"
 
-def process_file(file_path: Path, root_for_analysis: Path, target_name_for_fqn: str):
-    global repo_ir, DEBUG_MODE
-
-    if any(part in IGNORE_DIRS for part in file_path.relative_to(root_for_analysis).parts) or \
-       file_path.name in IGNORE_FILES:
-        if DEBUG_MODE: print(f"  Ignoring (config): {file_path.relative_to(root_for_analysis)}")
-        return
+def extract_file(file_path: Path, root_for_analysis: Path, target_name_for_fqn: str) -> Optional[Dict[str, Any]]:
+    """Parses and extracts a single file without touching the global IR.
 
+    Returns a partial component record ({component_id, language, data_structures,
+    functions, test_specifications}) or None if the file is unsupported or fails to
+    parse. Ignore rules are applied by the walker (see `walker.walk_source_files`),
+    not here. Safe to call from worker processes.
+    """
     rel_path_to_lib_root = file_path.relative_to(root_for_analysis)
     rel_path_str = str(rel_path_to_lib_root)
     extension = file_path.suffix.lower()
     lang = LANG_MAP.get(extension) 
 
-    if not lang or lang != "python": 
-        common_non_code_exts = ['.md', '.txt', '.json', '.yaml', '.toml', '.lock', '.h', '.c', '.cpp', '.cc', '.hpp', '.hh', '.so', '.dylib', '.dll', '.rst', '.html', '.css', '.js', '.rs']
+    if not lang or lang not in SUPPORTED_LANGUAGES: 
+        common_non_code_exts = ['.md', '.txt', '.json', '.yaml', '.toml', '.lock', '.h', '.c', '.cpp', '.cc', '.hpp', '.hh', '.so', '.dylib', '.dll', '.rst', '.html', '.css', '.js']
         if DEBUG_MODE and extension not in common_non_code_exts and not file_path.name.startswith('.'):
-             print(f"  Skipping (not Python or unmapped): {rel_path_str}")
-        return
+             print(f"  Skipping (unsupported or unmapped): {rel_path_str}")
+        return None
 
     # Define is_test_file here, relevant for Python processing block
     is_test_file = "test" in file_path.name.lower() or \
                    any(p.lower() in {"test", "tests"} for p in file_path.parts)
 
     if DEBUG_MODE: print(f"Processing ({lang}): {rel_path_str} (is_test_file: {is_test_file})")
-    repo_ir["languages_present"].add(lang)
 
+    file_start = time.perf_counter()
     try:
         with open(file_path, 'rb') as f:
             content_bytes = f.read()
+        run_stats.incr("bytes_read", len(content_bytes))
+        stage_start = time.perf_counter()
+        run_stats.add_time("read", stage_start - file_start)
+
+        cache_key = None
+        if extraction_cache is not None:
+            cache_key = extraction_cache.make_key(ExtractionCache.content_hash(content_bytes),
+                                                  rel_path_str, target_name_for_fqn, f"{lang}:{py_engine}:{astu.source_mode}{':deps' if resolve_deps else ''}{':imports' if collect_imports else ''}{':tests' if link_tests else ''}")
+            cached_record = extraction_cache.get(cache_key)
+            stage_end = time.perf_counter()
+            run_stats.add_time("cache_lookup", stage_end - stage_start)
+            stage_start = stage_end
+            if cached_record is not None:
+                if DEBUG_MODE: print(f"  Cache hit: {rel_path_str}")
+                run_stats.incr("cache_hits")
+                run_stats.record_file(rel_path_str, stage_end - file_start)
+                return cached_record
+            run_stats.incr("cache_misses")
+
         root_node = parse_code(content_bytes, lang)
+        stage_end = time.perf_counter()
+        run_stats.add_time("parse", stage_end - stage_start)
+        stage_start = stage_end
         if not root_node:
             print(f"  Warning: Could not parse {rel_path_str}. Skipping AST extraction.")
-            return
-
-        component_id = find_component_id_for_lib(rel_path_str, target_name_for_fqn)
-        if component_id not in repo_ir["components"]:
-            repo_ir["components"][component_id] = {
-                "component_id": component_id, "component_type": f"{lang}_module",
-                "source_path": str(Path(component_id.replace(".", os.sep))),
-                "summary": f"Code component: {component_id}",
-                "data_structures": [], "functions": [], "test_specifications": []
-            }
-        
-        new_structs, new_funcs, new_tests = [], [], []
-
-        if lang == "python": # This block now correctly uses is_test_file defined above
-            for node in root_node.children:
-                current_parent_fqn = find_component_id_for_lib(rel_path_str, target_name_for_fqn) 
-
-                if astu.is_node_type(node, lang, "class_def"):
-                    struct_data = extract_py_data_structure(node, file_path, root_for_analysis, content_bytes, parent_fqn=current_parent_fqn)
-                    if struct_data: 
-                        struct_data['language'] = lang
-                        new_structs.append(struct_data)
-                elif astu.is_node_type(node, lang, "func_def"):
-                    name_node = astu.find_child_by_field_name(node, "name")
-                    func_name_text = astu.get_node_text(name_node, content_bytes) or ""
-                    is_test_func_by_name = func_name_text.startswith("test_")
-
-                    if is_test_file or is_test_func_by_name: 
-                        test_data_list = extract_py_test_specifications(node, file_path, root_for_analysis, content_bytes) 
-                        if test_data_list: new_tests.extend(test_data_list)
-                    else:
-                        func_data = extract_py_function_details(node, file_path, root_for_analysis, content_bytes, parent_fqn=current_parent_fqn)
-                        if func_data: 
-                            func_data['language'] = lang
-                            new_funcs.append(func_data)
-        
-        repo_ir["components"][component_id]["data_structures"].extend(new_structs)
-        repo_ir["components"][component_id]["functions"].extend(new_funcs)
-        repo_ir["components"][component_id]["test_specifications"].extend(new_tests)
+            run_stats.incr("files_failed")
+            return None
+        run_stats.incr("ast_nodes", root_node.descendant_count)
+
+        file_record = extract_parsed_file(root_node, content_bytes, file_path, root_for_analysis, target_name_for_fqn, lang)
+        stage_end = time.perf_counter()
+        run_stats.add_time("extract", stage_end - stage_start)
+        run_stats.incr("files_extracted")
+        run_stats.record_file(rel_path_str, stage_end - file_start)
+        if cache_key is not None:
+            with run_stats.stage("cache_store"):
+                extraction_cache.put(cache_key, file_record)
+        return file_record
 
     except Exception as e:
         print(f"ERROR processing file {rel_path_str} from target {target_name_for_fqn}: {type(e).__name__} - {e}")
         if DEBUG_MODE: traceback.print_exc()
+        run_stats.incr("files_failed")
+        return None
+
+def extract_parsed_file(root_node, content_bytes: bytes, file_path: Path, root_for_analysis: Path,
+                        target_name_for_fqn: str, lang: str) -> Dict[str, Any]:
+    """Builds the partial component record for an already parsed file."""
+    rel_path_str = str(file_path.relative_to(root_for_analysis))
+    is_test_file = "test" in file_path.name.lower() or \
+                   any(p.lower() in {"test", "tests"} for p in file_path.parts)
+    component_id = find_component_id_for_lib(rel_path_str, target_name_for_fqn)
+    new_structs, new_funcs, new_tests = [], [], []
+
+    rs_impls = None
+    if lang == "python":
+        new_structs, new_funcs, new_tests = PY_FILE_ENGINES[py_engine](
+            root_node, file_path, root_for_analysis, content_bytes, component_id, is_test_file)
+    elif lang == "rust":
+        new_structs, new_funcs, new_tests, rs_impls = extract_rs_file(
+            root_node, file_path, root_for_analysis, content_bytes, is_test_file)
+
+    file_record = {
+        "component_id": component_id, "language": lang,
+        "data_structures": new_structs, "functions": new_funcs, "test_specifications": new_tests
+    }
+    if rs_impls is not None:
+        # Attached to their types once the whole crate is merged (attach_rs_impl_methods)
+        file_record["rust_impls"] = rs_impls
+        file_record["rust_crate"] = f"{target_name_for_fqn}:{find_crate_root(file_path, root_for_analysis)}"
+    if astu.source_mode == "spans":
+        file_record["source_root"] = target_name_for_fqn # Spans are relative to this target's root
+    if lang == "python" and (resolve_deps or collect_imports or link_tests):
+        if resolve_deps or link_tests:
+            symbol_records = [*new_structs, *(method for ds in new_structs for method in ds.get("methods", [])), *new_funcs] \
+                if resolve_deps else []
+            imports, import_targets = collect_py_references(root_node, content_bytes,
+                                                            symbol_records + (new_tests if link_tests else []))
+            file_record["imports"] = imports
+        else:
+            imports, import_targets = collect_py_imports(root_node, content_bytes)
+        if collect_imports:
+            file_record["import_targets"] = import_targets
+        file_record["module_package"] = module_package(component_id, file_path.stem)
+    return file_record
+
+def primary_language(languages_present: List[str]) -> str:
+    """Python when present (or nothing was found), otherwise the first language alphabetically."""
+    return "python" if "python" in languages_present or not languages_present else languages_present[0]
+
+def merge_file_record(file_record: Dict[str, Any]):
+    """Merges a partial component record from `extract_file` into the global IR."""
+    global repo_ir
+    lang = file_record["language"]
+    component_id = file_record["component_id"]
+    repo_ir["languages_present"].add(lang)
+    run_stats.incr("symbols_emitted", len(file_record["functions"]) + len(file_record["test_specifications"]) +
+                   sum(1 + len(ds.get("methods", [])) for ds in file_record["data_structures"]) +
+                   sum(len(impl["methods"]) for impl in file_record.get("rust_impls", [])))
+    if component_id not in repo_ir["components"]:
+        repo_ir["components"][component_id] = {
+            "component_id": component_id, "component_type": f"{lang}_module",
+            "source_path": str(Path(component_id.replace(".", os.sep))),
+            "summary": f"Code component: {component_id}",
+            "data_structures": [], "functions": [], "test_specifications": []
+        }
+        if "source_root" in file_record:
+            repo_ir["components"][component_id]["source_root"] = file_record["source_root"]
+    repo_ir["components"][component_id]["data_structures"].extend(file_record["data_structures"])
+    repo_ir["components"][component_id]["functions"].extend(file_record["functions"])
+    repo_ir["components"][component_id]["test_specifications"].extend(file_record["test_specifications"])
+    if "rust_impls" in file_record:
+        repo_ir["components"][component_id]["rust_crate"] = file_record["rust_crate"]
+        repo_ir["components"][component_id].setdefault("rust_impls", []).extend(file_record["rust_impls"])
+    if "imports" in file_record:
+        import_table = repo_ir["components"][component_id].setdefault("import_table", {})
+        for local_name, target in file_record["imports"].items():
+            import_table[local_name] = (resolve_relative_import(target, file_record["module_package"]), target.startswith("."))
+    if "import_targets" in file_record:
+        # (name, is_relative): relative imports resolve to component_ids, absolute ones stay module paths
+        repo_ir["components"][component_id].setdefault("import_targets", []).extend(
+            (resolve_relative_import(target, file_record["module_package"]), target.startswith("."))
+            for target in file_record["import_targets"])
+
+def process_file(file_path: Path, root_for_analysis: Path, target_name_for_fqn: str):
+    if is_ignored_path(file_path.relative_to(root_for_analysis)):
+        if DEBUG_MODE: print(f"  Ignoring (config): {file_path.relative_to(root_for_analysis)}")
+        return
+    file_record = extract_file(file_path, root_for_analysis, target_name_for_fqn)
+    if file_record:
+        merge_file_record(file_record)
+
+# --- Content-hash file dedupe (--dedupe) ---
+def _dedupe_key(file_path: Path) -> Optional[str]:
+    """Content hash plus everything besides the path that changes extraction (language, test-file flag)."""
+    lang = LANG_MAP.get(file_path.suffix.lower())
+    if lang != "python": # Only Python records can be re-targeted (retarget_py_file_record)
+        return None
+    is_test_file = "test" in file_path.name.lower() or \
+                   any(p.lower() in {"test", "tests"} for p in file_path.parts)
+    try:
+        with open(file_path, 'rb') as f:
+            content_hash = ExtractionCache.content_hash(f.read())
+    except OSError:
+        return None
+    return f"{content_hash}:{lang}:{int(is_test_file)}"
+
+def retarget_file_record(file_record: Dict[str, Any], file_path: Path, root_for_analysis: Path,
+                         target_name_for_fqn: str) -> Dict[str, Any]:
+    """Re-targets a record extracted from identical content to another file/target."""
+    rel_path_str = str(file_path.relative_to(root_for_analysis))
+    component_id = find_component_id_for_lib(rel_path_str, target_name_for_fqn)
+    new_record = retarget_py_file_record(file_record, rel_path_str, component_id)
+    if "source_root" in new_record:
+        new_record["source_root"] = target_name_for_fqn
+    if "module_package" in new_record:
+        new_record["module_package"] = module_package(component_id, file_path.stem)
+    return new_record
+
+def extract_files_deduped(tasks: List[Tuple[Path, Path, str]], jobs: int) -> Iterator[Optional[Dict[str, Any]]]:
+    """Like the plain extraction loop, but each distinct file content is parsed and extracted once.
+
+    Files are hashed up front in the parent; only first occurrences (across all targets of the
+    run, via `dedupe_records`) are extracted (in a pool when jobs > 1), and later copies are
+    re-targeted from the stored record. Results are yielded in task order.
+    """
+    keys = [_dedupe_key(task[0]) for task in tasks]
+    first_positions: Dict[str, int] = {}
+    unique_tasks = []
+    for position, (task, key) in enumerate(zip(tasks, keys)):
+        if key is None or (key not in dedupe_records and key not in first_positions):
+            if key is not None:
+                first_positions[key] = position
+            unique_tasks.append(task)
+    if jobs > 1 and len(unique_tasks) > 1:
+        unique_records = extract_files_parallel(unique_tasks, jobs)
+    else:
+        unique_records = (extract_file(*task) for task in unique_tasks)
+
+    for position, (task, key) in enumerate(zip(tasks, keys)):
+        if key is None or first_positions.get(key) == position:
+            file_record = next(unique_records)
+            if key is not None:
+                dedupe_records[key] = file_record
+            yield file_record
+            continue
+        run_stats.incr("files_deduplicated")
+        original_record = dedupe_records[key]
+        yield retarget_file_record(original_record, *task) if original_record else None
+
+def _group_tasks_by_component(tasks: List[Tuple[Path, Path, str]]) -> Tuple[List[Tuple[Path, Path, str]], List[str]]:
+    """Reorders tasks so each component's files are contiguous (components keep first-seen order).
+
+    Used by --stream-yaml: a component can be written out as soon as its last file is merged,
+    and the component order and contents match the in-memory build.
+    """
+    tasks_by_component: Dict[str, List[Tuple[Path, Path, str]]] = {}
+    for task in tasks:
+        file_path, root_for_analysis, target_name_for_fqn = task
+        component_id = find_component_id_for_lib(str(file_path.relative_to(root_for_analysis)), target_name_for_fqn)
+        tasks_by_component.setdefault(component_id, []).append(task)
+    ordered_tasks, component_ids = [], []
+    for component_id, component_tasks in tasks_by_component.items():
+        ordered_tasks.extend(component_tasks)
+        component_ids.extend([component_id] * len(component_tasks))
+    return ordered_tasks, component_ids
+
+# --- Parallel extraction (--jobs) ---
+def _init_worker(debug_mode: bool, lang_map: Dict[str, str], cache_dir: Optional[Path], engine: str, ir_mode: str,
+                 collect_references: bool, collect_import_targets: bool, collect_test_references: bool):
+    """ProcessPoolExecutor initializer: each worker loads its own tree-sitter parsers (on first use)."""
+    global DEBUG_MODE, extraction_cache, py_engine, resolve_deps, collect_imports, link_tests
+    DEBUG_MODE = debug_mode
+    py_engine = engine
+    resolve_deps = collect_references
+    collect_imports = collect_import_targets
+    link_tests = collect_test_references
+    astu.set_source_mode(ir_mode)
+    extraction_cache = ExtractionCache(cache_dir) if cache_dir else None
+    LANG_MAP.update(lang_map) # Carries --include-pyi over to spawn-based workers
+
+def _extract_file_task(task: Tuple[Path, Path, str]) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    global run_stats
+    run_stats = RunStats() # Fresh per task; the parent merges it into its own RunStats
+    return extract_file(*task), run_stats.to_dict()
+
+def extract_files_parallel(tasks: List[Tuple[Path, Path, str]], jobs: int) -> Iterator[Optional[Dict[str, Any]]]:
+    """Runs `extract_file` over tasks in a process pool, yielding results in task order."""
+    from concurrent.futures import ProcessPoolExecutor
+    chunksize = max(1, min(64, len(tasks) // (jobs * 8) or 1))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(DEBUG_MODE, dict(LANG_MAP),
+                                       extraction_cache.cache_dir if extraction_cache else None, py_engine,
+                                       astu.source_mode, resolve_deps, collect_imports, link_tests)) as executor:
+        for file_record, worker_stats in executor.map(_extract_file_task, tasks, chunksize=chunksize):
+            run_stats.merge(worker_stats)
+            yield file_record
+
+def main(argv: Optional[List[str]] = None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "watch":
+        from .watch import watch_main
+        return watch_main(argv[1:])
+    if argv and argv[0] == "diff":
+        from .ir_diff import diff_main
+        return diff_main(argv[1:])
+    if argv and argv[0] == "query":
+        from .ir_query import query_main
+        return query_main(argv[1:])
 
-def main():
-    global repo_ir, DEBUG_MODE
     parser = argparse.ArgumentParser(
-        description="LLMOS Lang - Code Deconstruction & Analysis. Analyzes local repositories or installed Python libraries.",
+        description="LLMOS Lang - Code Deconstruction & Analysis. Analyzes local repositories or installed Python libraries.\n"
+                    "Subcommands: `llmos-cli watch --repo-path PATH ...` keeps the outputs updated as files change;\n"
+                    "`llmos-cli diff OLD NEW` reports symbol changes between two IR files;\n"
+                    "`llmos-cli query IR ...` looks up symbols in a written IR.",
         formatter_class=argparse.RawTextHelpFormatter
     )
     group = parser.add_mutually_exclusive_group(required=True)
@@ -139,35 +359,115 @@ def main():
     group.add_argument("--library", metavar="LIBRARY_NAME", nargs="+",
                        help="Name(s) of installed Python library/libraries to analyze (e.g., mlx requests).")
 
-    parser.add_argument("-o", "--output-yaml", default=DEFAULT_YAML_OUTPUT_FILENAME,
-                        help=f"Output YAML IR file path (default: {DEFAULT_YAML_OUTPUT_FILENAME})")
+    parser.add_argument("-o", "--output-yaml", default=None,
+                        help=f"Output IR file path (default: {DEFAULT_YAML_OUTPUT_FILENAME}, or {DEFAULT_JSONL_OUTPUT_FILENAME} with --format jsonl)")
+    parser.add_argument("--format", choices=("yaml", "jsonl"), default="yaml",
+                        help="IR output format. 'jsonl' writes one header record, then one JSON record per line\n(load with ir_reader.load_jsonl_ir) (default: %(default)s).")
+    parser.add_argument("--ir-index", action="store_true",
+                        help="Also write <ir file>.idx mapping component_id/qualified_name to byte ranges\n(for ir_reader.IndexedIRReader random access).")
+    parser.add_argument("--jsonl-granularity", choices=JSONL_GRANULARITIES, default="component",
+                        help="With --format jsonl: one record per component, or per symbol (default: %(default)s).")
     parser.add_argument("--llm-file", type=str, default=None, 
                         help="Output path for the LLM context text file (e.g., context.txt). If not set, this output is skipped.")
+    parser.add_argument("--llm-shard-dir", metavar="DIR", default=None,
+                        help="Write the LLM context as token-budgeted shard files plus manifest.json into DIR,\nsplitting only between components/symbols.")
+    parser.add_argument("--llm-max-tokens", type=int, default=None,
+                        help=f"Token budget per LLM context shard, estimated as chars/4 (requires --llm-shard-dir;\ndefault: {DEFAULT_LLM_SHARD_MAX_TOKENS}).")
+    parser.add_argument("--llm-component-dir", metavar="DIR", default=None,
+                        help="Write the LLM context as one file per component into DIR, rendered in parallel with\n--jobs workers, plus index.txt listing the files in output order.")
+    parser.add_argument("--llm-detail", choices=LLM_DETAIL_LEVELS, default="full",
+                        help="LLM context detail: 'full' includes source code, 'skeleton' renders stubs (bases, fields,\nsignatures, docstrings) with bodies elided, 'signatures' only the stub lines (default: %(default)s).")
+    parser.add_argument("--yaml-emitter", choices=YAML_EMITTERS, default="fast",
+                        help="'fast' uses libyaml (when installed) and literal | blocks for multi-line source and\ndocstrings; 'python' is the pure-Python dumper with folded strings (default: %(default)s).")
+    parser.add_argument("--output-sqlite", metavar="PATH", default=None,
+                        help="Also write the IR to an indexed SQLite database for point lookups and filtered scans.")
+    parser.add_argument("--py-engine", choices=sorted(PY_FILE_ENGINES), default=py_engine,
+                        help="Python extraction engine: 'walk' visits module children node by node, 'query' runs one\ncombined tree-sitter query per file (same output; the query visits every node), 'cursor' is one\nTreeCursor pass that also emits nested, decorated and conditionally defined symbols with\nparent_qualified_name links (default: %(default)s).")
+    parser.add_argument("--ir-mode", choices=astu.SOURCE_MODES, default="inline",
+                        help="'inline' stores each symbol's source text in the IR; 'spans' stores byte spans into\nthe analyzed files instead (no duplicated method text), materialized only by the\nLLM context writer (default: %(default)s).")
+    parser.add_argument("--stream-yaml", action="store_true",
+                        help="Write each component to the IR file as soon as its files are processed instead of\nholding the whole IR in memory (languages_present and language_primary are written after the components).")
     parser.add_argument("-d", "--debug", action="store_true", help="Enable verbose debug printing.")
     parser.add_argument("--include-pyi", action="store_true", help="Include .pyi stub files in Python library analysis.")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of worker processes for file extraction (default: 1, serial). Use 0 for one per CPU.")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="Hash file contents and extract each distinct file once; identical copies (vendored\nmodules, repeated --library packages) are re-targeted to their own FQNs and paths.")
+    parser.add_argument("--blob-store", action="store_true",
+                        help="Store each distinct symbol source text once in a trailing `blobs` table of the YAML/JSONL IR\nand reference it by `source_blob` hash (inline --ir-mode only).")
+    parser.add_argument("--resolve-deps", action="store_true",
+                        help="Fill each function's and class's `dependencies` with the qualified names it references\n(resolved through a symbol table and per-module import tables) and add reverse `used_by` lists.\nNeeds the whole IR in memory, so it turns off --stream-yaml.")
+    parser.add_argument("--link-tests", action="store_true",
+                        help="Fill `test_specs_covering` with the tests whose bodies reference each function/class\n(joined through the symbol table), and each test's setup, action calls and assertions.\nTurns off --stream-yaml.")
+    parser.add_argument("--emit-import-graph", metavar="PATH", default=None,
+                        help="Store each component's resolved module imports (`imports`: component_ids) and write the\nimport graph as JSON to PATH: edges, dependency-first topological order and import cycles\n(strongly connected components). Turns off --stream-yaml.")
+    parser.add_argument("--cache-dir", nargs="?", const=DEFAULT_CACHE_DIRNAME, default=None, metavar="DIR",
+                        help=f"Reuse per-file extraction results keyed by content hash (default dir when given without a value: {DEFAULT_CACHE_DIRNAME}).")
+
+    parser.add_argument("--profile", action="store_true",
+                        help="Print per-stage timings, counters and the slowest files at the end of the run.")
+    parser.add_argument("--profile-json", metavar="PATH", default=None,
+                        help="Also write the profile summary as JSON to PATH (implies --profile).")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N",
+                        help="Number of slowest files to report (default: 10).")
+    parser.add_argument("--cprofile", metavar="PATH", default=None,
+                        help="Run under cProfile and dump stats to PATH (parent process only with --jobs).")
+
+    args = parser.parse_args(argv)
+    if args.llm_max_tokens is not None and not args.llm_shard_dir:
+        parser.error("--llm-max-tokens requires --llm-shard-dir")
+    if args.llm_max_tokens is not None and args.llm_max_tokens <= 0:
+        parser.error("--llm-max-tokens must be positive")
+    if args.blob_store and args.ir_mode == "spans":
+        parser.error("--blob-store requires --ir-mode inline (spans mode stores no source text)")
+
+    if args.cprofile:
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(run_analysis, args)
+        finally:
+            profiler.dump_stats(args.cprofile)
+            print(f"cProfile stats written to {args.cprofile} (inspect with `python -m pstats {args.cprofile}`)")
+    else:
+        run_analysis(args)
 
-    args = parser.parse_args()
+def run_analysis(args: argparse.Namespace):
+    global repo_ir, DEBUG_MODE, extraction_cache, py_engine, run_stats, dedupe_records, resolve_deps, collect_imports, link_tests
+    from .output import (
+        save_to_yaml, save_to_jsonl, save_to_llm_context_file, save_to_llm_shards, save_to_llm_component_files, save_to_sqlite,
+        StreamingYamlWriter, JsonlIRWriter, SqliteIRWriter, default_index_path
+    )
+    run_stats = RunStats(top_n=args.profile_top)
+    dedupe_records = {} if args.dedupe else None
+    blob_store = BlobStore() if args.blob_store else None
 
     if args.debug:
         DEBUG_MODE = True
         print("Debug mode enabled.")
 
-    try:
-        initialize_parsers() 
-    except Exception as e:
-        print(f"FATAL: Failed to initialize language parsers: {e}")
-        if DEBUG_MODE: traceback.print_exc()
-        sys.exit(1)
-    
+    py_engine = args.py_engine
+    resolve_deps = args.resolve_deps
+    collect_imports = bool(args.emit_import_graph)
+    link_tests = args.link_tests
+    if (resolve_deps or collect_imports or link_tests) and args.stream_yaml:
+        print("Warning: --resolve-deps/--emit-import-graph/--link-tests need every component before writing; ignoring --stream-yaml.")
+        args.stream_yaml = False
+    astu.set_source_mode(args.ir_mode)
+    if args.jobs <= 0:
+        args.jobs = os.cpu_count() or 1
+
+    if args.cache_dir:
+        extraction_cache = ExtractionCache(Path(args.cache_dir))
+        print(f"Using extraction cache at {extraction_cache.cache_dir}")
+
     if args.include_pyi:
-        if "python" in LANG_CONFIG: 
-            LANG_MAP[".pyi"] = "python" 
-            print("Including .pyi files for Python analysis.")
-        else:
-            print("Warning: Python language config not loaded, cannot enable .pyi processing effectively.")
+        LANG_MAP[".pyi"] = "python" 
+        print("Including .pyi files for Python analysis.")
 
     paths_to_analyze = []
     analysis_target_names = [] 
+    package_targets = [] # Targets imported by their own name (libraries, package-root repos); see ModuleResolver
 
     if args.repo_path:
         repo_path_obj = Path(args.repo_path).resolve()
@@ -178,6 +478,8 @@ def main():
         analysis_target_names.append(repo_path_obj.name) 
         repo_ir["project_name"] = repo_path_obj.name
         repo_ir["metadata"] = parse_project_metadata(repo_path_obj)
+        if (repo_path_obj / "__init__.py").is_file():
+            package_targets.append(repo_path_obj.name) # The root is itself a package: imports start with its name
         repo_ir["project_name"] = repo_ir["metadata"].get("project_name_from_meta", repo_ir["project_name"])
 
     elif args.library:
@@ -187,6 +489,7 @@ def main():
             for p_item in sys.path:
                 print(f"  - {p_item}")
         
+        import importlib.util
         for lib_name in args.library:
             print(f"[INFO-CLI] Attempting to locate library: '{lib_name}'")
             lib_root_path = None
@@ -237,6 +540,7 @@ def main():
                 if lib_root_path and lib_root_path.is_dir():
                     paths_to_analyze.append(lib_root_path)
                     analysis_target_names.append(lib_name) 
+                    package_targets.append(lib_name)
                 else:
                     print(f"Error: Could not determine a valid directory for library '{lib_name}'. Skipping.")
                     if DEBUG_MODE:
@@ -252,37 +556,171 @@ def main():
         repo_ir["project_name"] = f"Libraries Analysis: {', '.join(analysis_target_names)}"
         repo_ir["metadata"] = {"description": f"Static analysis of installed libraries: {', '.join(analysis_target_names)}"}
 
+    if args.ir_mode == "spans":
+        repo_ir["source_roots"] = {name: str(path) for name, path in zip(analysis_target_names, paths_to_analyze)}
+        # Keep it with the header fields, ahead of the components, so streaming readers see it first.
+        repo_ir["components"] = repo_ir.pop("components")
+
     print(f"\nAnalyzing targets: {', '.join(analysis_target_names)}")
     if DEBUG_MODE: print(f"  Actual paths to analyze: {paths_to_analyze}")
 
+    if args.output_yaml is None:
+        args.output_yaml = DEFAULT_JSONL_OUTPUT_FILENAME if args.format == "jsonl" else DEFAULT_YAML_OUTPUT_FILENAME
+    yaml_output_path = Path(args.output_yaml)
+    index_output_path = default_index_path(yaml_output_path) if args.ir_index else None
+    yaml_writer = None
+    sqlite_writer = None
+    streamed_components: List[Dict[str, Any]] = []
+    if args.stream_yaml:
+        print(f"\nStreaming Intermediate Representation to {yaml_output_path}...")
+        if args.format == "jsonl":
+            yaml_writer = JsonlIRWriter(yaml_output_path, args.jsonl_granularity, index_output_path)
+        else:
+            yaml_writer = StreamingYamlWriter(yaml_output_path, args.yaml_emitter, index_output_path)
+        header_fields = {key: repo_ir[key] for key in ("schema_version", "project_name", "metadata", "source_roots")
+                         if key in repo_ir}
+        yaml_writer.write_fields(header_fields)
+        if args.output_sqlite:
+            sqlite_writer = SqliteIRWriter(Path(args.output_sqlite))
+            sqlite_writer.write_fields(header_fields)
+
     for target_path_obj, current_target_name_for_fqn in zip(paths_to_analyze, analysis_target_names):
         print(f"\nProcessing target: {current_target_name_for_fqn} (from path: {target_path_obj})")
-        file_count = 0
         target_path_obj = Path(target_path_obj) 
-        for item in target_path_obj.rglob('*'): 
-            if item.is_file():
-                file_count += 1
-                process_file(item, target_path_obj, current_target_name_for_fqn)
-        print(f"  Scanned {file_count} items in {current_target_name_for_fqn}.")
-
-    repo_ir["language_primary"] = "python" 
-    if "python" in repo_ir["languages_present"]:
-         repo_ir["languages_present"] = ["python"]
-    else:
-         repo_ir["languages_present"] = []
-
-    repo_ir["components"] = list(repo_ir["components"].values())
+        walk_stats = new_walk_stats()
+        with run_stats.stage("walk"):
+            tasks = [(item, target_path_obj, current_target_name_for_fqn)
+                     for item in walk_source_files(target_path_obj, walk_stats)]
+        run_stats.incr("files_seen", walk_stats["files_yielded"] + walk_stats["files_ignored"] + walk_stats["files_unsupported"])
+        run_stats.incr("files_skipped", walk_stats["files_ignored"] + walk_stats["files_unsupported"])
+        run_stats.incr("dirs_pruned", walk_stats["dirs_pruned"])
+        task_component_ids = None
+        if yaml_writer:
+            tasks, task_component_ids = _group_tasks_by_component(tasks)
+
+        if dedupe_records is not None:
+            file_records = extract_files_deduped(tasks, args.jobs)
+        elif args.jobs > 1 and len(tasks) > 1:
+            # Results come back in task order, so the merge (and the output) matches a serial run.
+            file_records = extract_files_parallel(tasks, args.jobs)
+        else:
+            file_records = (extract_file(*task) for task in tasks)
+
+        for task_index, file_record in enumerate(file_records):
+            if file_record:
+                with run_stats.stage("merge"):
+                    merge_file_record(file_record)
+            if task_component_ids is None:
+                continue
+            component_id = task_component_ids[task_index]
+            is_last_file_of_component = task_index + 1 == len(tasks) or task_component_ids[task_index + 1] != component_id
+            if is_last_file_of_component and component_id in repo_ir["components"]:
+                component = repo_ir["components"].pop(component_id)
+                # Streaming only sees this component, so impls of types in other modules stay functions.
+                attach_rs_impl_methods([component])
+                with run_stats.stage("serialize_yaml"):
+                    yaml_writer.write_component(blob_store.externalize(component) if blob_store else component)
+                if sqlite_writer:
+                    with run_stats.stage("write_sqlite"):
+                        sqlite_writer.write_component(component)
+                if args.llm_file or args.llm_shard_dir or args.llm_component_dir:
+                    streamed_components.append(component)
+        print(f"  Found {len(tasks)} source files in {current_target_name_for_fqn} "
+              f"({walk_stats['dirs_walked']} dirs walked, {walk_stats['dirs_pruned']} ignored dirs pruned, "
+              f"{walk_stats['files_ignored']} ignored and {walk_stats['files_unsupported']} unsupported files skipped).")
+
+    repo_ir["languages_present"] = sorted(repo_ir["languages_present"])
+    repo_ir["language_primary"] = primary_language(repo_ir["languages_present"])
+
+    repo_ir["components"] = streamed_components if yaml_writer else list(repo_ir["components"].values())
+    if not yaml_writer and "rust" in repo_ir["languages_present"]:
+        with run_stats.stage("attach_impls"):
+            attached_methods = attach_rs_impl_methods(repo_ir["components"])
+        print(f"Attached {attached_methods} Rust impl methods to their types.")
+    if collect_imports or resolve_deps or link_tests:
+        # Shared by the import graph and the symbol table, so both map imports to modules the same way
+        module_resolver = ModuleResolver((component["component_id"] for component in repo_ir["components"]),
+                                         analysis_target_names, find_component_id_for_lib, package_targets)
+    if collect_imports:
+        with run_stats.stage("import_graph"):
+            link_component_imports(repo_ir["components"], module_resolver)
+            import_graph = save_import_graph(repo_ir["components"], Path(args.emit_import_graph))
+        print(f"Import graph saved to {args.emit_import_graph} ({import_graph['components']} components, "
+              f"{import_graph['edges']} edges, {len(import_graph['cycles'])} import cycles).")
+    if resolve_deps or link_tests:
+        with run_stats.stage("resolve_deps"):
+            symbol_index = SymbolIndex(repo_ir["components"], module_resolver)
+            if resolve_deps:
+                dep_stats = resolve_dependencies(repo_ir["components"], symbol_index)
+            if link_tests:
+                test_stats = link_test_coverage(repo_ir["components"], symbol_index)
+            for component in repo_ir["components"]:
+                component.pop("import_table", None)
+        if resolve_deps:
+            print(f"Resolved {dep_stats['resolved']} of {dep_stats['references']} references "
+                  f"({dep_stats['edges']} dependency edges).")
+        if link_tests:
+            print(f"Linked {test_stats['tests']} tests to {test_stats['symbols_covered']} symbols "
+                  f"({test_stats['links']} test_specs_covering entries).")
 
     print(f"\nExtracted information for languages: {', '.join(repo_ir['languages_present'])}")
+    if dedupe_records is not None:
+        print(f"Deduplicated {run_stats.counters.get('files_deduplicated', 0)} files with identical content "
+              f"({len(dedupe_records)} distinct files extracted).")
     if repo_ir["language_primary"]:
         print(f"Primary language set to: {repo_ir['language_primary']}")
 
-    yaml_output_path = Path(args.output_yaml)
-    save_to_yaml(repo_ir, yaml_output_path)
-
-    if args.llm_file:
-        llm_output_path = Path(args.llm_file)
-        save_to_llm_context_file(repo_ir, llm_output_path)
+    if yaml_writer:
+        # The languages are only known once every file is processed, so they trail the components.
+        language_fields = {key: repo_ir[key] for key in ("language_primary", "languages_present")}
+        with run_stats.stage("serialize_yaml"):
+            yaml_writer.write_fields(language_fields)
+            if blob_store:
+                yaml_writer.write_fields({"blobs": blob_store.blobs})
+            yaml_writer.close()
+        if blob_store:
+            print(f"Blob store: {len(blob_store.blobs)} distinct source texts for {blob_store.references} records.")
+        print(f"{args.format.upper()} IR streamed to {yaml_output_path} ({yaml_writer.components_written} components)")
+        if sqlite_writer:
+            with run_stats.stage("write_sqlite"):
+                sqlite_writer.write_fields(language_fields)
+                sqlite_writer.close()
+            print(f"SQLite IR saved to {args.output_sqlite}")
+    else:
+        with run_stats.stage("serialize_yaml"):
+            ir_to_save = repo_ir
+            if blob_store:
+                # SQLite and the LLM writers keep using the inline records below.
+                ir_to_save = {**repo_ir, "components": [blob_store.externalize(component) for component in repo_ir["components"]]}
+                ir_to_save["blobs"] = blob_store.blobs
+            if args.format == "jsonl":
+                save_to_jsonl(ir_to_save, yaml_output_path, args.jsonl_granularity, index_output_path)
+            else:
+                save_to_yaml(ir_to_save, yaml_output_path, args.yaml_emitter, index_output_path)
+        if blob_store:
+            print(f"Blob store: {len(blob_store.blobs)} distinct source texts for {blob_store.references} records.")
+        if args.output_sqlite:
+            with run_stats.stage("write_sqlite"):
+                save_to_sqlite(repo_ir, Path(args.output_sqlite))
+
+    if args.llm_file or args.llm_shard_dir or args.llm_component_dir:
+        with run_stats.stage("write_llm_context"):
+            source_store = SourceStore(repo_ir["source_roots"]) if "source_roots" in repo_ir else None
+            if args.llm_file:
+                save_to_llm_context_file(repo_ir, Path(args.llm_file), source_store, args.llm_detail)
+            if args.llm_shard_dir:
+                save_to_llm_shards(repo_ir, Path(args.llm_shard_dir), args.llm_max_tokens or DEFAULT_LLM_SHARD_MAX_TOKENS,
+                                   source_store, args.llm_detail)
+            if args.llm_component_dir:
+                save_to_llm_component_files(repo_ir, Path(args.llm_component_dir), args.jobs, args.llm_detail)
+
+    if args.profile or args.profile_json:
+        print()
+        for line in run_stats.summary_lines():
+            print(line)
+        if args.profile_json:
+            run_stats.write_json(Path(args.profile_json))
+            print(f"Profile JSON written to {args.profile_json}")
 
     print("\nAnalysis finished.")
 
@@ -2,14 +2,65 @@
 # Language configurations, constants, ignore lists
 
 import sys
+from pathlib import Path
 
 # tree-sitter Language objects will be loaded here by ast_utils.py
 LANG_CONFIG = {}
 
+# Combined single-pass query for extract_python.extract_py_file_query. The function pattern is
+# instantiated for module-level functions and for methods directly in a module-level class body,
+# mirroring what the node-walking extractor looks at.
+_PY_FUNCTION_PATTERN = """(function_definition
+        "async"? @{prefix}.async
+        name: (identifier) @{prefix}.name
+        parameters: (parameters) @{prefix}.parameters
+        return_type: (_)? @{prefix}.return_type
+        body: (block . (expression_statement . (string) @{prefix}.docstring)?)) @{prefix}.definition"""
+PY_DEFINITIONS_QUERY = f"""
+    (module {_PY_FUNCTION_PATTERN.format(prefix="function")})
+    (module (class_definition
+        name: (identifier) @class.name
+        superclasses: (argument_list)? @class.superclasses
+        body: (block . (expression_statement . (string) @class.docstring)?)) @class.definition)
+    (module (class_definition
+        body: (block {_PY_FUNCTION_PATTERN.format(prefix="method")})) @method.class)
+    (module (class_definition
+        body: (block (expression_statement . (assignment left: (identifier) @field.name)))) @field.class)
+"""
+
+# One pass per file for --resolve-deps/--link-tests (extract_python.collect_py_references): imports,
+# definition ranges (to attribute references to the innermost definition), referenced names, and
+# the assert statements and call sites recorded in test bodies.
+PY_REFERENCES_QUERY = """
+    (import_statement) @import
+    (import_from_statement) @import
+    (function_definition) @def
+    (class_definition) @def
+    (assert_statement) @assert
+    (call) @call
+    (attribute) @ref
+    (identifier) @ref
+"""
+
+# Import statements only, for --emit-import-graph without --resolve-deps.
+PY_IMPORTS_QUERY = """
+    (import_statement) @import
+    (import_from_statement) @import
+"""
+
+# Combined single-pass query for extract_rust.extract_rs_file: every item kind, in document order.
+RS_DEFINITIONS_QUERY = """
+    (mod_item name: (identifier) @mod.name) @mod.definition
+    (impl_item type: (_) @impl.type) @impl.definition
+    (struct_item name: (type_identifier) @struct.name) @struct.definition
+    (enum_item name: (type_identifier) @enum.name) @enum.definition
+    (function_item name: (identifier) @function.name) @function.definition
+"""
+
 # Map file extensions to internal language names
 LANG_MAP = {
     ".py": "python",
-    # ".rs": "rust",
+    ".rs": "rust",
     # Add more as needed
 }
 
@@ -18,7 +69,7 @@ IGNORE_DIRS = {
     ".git", ".svn", ".hg", "target", "build", "dist", "node_modules",
     "venv", ".venv", "env", "__pycache__", ".pytest_cache",
     ".mypy_cache", ".ruff_cache", ".vscode", ".idea", "docs", "examples",
-    "site-packages", "migrations"
+    "site-packages", "migrations", ".llmos_cache"
 }
 IGNORE_FILES = {
     ".gitignore", "LICENSE", "MANIFEST.in", "requirements.txt", "setup.py", "setup.cfg",
@@ -27,97 +78,115 @@ IGNORE_FILES = {
 }
 
 DEFAULT_YAML_OUTPUT_FILENAME = "llmos_ir.yaml"
+DEFAULT_JSONL_OUTPUT_FILENAME = "llmos_ir.jsonl"
 DEFAULT_LLM_CONTEXT_FILENAME = "llm_context.txt"
 SCHEMA_VERSION = "0.2.0"
+# Bump whenever extractor output changes for the same input, so cached records are invalidated.
+EXTRACTOR_VERSION = "6"
 
-def load_language_configs():
-    global LANG_CONFIG
-    if LANG_CONFIG:
-        return
+# Output choices (used by output.py and the CLI options, which must not need output.py's imports)
+YAML_EMITTERS = ("fast", "python")
+JSONL_GRANULARITIES = ("component", "symbol")
+LLM_DETAIL_LEVELS = ("full", "skeleton", "signatures")
+DEFAULT_LLM_SHARD_MAX_TOKENS = 100_000
+# Sidecar offset index (written by output.py, read by ir_reader/ir_query without loading yaml)
+IR_INDEX_SUFFIX = ".idx"
+
+def default_index_path(ir_filepath: Path) -> Path:
+    return ir_filepath.with_name(ir_filepath.name + IR_INDEX_SUFFIX)
+
+# Per-language queries and node type names. The tree-sitter Language objects are attached
+# on first use (load_language_config), so a run only loads the grammars of files it parses.
+_LANGUAGE_SPECS = {
+    "python": {
+        "queries": {
+            "functions": """
+                (function_definition name: (identifier) @function.name) @function.definition
+            """,
+            "classes": """
+                (class_definition name: (identifier) @class.name) @class.definition
+            """,
+            "docstring": """
+                (expression_statement (string) @docstring)
+            """,
+             "test_funcs": """
+                (function_definition name: (identifier) @name
+                    (#match? @name "^test_")) @function
+            """,
+            "definitions": PY_DEFINITIONS_QUERY,
+            "references": PY_REFERENCES_QUERY,
+            "imports": PY_IMPORTS_QUERY,
+        },
+        "node_types": {
+             "func_def": "function_definition", "class_def": "class_definition",
+             "identifier": "identifier", "block": "block",
+             "string": "string", "expression_statement": "expression_statement",
+             "assignment": "assignment",
+        }
+    },
+    "rust": {
+        "queries": {
+            "functions": """
+                (function_item name: (identifier) @function.name) @function.definition
+            """,
+            "structs": """
+                (struct_item name: (type_identifier) @struct.name) @struct.definition
+            """,
+            "enums": """
+                (enum_item name: (type_identifier) @enum.name) @enum.definition
+            """,
+            "impls": """
+                (impl_item) @impl.definition
+            """,
+            # The attribute is a sibling right before the fn, not a child of function_item.
+            "test_funcs": """
+                ((attribute_item (attribute [(identifier) (scoped_identifier)] @attr_path))
+                 .
+                 (function_item name: (identifier) @name) @function
+                 (#match? @attr_path "^(.+::)?test$"))
+            """,
+            "definitions": RS_DEFINITIONS_QUERY,
+        },
+        "node_types": {
+             "func_def": "function_item", "struct_def": "struct_item",
+             "enum_def": "enum_item", "impl_item": "impl_item",
+             "identifier": "identifier", "type_identifier": "type_identifier",
+             "field_declaration_list": "field_declaration_list", 
+             "enum_variant_list": "enum_variant_list", 
+             "block": "block", 
+             "line_comment": "line_comment", # Keep for basic comment node type
+             "block_comment": "block_comment", # Keep for basic comment node type
+        }
+    },
+}
+SUPPORTED_LANGUAGES = tuple(_LANGUAGE_SPECS)
+_failed_languages = set()
 
+def load_language_config(lang: str) -> bool:
+    """Loads the grammar for one language into LANG_CONFIG (once per process). Returns False
+    if the language is unknown or its grammar could not be loaded (reported once)."""
+    if lang in LANG_CONFIG:
+        return True
+    if lang not in _LANGUAGE_SPECS or lang in _failed_languages:
+        return False
     try:
-        from tree_sitter_languages import get_language
+        from tree_sitter_languages import get_language # Deferred: loads the bundled grammar library
     except ImportError:
         print("ERROR: tree-sitter-languages is not installed. Please run `pip install tree-sitter-languages`.")
-        raise
-
-    # --- Python Config ---
+        _failed_languages.add(lang)
+        return False
     try:
-        py_lang_obj = get_language("python")
-        LANG_CONFIG["python"] = {
-            "language": py_lang_obj,
-            "queries": {
-                "functions": """
-                    (function_definition name: (identifier) @function.name) @function.definition
-                """,
-                "classes": """
-                    (class_definition name: (identifier) @class.name) @class.definition
-                """,
-                "docstring": """
-                    (expression_statement (string) @docstring)
-                """,
-                 "test_funcs": """
-                    (function_definition name: (identifier) @name
-                        (#match? @name "^test_")) @function
-                """,
-            },
-            "node_types": {
-                 "func_def": "function_definition", "class_def": "class_definition",
-                 "identifier": "identifier", "block": "block",
-                 "string": "string", "expression_statement": "expression_statement",
-            }
-        }
-        print("Python tree-sitter config loaded.")
+        LANG_CONFIG[lang] = {"language": get_language(lang), **_LANGUAGE_SPECS[lang]}
     except Exception as e:
-        print(f"Warning: Failed to load Python tree-sitter config: {e}")
-
-    # # --- Rust Config ---
-    # try:
-    #     rs_lang_obj = get_language("rust")
-    #     LANG_CONFIG["rust"] = {
-    #         "language": rs_lang_obj,
-    #          "queries": { # Keeping basic structure, but commenting out problematic queries
-    #              "functions": """
-    #                 (function_item name: (identifier) @function.name) @function.definition
-    #              """,
-    #              "structs": """
-    #                 (struct_item name: (type_identifier) @struct.name) @struct.definition
-    #              """,
-    #              "enums": """
-    #                 (enum_item name: (type_identifier) @enum.name) @enum.definition
-    #              """,
-    #              "impls": """
-    #                 (impl_item) @impl.definition
-    #              """,
-    #              # "doc_comment": """
-    #              #    (line_comment (#match? @value "^///[^/]")) @doccomment_outer 
-    #              #    (line_comment (#match? @value "^//![^/]")) @doccomment_inner
-    #              #    (block_comment) @doccomment_block
-    #              # """,
-    #              # "test_funcs": """
-    #              #    (
-    #              #        function_item
-    #              #        (attribute_item (path (identifier) @attr_id))
-    #              #        name: (identifier) @name
-    #              #        (#eq? @attr_id "test")
-    #              #    ) @function
-    #              # """,
-    #         },
-    #         "node_types": {
-    #              "func_def": "function_item", "struct_def": "struct_item",
-    #              "enum_def": "enum_item", "impl_item": "impl_item",
-    #              "identifier": "identifier", "type_identifier": "type_identifier",
-    #              "field_declaration_list": "field_declaration_list", 
-    #              "enum_variant_list": "enum_variant_list", 
-    #              "block": "block", 
-    #              "line_comment": "line_comment", # Keep for basic comment node type
-    #              "block_comment": "block_comment", # Keep for basic comment node type
-    #         }
-    #     }
-    #     print("Rust tree-sitter config loaded (with problematic queries commented out).")
-    # except Exception as e:
-    #     print(f"Warning: Failed to load Rust tree-sitter config: {e}")
+        print(f"Warning: Failed to load {lang.capitalize()} tree-sitter config: {e}")
+        _failed_languages.add(lang)
+        return False
+    return True
 
+def load_language_configs():
+    """Loads every supported language up front (see `load_language_config` for the lazy path)."""
+    for lang in SUPPORTED_LANGUAGES:
+        load_language_config(lang)
     if not LANG_CONFIG:
         print("ERROR: No language configurations were successfully loaded. Exiting.")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
@@ -1,11 +1,14 @@
 # src/extract_python.py
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+import copy
 import os
+import re
 
 from .ast_utils import (
     find_child_by_field_name, get_node_text,
-    get_docstring_from_python_node, is_node_type, run_query, LANG_CONFIG # Added LANG_CONFIG
+    get_docstring_from_python_node, is_node_type, run_query, LANG_CONFIG, # Added LANG_CONFIG
+    get_python_docstring_text, run_query_matches, source_fields
 )
 
 
@@ -40,17 +43,21 @@ def _build_python_fqn(file_rel_path: str, item_name: str, parent_fqn: Optional[s
 
 
 def extract_py_signature(func_node, content_bytes: bytes) -> Dict[str, Any]:
-    sig: Dict[str, Any] = {"params": [], "return_type": "unknown", "async": False}
-    
     # Check for async (usually the first child if present)
     # tree-sitter python grammar: (function_definition "async" ... )
     is_async_node = func_node.child_by_field_name("async") # Check for async keyword by field name if grammar supports
     if not is_async_node and func_node.children and func_node.children[0].type == 'async': # Fallback for older/different grammar
          is_async_node = func_node.children[0]
-    if is_async_node:
-        sig["async"] = True
 
     param_list_node = find_child_by_field_name(func_node, "parameters")
+    return_type_node = find_child_by_field_name(func_node, "return_type")
+    return _build_py_signature(param_list_node, return_type_node, bool(is_async_node), content_bytes)
+
+def _build_py_signature(param_list_node, return_type_node, is_async: bool, content_bytes: bytes) -> Dict[str, Any]:
+    sig: Dict[str, Any] = {"params": [], "return_type": "unknown", "async": False}
+    if is_async:
+        sig["async"] = True
+
     if param_list_node:
         for child in param_list_node.named_children: 
             param_info = {"name": "_unknown_", "type": "unknown", "default_value": None}
@@ -89,7 +96,6 @@ def extract_py_signature(func_node, content_bytes: bytes) -> Dict[str, Any]:
             if param_info["name"] != "_unknown_":
                 sig["params"].append(param_info)
 
-    return_type_node = find_child_by_field_name(func_node, "return_type")
     if return_type_node: # This node is the actual type node
         sig["return_type"] = get_node_text(return_type_node, content_bytes) or "unknown"
     
@@ -101,17 +107,20 @@ def extract_py_function_details(func_node, file_path: Path, repo_root: Path, con
     func_name = get_node_text(name_node, content_bytes)
     if not func_name: return None
 
-    qualified_name = _build_python_fqn(rel_path_str, func_name, parent_fqn)
     signature = extract_py_signature(func_node, content_bytes)
-    source_code = get_node_text(func_node, content_bytes)
     body_node = find_child_by_field_name(func_node, "body")
     docstring = get_docstring_from_python_node(body_node, content_bytes) if body_node else None
+    return _build_py_function_record(func_node, func_name, signature, docstring, rel_path_str, content_bytes, parent_fqn)
+
+def _build_py_function_record(func_node, func_name: str, signature: Dict[str, Any], docstring: Optional[str],
+                              rel_path_str: str, content_bytes: bytes, parent_fqn: Optional[str]) -> Dict[str, Any]:
+    qualified_name = _build_python_fqn(rel_path_str, func_name, parent_fqn)
 
     return {
         "name": func_name, "qualified_name": qualified_name,
         "source_file": rel_path_str, "language": LANG,
         "line_start": func_node.start_point[0] + 1, "line_end": func_node.end_point[0] + 1,
-        "signature": signature, "docstring": docstring, "source_code": source_code,
+        "signature": signature, "docstring": docstring, **source_fields(func_node, content_bytes),
         "logic_ops": [], "dependencies": [], "test_specs_covering": []
     }
 
@@ -122,16 +131,9 @@ def extract_py_data_structure(class_node, file_path: Path, repo_root: Path, cont
     if not class_name: return None
 
     qualified_name = _build_python_fqn(rel_path_str, class_name, parent_fqn)
-    source_code = get_node_text(class_node, content_bytes)
     body_node = find_child_by_field_name(class_node, "body")
     docstring = get_docstring_from_python_node(body_node, content_bytes) if body_node else None
-    
-    base_classes = []
     superclasses_node = find_child_by_field_name(class_node, "superclasses") # This is argument_list node
-    if superclasses_node: # and superclasses_node.type == 'argument_list': in newer tree-sitter it is just argument_list
-        for sc_node in superclasses_node.named_children:
-            base_name = get_node_text(sc_node, content_bytes)
-            if base_name: base_classes.append(base_name)
     
     methods = []
     fields = [] 
@@ -155,11 +157,23 @@ def extract_py_data_structure(class_node, file_path: Path, repo_root: Path, cont
                         if left_node.type == 'identifier':
                              fields.append({"name": field_name_text, "type": "unknown", "scope": "class"})
 
+    return _build_py_class_record(class_node, class_name, qualified_name, superclasses_node, docstring,
+                                  fields, methods, rel_path_str, content_bytes)
+
+def _build_py_class_record(class_node, class_name: str, qualified_name: str, superclasses_node, docstring: Optional[str],
+                           fields: List[Dict[str, Any]], methods: List[Dict[str, Any]],
+                           rel_path_str: str, content_bytes: bytes) -> Dict[str, Any]:
+    base_classes = []
+    if superclasses_node: # and superclasses_node.type == 'argument_list': in newer tree-sitter it is just argument_list
+        for sc_node in superclasses_node.named_children:
+            base_name = get_node_text(sc_node, content_bytes)
+            if base_name: base_classes.append(base_name)
+
     return {
         "name": class_name, "qualified_name": qualified_name, "kind": "class",
         "source_file": rel_path_str, "language": LANG,
         "line_start": class_node.start_point[0] + 1, "line_end": class_node.end_point[0] + 1,
-        "docstring": docstring, "source_code": source_code,
+        "docstring": docstring, **source_fields(class_node, content_bytes),
         "base_classes": base_classes, "fields": fields, "methods": methods,
         "dependencies": [], "test_specs_covering": []
     }
@@ -169,18 +183,19 @@ def extract_py_test_specifications(func_node, file_path: Path, repo_root: Path,
     # The query for test_funcs in config.py identifies the function_definition node.
     # The cli.py passes this node here.
     rel_path_str = str(file_path.relative_to(repo_root))
-    specs = []
 
     name_node = find_child_by_field_name(func_node, "name")
     test_name = get_node_text(name_node, content_bytes)
     if not test_name:
         return []
-        
+    docstring = get_docstring_from_python_node(find_child_by_field_name(func_node, "body"), content_bytes)
+    return [_build_py_test_record(func_node, test_name, docstring, rel_path_str, content_bytes)]
+
+def _build_py_test_record(func_node, test_name: str, docstring: Optional[str], rel_path_str: str, content_bytes: bytes) -> Dict[str, Any]:
     # Build FQN for test function
     # Tests are usually top-level in their files, so no parent_fqn from class.
     # FQN needs to consider test file path, e.g. tests.module.test_name
-    test_module_path = rel_path_str.replace(os.sep, '.').replace('.py', '')
-    qualified_name = f"{test_module_path}.{test_name}"
+    qualified_name = f"{_py_test_module_path(rel_path_str)}.{test_name}"
 
 
     # print(f"    🧪🐍 Extracting Py test details: {test_name}")
@@ -192,11 +207,377 @@ def extract_py_test_specifications(func_node, file_path: Path, repo_root: Path,
         "language": LANG,
         "line_start": func_node.start_point[0] + 1, 
         "line_end": func_node.end_point[0] + 1,
-        "docstring": get_docstring_from_python_node(find_child_by_field_name(func_node, "body"), content_bytes),
-        "source_code": get_node_text(func_node, content_bytes),
-        "setup": [], "action": {}, "assertions": [] # Placeholders
+        "docstring": docstring,
+        **source_fields(func_node, content_bytes),
+        "setup": [], "action": {}, "assertions": [] # Filled by collect_py_references (--link-tests)
     }
-    # TODO: Extract setup, action, assertions from func_node body
-    # For assertions: Iterate body_node.children, look for 'assert_statement' or calls to assert methods.
-    specs.append(spec)
-    return specs
\ No newline at end of file
+    return spec
+
+def _py_test_module_path(rel_path_str: str) -> str:
+    return rel_path_str.replace(os.sep, '.').replace('.py', '')
+
+def _iter_py_file_records(file_record: Dict[str, Any]):
+    for struct in file_record["data_structures"]:
+        yield struct
+        yield from struct.get("methods", [])
+    yield from file_record["functions"]
+    yield from file_record["test_specifications"]
+
+def retarget_py_file_record(file_record: Dict[str, Any], rel_path_str: str, component_id: str) -> Dict[str, Any]:
+    """Copies a file record extracted from identical content elsewhere (--dedupe) onto another path.
+
+    Every qualified name, test id and parent_qualified_name starts with the component_id (or,
+    for tests and definitions nested in them, the test module path) of the file it was
+    extracted from; that prefix is swapped for the new one, which keeps nesting intact, so the
+    result equals what extracting the file at `rel_path_str` would have produced.
+    """
+    file_record = copy.deepcopy(file_record)
+    records = list(_iter_py_file_records(file_record))
+    old_rel_path_str = records[0]["source_file"] if records else rel_path_str
+    prefixes = [(file_record["component_id"], component_id),
+                (_py_test_module_path(old_rel_path_str), _py_test_module_path(rel_path_str))]
+
+    def requalify(name: str) -> str:
+        for old_prefix, new_prefix in prefixes:
+            if name == old_prefix or name.startswith(old_prefix + "."):
+                return new_prefix + name[len(old_prefix):]
+        return name
+
+    file_record["component_id"] = component_id
+    for record in records:
+        for key in ("qualified_name", "id", "parent_qualified_name"):
+            if record.get(key):
+                record[key] = requalify(record[key])
+        record["source_file"] = rel_path_str
+    return file_record
+
+
+# --- Whole-file extraction engines ---
+# Both return (data_structures, functions, test_specifications) for the module-level
+# definitions of one file; `component_id` is the FQN parent for its symbols.
+
+def extract_py_file_walk(root_node, file_path: Path, repo_root: Path, content_bytes: bytes,
+                         component_id: str, is_test_file: bool) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Extracts by walking root_node.children and looking up fields node by node."""
+    new_structs, new_funcs, new_tests = [], [], []
+    for node in root_node.children:
+        if is_node_type(node, LANG, "class_def"):
+            struct_data = extract_py_data_structure(node, file_path, repo_root, content_bytes, parent_fqn=component_id)
+            if struct_data: 
+                struct_data['language'] = LANG
+                new_structs.append(struct_data)
+        elif is_node_type(node, LANG, "func_def"):
+            name_node = find_child_by_field_name(node, "name")
+            func_name_text = get_node_text(name_node, content_bytes) or ""
+            is_test_func_by_name = func_name_text.startswith("test_")
+
+            if is_test_file or is_test_func_by_name: 
+                test_data_list = extract_py_test_specifications(node, file_path, repo_root, content_bytes) 
+                if test_data_list: new_tests.extend(test_data_list)
+            else:
+                func_data = extract_py_function_details(node, file_path, repo_root, content_bytes, parent_fqn=component_id)
+                if func_data: 
+                    func_data['language'] = LANG
+                    new_funcs.append(func_data)
+    return new_structs, new_funcs, new_tests
+
+def extract_py_file_query(root_node, file_path: Path, repo_root: Path, content_bytes: bytes,
+                          component_id: str, is_test_file: bool) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Extracts from one run of the combined 'definitions' query (see config.load_language_configs).
+
+    tree-sitter matches and buckets names, parameters, return types, bodies, docstrings,
+    bases and class fields natively; records are then built straight from the capture
+    dicts. Produces the same records as `extract_py_file_walk`.
+    """
+    rel_path_str = str(file_path.relative_to(repo_root))
+    top_level: List[Tuple[int, str, Dict[str, Any]]] = [] # (start_byte, kind, captures)
+    methods_by_class: Dict[int, List[Tuple[int, Dict[str, Any]]]] = {}
+    fields_by_class: Dict[int, List[Tuple[int, Any]]] = {}
+
+    for _, captures in run_query_matches("definitions", LANG, root_node):
+        if "function.definition" in captures:
+            top_level.append((captures["function.definition"].start_byte, "function", captures))
+        elif "class.definition" in captures:
+            top_level.append((captures["class.definition"].start_byte, "class", captures))
+        elif "method.definition" in captures:
+            methods_by_class.setdefault(captures["method.class"].id, []).append(
+                (captures["method.definition"].start_byte, captures))
+        elif "field.name" in captures:
+            fields_by_class.setdefault(captures["field.class"].id, []).append(
+                (captures["field.name"].start_byte, captures["field.name"]))
+
+    new_structs, new_funcs, new_tests = [], [], []
+    for _, kind, captures in sorted(top_level, key=lambda item: item[0]):
+        if kind == "class":
+            class_node = captures["class.definition"]
+            class_name = get_node_text(captures["class.name"], content_bytes)
+            if not class_name: continue
+            qualified_name = _build_python_fqn(rel_path_str, class_name, component_id)
+            methods = []
+            for _, method_captures in sorted(methods_by_class.get(class_node.id, []), key=lambda item: item[0]):
+                method_record = _py_function_record_from_captures(method_captures, "method", rel_path_str, content_bytes, qualified_name)
+                if method_record: methods.append(method_record)
+            fields = []
+            for _, field_name_node in sorted(fields_by_class.get(class_node.id, []), key=lambda item: item[0]):
+                field_name_text = get_node_text(field_name_node, content_bytes)
+                if field_name_text:
+                    fields.append({"name": field_name_text, "type": "unknown", "scope": "class"})
+            docstring = get_python_docstring_text(captures.get("class.docstring"), content_bytes)
+            new_structs.append(_build_py_class_record(class_node, class_name, qualified_name, captures.get("class.superclasses"),
+                                                      docstring, fields, methods, rel_path_str, content_bytes))
+        else:
+            func_name_text = get_node_text(captures["function.name"], content_bytes) or ""
+            if is_test_file or func_name_text.startswith("test_"):
+                if not func_name_text: continue
+                docstring = get_python_docstring_text(captures.get("function.docstring"), content_bytes)
+                new_tests.append(_build_py_test_record(captures["function.definition"], func_name_text, docstring,
+                                                       rel_path_str, content_bytes))
+            else:
+                func_record = _py_function_record_from_captures(captures, "function", rel_path_str, content_bytes, component_id)
+                if func_record: new_funcs.append(func_record)
+    return new_structs, new_funcs, new_tests
+
+def _py_function_record_from_captures(captures: Dict[str, Any], prefix: str, rel_path_str: str,
+                                      content_bytes: bytes, parent_fqn: str) -> Optional[Dict[str, Any]]:
+    func_name = get_node_text(captures[f"{prefix}.name"], content_bytes)
+    if not func_name: return None
+    signature = _build_py_signature(captures.get(f"{prefix}.parameters"), captures.get(f"{prefix}.return_type"),
+                                    f"{prefix}.async" in captures, content_bytes)
+    docstring = get_python_docstring_text(captures.get(f"{prefix}.docstring"), content_bytes)
+    return _build_py_function_record(captures[f"{prefix}.definition"], func_name, signature, docstring,
+                                     rel_path_str, content_bytes, parent_fqn)
+
+# Statement nodes that can contain definitions. The cursor engine descends only into these
+# (plus definition bodies); expressions, parameter lists and other leaves cannot hold a def.
+_PY_CURSOR_DESCEND_TYPES = frozenset({
+    "module", "block", "decorated_definition", "function_definition", "class_definition",
+    "if_statement", "elif_clause", "else_clause", "try_statement", "except_clause", "except_group_clause",
+    "finally_clause", "with_statement", "for_statement", "while_statement", "match_statement", "case_clause",
+})
+
+def extract_py_file_cursor(root_node, file_path: Path, repo_root: Path, content_bytes: bytes,
+                           component_id: str, is_test_file: bool) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Extracts definitions at any depth in one TreeCursor pass, keeping an explicit FQN stack.
+
+    Unlike the walk/query engines this also finds nested classes, closures, decorated
+    definitions and definitions under `if TYPE_CHECKING:`/`try:`/`with` blocks. Functions
+    whose nearest enclosing definition is a class become its methods; module-level records
+    are identical to the walk engine's. Definitions nested inside another function or class
+    (other than methods) are emitted in the component's lists with `parent_qualified_name`.
+    Only statement-level nodes are visited, each once, so the pass is linear in node count.
+    """
+    rel_path_str = str(file_path.relative_to(repo_root))
+    new_structs, new_funcs, new_tests = [], [], []
+    # Scope stack entries: (kind, qualified_name, record, depth of the definition node)
+    scopes: List[Tuple[str, str, Optional[Dict[str, Any]], int]] = [("module", component_id, None, -1)]
+    cursor = root_node.walk()
+    depth = 0
+
+    while True:
+        node = cursor.node
+        node_type = node.type
+        pushed_scope = False
+        scope_kind, scope_fqn, scope_record, scope_depth = scopes[-1]
+
+        if node_type == "function_definition" or node_type == "class_definition":
+            name = get_node_text(node.child_by_field_name("name"), content_bytes)
+            body_node = node.child_by_field_name("body")
+            if name:
+                docstring = get_docstring_from_python_node(body_node, content_bytes) if body_node else None
+                if node_type == "class_definition":
+                    qualified_name = _build_python_fqn(rel_path_str, name, scope_fqn)
+                    record = _build_py_class_record(node, name, qualified_name, node.child_by_field_name("superclasses"),
+                                                    docstring, [], [], rel_path_str, content_bytes)
+                    if scope_kind != "module":
+                        record["parent_qualified_name"] = scope_fqn
+                    new_structs.append(record)
+                    scopes.append(("class", qualified_name, record, depth))
+                elif scope_kind == "module" and (is_test_file or name.startswith("test_")):
+                    record = _build_py_test_record(node, name, docstring, rel_path_str, content_bytes)
+                    new_tests.append(record)
+                    scopes.append(("function", record["qualified_name"], record, depth))
+                else:
+                    signature = extract_py_signature(node, content_bytes)
+                    record = _build_py_function_record(node, name, signature, docstring, rel_path_str, content_bytes, scope_fqn)
+                    if scope_kind == "class":
+                        scope_record["methods"].append(record)
+                    else:
+                        if scope_kind != "module":
+                            record["parent_qualified_name"] = scope_fqn
+                        new_funcs.append(record)
+                    scopes.append(("function", record["qualified_name"], record, depth))
+                pushed_scope = True
+        elif node_type == "expression_statement" and scope_kind == "class" and depth == scope_depth + 2:
+            # Direct statement of the class body (class -> block -> statement), as in extract_py_data_structure
+            assign_node = node.named_child(0)
+            if assign_node is not None and assign_node.type == "assignment":
+                left_node = assign_node.child_by_field_name("left")
+                if left_node is not None and left_node.type == "identifier":
+                    scope_record["fields"].append({"name": get_node_text(left_node, content_bytes), "type": "unknown", "scope": "class"})
+
+        if node_type in _PY_CURSOR_DESCEND_TYPES and cursor.goto_first_child():
+            depth += 1
+            continue
+        if pushed_scope:
+            scopes.pop()
+        while not cursor.goto_next_sibling():
+            if not cursor.goto_parent():
+                return new_structs, new_funcs, new_tests
+            depth -= 1
+            if scopes[-1][3] == depth:
+                scopes.pop() # Leaving the definition that opened this scope
+
+# --- Reference collection (--resolve-deps) ---
+_DOTTED_NAME_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)+")
+# Parents whose identifier children (or named fields) bind names rather than reference them
+_PY_BINDING_PARENT_TYPES = frozenset({"parameters", "typed_parameter", "list_splat_pattern", "dictionary_splat_pattern", "lambda_parameters"})
+_PY_BINDING_FIELDS = {"default_parameter": "name", "typed_default_parameter": "name", "keyword_argument": "name",
+                      "function_definition": "name", "class_definition": "name", "attribute": "attribute"}
+
+def _is_py_binding_identifier(node) -> bool:
+    parent = node.parent
+    if parent is None:
+        return False
+    if parent.type in _PY_BINDING_PARENT_TYPES:
+        return True
+    field = _PY_BINDING_FIELDS.get(parent.type)
+    if field is None:
+        return False
+    field_node = parent.child_by_field_name(field)
+    return field_node is not None and field_node.id == node.id
+
+def _add_py_import(node, content_bytes: bytes, imports: Dict[str, str], targets: List[str]):
+    """Adds one import statement's bindings (local name -> dotted target) to `imports` and
+    the full dotted names it imports (`a.b`, `pkg.mod.name`) to `targets`.
+
+    Relative targets keep their leading dots; they are resolved against the file's package
+    when the record is merged (symbols.resolve_relative_import).
+    """
+    module = ""
+    if node.type == "import_from_statement":
+        module_node = node.child_by_field_name("module_name")
+        module = get_node_text(module_node, content_bytes) or ""
+        if node.child_by_field_name("name") is None: # `from x import *`
+            targets.append(module)
+    for name_node in node.children_by_field_name("name"):
+        if name_node.type == "aliased_import":
+            imported = get_node_text(name_node.child_by_field_name("name"), content_bytes)
+            local = get_node_text(name_node.child_by_field_name("alias"), content_bytes)
+        else:
+            imported = get_node_text(name_node, content_bytes)
+            local = None
+        if not imported:
+            continue
+        if node.type == "import_from_statement":
+            target = f"{module}{imported}" if module.endswith(".") else f"{module}.{imported}"
+            imports[local or imported.split(".")[-1]] = target
+            targets.append(target)
+            continue
+        targets.append(imported)
+        if local:
+            imports[local] = imported # `import a.b as c` binds c to a.b
+        else:
+            head = imported.split(".")[0] # `import a.b` binds a
+            imports[head] = head
+
+def collect_py_imports(root_node, content_bytes: bytes) -> Tuple[Dict[str, str], List[str]]:
+    """Import table and imported names of a file (see `_add_py_import`), from the 'imports' query."""
+    imports: Dict[str, str] = {}
+    targets: List[str] = []
+    for node, _ in run_query("imports", LANG, root_node):
+        _add_py_import(node, content_bytes, imports, targets)
+    return imports, targets
+
+def _py_test_setup(func_node, content_bytes: bytes) -> List[str]:
+    """Assignments at the top of a test body, up to its first assertion."""
+    setup = []
+    body_node = func_node.child_by_field_name("body")
+    for statement in (body_node.named_children if body_node else ()):
+        if statement.type == "assert_statement":
+            break
+        if statement.type != "expression_statement":
+            continue
+        expression = statement.named_child(0)
+        if expression is None:
+            continue
+        if expression.type == "call":
+            callee = get_node_text(expression.child_by_field_name("function"), content_bytes) or ""
+            if callee.rsplit(".", 1)[-1].startswith("assert"):
+                break
+        elif expression.type in ("assignment", "augmented_assignment"):
+            setup.append(get_node_text(statement, content_bytes))
+    return setup
+
+def collect_py_references(root_node, content_bytes: bytes, records: List[Dict[str, Any]]) -> Tuple[Dict[str, str], List[str]]:
+    """Adds `references` (names and dotted attribute chains used in the body) to each record
+    and returns the file's import table and imported names, as `collect_py_imports` does.
+    Test records among `records` also get their `setup` (leading assignments), `action`
+    (`{"calls": [...]}`, callees in order) and `assertions` (assert statements and
+    `assert*` method calls) filled in.
+
+    One run of the 'references' query; captures arrive in document order, so an explicit
+    stack of open definitions attributes each name to its innermost record (definitions without
+    a record, e.g. closures under the walk engine, report to their parent). Bound names
+    (parameters, keyword arguments, definition names) are skipped; unresolvable names are
+    dropped later by the symbols module.
+    """
+    records_by_position = {(record["line_start"], record.get("name") or record.get("scenario")): record for record in records}
+    imports: Dict[str, str] = {}
+    targets: List[str] = []
+    module_refs: Dict[str, None] = {}
+    # (end_byte, references of the innermost record, innermost test record or None)
+    scopes: List[Tuple[int, Dict[str, None], Optional[Dict[str, Any]]]] = []
+    test_calls: Dict[int, Dict[str, None]] = {} # id(test record) -> callees
+    skip_until = 0 # End of the current import statement or already recorded attribute chain
+
+    for node, capture_name in run_query("references", LANG, root_node):
+        start_byte = node.start_byte
+        if start_byte < skip_until:
+            continue
+        while scopes and start_byte >= scopes[-1][0]:
+            scopes.pop()
+        refs, test_record = (scopes[-1][1], scopes[-1][2]) if scopes else (module_refs, None)
+        if capture_name == "import":
+            _add_py_import(node, content_bytes, imports, targets)
+            skip_until = node.end_byte
+        elif capture_name == "def":
+            name = get_node_text(node.child_by_field_name("name"), content_bytes)
+            record = records_by_position.get((node.start_point[0] + 1, name))
+            if record is not None:
+                refs = {}
+                record["references"] = refs
+                if "assertions" in record:
+                    test_record = record
+                    record["setup"] = _py_test_setup(node, content_bytes)
+                    test_calls[id(record)] = {}
+            scopes.append((node.end_byte, refs, test_record))
+        elif capture_name == "assert":
+            if test_record is not None:
+                test_record["assertions"].append(get_node_text(node, content_bytes))
+        elif capture_name == "call":
+            if test_record is not None:
+                callee = get_node_text(node.child_by_field_name("function"), content_bytes) or ""
+                if callee.rsplit(".", 1)[-1].startswith("assert"):
+                    test_record["assertions"].append(get_node_text(node, content_bytes))
+                elif callee.isidentifier() or _DOTTED_NAME_RE.fullmatch(callee):
+                    test_calls[id(test_record)][callee] = None
+        elif node.type == "attribute":
+            text = get_node_text(node, content_bytes)
+            if text and _DOTTED_NAME_RE.fullmatch(text) and not _is_py_binding_identifier(node):
+                refs[text] = None
+                skip_until = node.end_byte
+            # Otherwise (e.g. `f().x`) the inner names are visited on their own
+        elif not _is_py_binding_identifier(node):
+            refs[get_node_text(node, content_bytes)] = None
+
+    for record in records:
+        record["references"] = list(record.get("references", ()))
+        if id(record) in test_calls:
+            record["action"] = {"calls": list(test_calls[id(record)])}
+    return imports, targets
+
+PY_FILE_ENGINES = {
+    "query": extract_py_file_query,
+    "walk": extract_py_file_walk,
+    "cursor": extract_py_file_cursor,
+}
@@ -1,26 +1,41 @@
 # src/extract_rust.py
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import os
 import sys
 
 from .ast_utils import (
     find_child_by_field_name, get_node_text,
-    get_docstring_from_rust_node, is_node_type, run_query
+    get_docstring_from_rust_node, is_node_type, run_query, source_fields
 )
 
 LANG = "rust"
 
+def _rust_module_parts(rel_path_str: str) -> List[str]:
+    """Module path of the file: mod.rs/lib.rs name their directory, `src` is dropped."""
+    module_path_parts = list(Path(rel_path_str).parts)
+    if module_path_parts[-1] == 'mod.rs' or module_path_parts[-1] == 'lib.rs':
+        module_path_parts.pop()
+    elif module_path_parts[-1].endswith('.rs'):
+        module_path_parts[-1] = module_path_parts[-1][:-3]
+    return [part for part in module_path_parts if part and part != 'src']
+
+def _build_rust_fqn(rel_path_str: str, item_name: str, inline_modules: Tuple[str, ...] = ()) -> str:
+    """Module path of the file, any inline `mod` blocks, then the item name, joined with `::`."""
+    return "::".join(_rust_module_parts(rel_path_str) + list(inline_modules) + [item_name])
+
 def extract_rs_signature(func_node, content_bytes: bytes) -> Dict[str, Any]:
     sig: Dict[str, Any] = {"params": [], "return_type": "unknown", "async": False, "unsafe": False}
     
     # Check for async/unsafe keywords (simplistic check, might need refinement based on grammar)
     # Rust grammar: function_item children can include "async" "unsafe" "fn"
     for child in func_node.children:
-        if child.type == 'async':
-            sig["async"] = True
-        elif child.type == 'unsafe':
-            sig["unsafe"] = True
+        modifiers = child.children if child.type == 'function_modifiers' else [child]
+        for modifier in modifiers:
+            if modifier.type == 'async':
+                sig["async"] = True
+            elif modifier.type == 'unsafe':
+                sig["unsafe"] = True
             
     param_list_node = find_child_by_field_name(func_node, "parameters")
     if param_list_node:
@@ -48,42 +63,43 @@ def extract_rs_function_details(func_node, file_path: Path, repo_root: Path, con
     if not func_name:
         return None
 
-    signature = extract_rs_signature(func_node, content_bytes)
-    source_code = get_node_text(func_node, content_bytes)
-    docstring = get_docstring_from_rust_node(func_node, content_bytes)
-    
-    # Basic FQN construction for Rust
-    module_path_parts = list(Path(rel_path_str).parts)
-    if module_path_parts[-1] == 'mod.rs' or module_path_parts[-1] == 'lib.rs':
-        module_path_parts.pop()
-    elif module_path_parts[-1].endswith('.rs'):
-        module_path_parts[-1] = module_path_parts[-1][:-3]
-    
-    fqn_parts = [part for part in module_path_parts if part and part != 'src']
-    # Attempt to get crate name from repo_ir, fallback to repo_name
-    # This part is tricky without full context, might need passing repo_name or metadata
-    # crate_name = repo_ir.get("project_name", repo_root.name)
-    # if fqn_parts and fqn_parts[0] != crate_name:
-    #    fqn_parts.insert(0, crate_name) # Crude prepend of crate name
-    fqn_parts.append(func_name)
-    qualified_name = "::".join(fqn_parts)
-
+    return _build_rs_function_record(func_node, func_name, _build_rust_fqn(rel_path_str, func_name), rel_path_str, content_bytes)
 
+def _build_rs_function_record(func_node, func_name: str, qualified_name: str, rel_path_str: str, content_bytes: bytes) -> Dict[str, Any]:
     return {
         "name": func_name,
         "qualified_name": qualified_name,
         "source_file": rel_path_str,
+        "language": LANG,
         "line_start": func_node.start_point[0] + 1,
         "line_end": func_node.end_point[0] + 1,
-        "signature": signature,
-        "docstring": docstring,
-        "source_code": source_code,
+        "signature": extract_rs_signature(func_node, content_bytes),
+        "docstring": get_docstring_from_rust_node(func_node, content_bytes),
+        **source_fields(func_node, content_bytes),
         "logic_ops": [], # Placeholder
         "dependencies": [], # Placeholder
         "test_specs_covering": []
     }
 
-def extract_rs_data_structure(ds_node, file_path: Path, repo_root: Path, content_bytes: bytes) -> Optional[Dict[str, Any]]:
+def _rs_field_list(body_node, content_bytes: bytes) -> List[Dict[str, Any]]:
+    """Fields of a `{ name: T }` body, or of a `(T, U)` body named by position ("0", "1")."""
+    fields = []
+    if body_node is None:
+        return fields
+    if body_node.type == "field_declaration_list":
+        for field_decl_node in body_node.children:
+            if field_decl_node.type == "field_declaration":
+                field_name = get_node_text(find_child_by_field_name(field_decl_node, "name"), content_bytes)
+                field_type = get_node_text(find_child_by_field_name(field_decl_node, "type"), content_bytes)
+                if field_name:
+                    fields.append({"name": field_name, "type": field_type or "unknown"})
+    elif body_node.type == "ordered_field_declaration_list":
+        for position, type_node in enumerate(body_node.children_by_field_name("type")):
+            fields.append({"name": str(position), "type": get_node_text(type_node, content_bytes) or "unknown"})
+    return fields
+
+def extract_rs_data_structure(ds_node, file_path: Path, repo_root: Path, content_bytes: bytes,
+                              inline_modules: Tuple[str, ...] = ()) -> Optional[Dict[str, Any]]:
     rel_path_str = str(file_path.relative_to(repo_root))
     kind = "unknown"
     name_node = find_child_by_field_name(ds_node, "name") # 'name' is common for struct_item, enum_item
@@ -97,7 +113,6 @@ def extract_rs_data_structure(ds_node, file_path: Path, repo_root: Path, content
     if not name:
         return None
 
-    source_code = get_node_text(ds_node, content_bytes)
     docstring = get_docstring_from_rust_node(ds_node, content_bytes)
 
     fields = []
@@ -105,16 +120,7 @@ def extract_rs_data_structure(ds_node, file_path: Path, repo_root: Path, content
     methods = [] # Will be populated by finding associated impl blocks
 
     if kind == "struct":
-        body_node = find_child_by_field_name(ds_node, "body") # field_declaration_list
-        if body_node and body_node.type == "field_declaration_list":
-            for field_decl_node in body_node.children:
-                if field_decl_node.type == "field_declaration":
-                    field_name_node = find_child_by_field_name(field_decl_node, "name")
-                    field_type_node = find_child_by_field_name(field_decl_node, "type")
-                    field_name = get_node_text(field_name_node, content_bytes)
-                    field_type = get_node_text(field_type_node, content_bytes)
-                    if field_name:
-                        fields.append({"name": field_name, "type": field_type or "unknown"})
+        fields = _rs_field_list(find_child_by_field_name(ds_node, "body"), content_bytes)
     elif kind == "enum":
         body_node = find_child_by_field_name(ds_node, "body") # enum_variant_list
         if body_node and body_node.type == "enum_variant_list":
@@ -123,32 +129,22 @@ def extract_rs_data_structure(ds_node, file_path: Path, repo_root: Path, content
                     variant_name_node = find_child_by_field_name(variant_node, "name")
                     variant_name = get_node_text(variant_name_node, content_bytes)
                     if variant_name:
-                        # TODO: extract variant fields if any (tuple or struct variant)
-                        variants.append({"name": variant_name, "fields": []})
-    
-    # Basic FQN construction
-    module_path_parts = list(Path(rel_path_str).parts)
-    if module_path_parts[-1] == 'mod.rs' or module_path_parts[-1] == 'lib.rs':
-        module_path_parts.pop()
-    elif module_path_parts[-1].endswith('.rs'):
-        module_path_parts[-1] = module_path_parts[-1][:-3]
+                        variant_fields = _rs_field_list(find_child_by_field_name(variant_node, "body"), content_bytes)
+                        variants.append({"name": variant_name, "fields": variant_fields})
     
-    fqn_parts = [part for part in module_path_parts if part and part != 'src']
-    fqn_parts.append(name)
-    qualified_name = "::".join(fqn_parts)
-
     return {
         "name": name,
-        "qualified_name": qualified_name,
+        "qualified_name": _build_rust_fqn(rel_path_str, name, inline_modules),
         "kind": kind,
         "source_file": rel_path_str,
+        "language": LANG,
         "line_start": ds_node.start_point[0] + 1,
         "line_end": ds_node.end_point[0] + 1,
         "docstring": docstring,
-        "source_code": source_code,
+        **source_fields(ds_node, content_bytes),
         "fields": fields,
         "variants": variants,
-        "methods": methods, # To be populated later if we parse impl blocks
+        "methods": methods, # Filled from impl blocks by attach_rs_impl_methods
         "dependencies": [],
         "test_specs_covering": []
     }
@@ -168,13 +164,192 @@ def extract_rs_test_specifications(root_node, file_path: Path, repo_root: Path,
             test_name = get_node_text(name_node, content_bytes)
             if not test_name:
                 continue
+            specs.append(_build_rs_test_record(func_node, test_name, _build_rust_fqn(rel_path_str, test_name), rel_path_str, content_bytes))
+    return specs
+
+def _build_rs_test_record(func_node, test_name: str, qualified_name: str, rel_path_str: str, content_bytes: bytes) -> Dict[str, Any]:
+    return {
+        "id": f"{rel_path_str}::{test_name}", # Basic ID
+        "source_file": rel_path_str,
+        "scenario": test_name,
+        "qualified_name": qualified_name,
+        "language": LANG,
+        "line_start": func_node.start_point[0] + 1,
+        "line_end": func_node.end_point[0] + 1,
+        "docstring": get_docstring_from_rust_node(func_node, content_bytes),
+        **source_fields(func_node, content_bytes),
+        "setup": [], "action": {}, "assertions": [] # Placeholders
+    }
+
+# --- Whole-file extraction ---
+_RS_ITEM_CONTAINER_TYPES = ("source_file", "declaration_list")
+
+def _rs_type_path(type_node, content_bytes: bytes) -> Optional[List[str]]:
+    """`["a", "b", "Foo"]` for the type of `impl a::b::Foo`, `["Foo"]` for `impl Foo`, `impl<T> Foo<T>`
+    or `impl Trait for &Foo`."""
+    while type_node is not None and type_node.type in ("generic_type", "reference_type", "pointer_type"):
+        type_node = type_node.child_by_field_name("type")
+    if type_node is None:
+        return None
+    path_text = get_node_text(type_node, content_bytes)
+    if not path_text or type_node.type not in ("type_identifier", "scoped_type_identifier"):
+        return [path_text] if path_text else None
+    return [segment.strip() for segment in path_text.split("::")]
+
+def _resolve_rs_type_path(segments: List[str], module_parts: List[str]) -> Optional[str]:
+    """Qualified name the type path of an impl names, relative to the impl's module
+    (`self::`/`super::` handled); None for `crate::`/`::`-rooted paths."""
+    parts = list(module_parts)
+    for segment in segments[:-1]:
+        if segment == "super":
+            if not parts:
+                return None
+            parts.pop()
+        elif segment in ("crate", ""):
+            return None
+        elif segment != "self":
+            parts.append(segment)
+    return "::".join(parts + [segments[-1]])
+
+def _is_rs_test_function(func_node, content_bytes: bytes) -> bool:
+    """True if an attribute directly above the fn is `#[test]` or `#[<runtime>::test]`."""
+    sibling = func_node.prev_named_sibling
+    while sibling is not None and sibling.type in ("attribute_item", "line_comment", "block_comment"):
+        if sibling.type == "attribute_item":
+            attribute = get_node_text(sibling, content_bytes) or ""
+            path = attribute[2:-1].split("(", 1)[0].strip() # #[tokio::test(flavor = ...)] -> tokio::test
+            if path == "test" or path.endswith("::test"):
+                return True
+        sibling = sibling.prev_named_sibling
+    return False
+
+def extract_rs_file(root_node, file_path: Path, repo_root: Path, content_bytes: bytes,
+                    is_test_file: bool) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Extracts items of one file from a single run of the combined 'definitions' query.
+
+    Returns (data_structures, functions, test_specifications, impls). Items directly in the
+    file or in inline `mod` blocks are kept (qualified through the module names); items inside
+    function bodies are not. Functions marked `#[test]` (or in test files) become test specs.
+    Each impl is {type_name, type_path, trait, methods} with methods not yet attached to their
+    type: the type may live in another file of the crate (see `attach_rs_impl_methods`).
+    `type_path` is the qualified name the impl's type resolves to from the impl's own module
+    (file plus inline `mod` blocks), when the path is module-relative.
+    """
+    rel_path_str = str(file_path.relative_to(repo_root))
+    file_module_parts = _rust_module_parts(rel_path_str)
+    new_structs, new_funcs, new_tests, impls = [], [], [], []
+    # Open `mod`/`impl` blocks: (end_byte, kind, node id of the block's declaration_list, mod name or impl entry)
+    scopes: List[Tuple[int, str, int, Any]] = []
+
+    for node, capture_name in run_query("definitions", LANG, root_node):
+        if not capture_name.endswith(".definition"):
+            continue
+        while scopes and node.start_byte >= scopes[-1][0]:
+            scopes.pop()
+        parent = node.parent
+        if parent is None or parent.type not in _RS_ITEM_CONTAINER_TYPES:
+            continue # Nested in a function body or expression
+        if parent.type == "declaration_list" and (not scopes or scopes[-1][2] != parent.id):
+            continue # Inside a block we are not tracking (e.g. a trait or an item nested in a skipped one)
+        inline_modules = tuple(scope[3] for scope in scopes if scope[1] == "mod")
+        in_impl = bool(scopes) and scopes[-1][1] == "impl"
+        body_node = node.child_by_field_name("body")
+
+        if capture_name == "mod.definition":
+            name = get_node_text(node.child_by_field_name("name"), content_bytes)
+            if name and body_node is not None and not in_impl:
+                scopes.append((node.end_byte, "mod", body_node.id, name))
+        elif capture_name == "impl.definition":
+            type_path = _rs_type_path(node.child_by_field_name("type"), content_bytes)
+            if type_path and body_node is not None and not in_impl:
+                trait_node = node.child_by_field_name("trait")
+                impl = {"type_name": type_path[-1],
+                        "type_path": _resolve_rs_type_path(type_path, file_module_parts + list(inline_modules)),
+                        "trait": get_node_text(trait_node, content_bytes) if trait_node else None,
+                        "methods": []}
+                impls.append(impl)
+                scopes.append((node.end_byte, "impl", body_node.id, impl))
+        elif capture_name == "function.definition":
+            name = get_node_text(node.child_by_field_name("name"), content_bytes)
+            if not name:
+                continue
+            if in_impl:
+                impl = scopes[-1][3]
+                qualified_name = _build_rust_fqn(rel_path_str, f"{impl['type_name']}::{name}", inline_modules)
+                record = _build_rs_function_record(node, name, qualified_name, rel_path_str, content_bytes)
+                if impl["trait"]:
+                    record["impl_trait"] = impl["trait"]
+                impl["methods"].append(record)
+            elif is_test_file or _is_rs_test_function(node, content_bytes):
+                new_tests.append(_build_rs_test_record(node, name, _build_rust_fqn(rel_path_str, name, inline_modules),
+                                                       rel_path_str, content_bytes))
+            else:
+                new_funcs.append(_build_rs_function_record(node, name, _build_rust_fqn(rel_path_str, name, inline_modules),
+                                                           rel_path_str, content_bytes))
+        elif not in_impl: # struct/enum
+            struct_data = extract_rs_data_structure(node, file_path, repo_root, content_bytes, inline_modules)
+            if struct_data:
+                new_structs.append(struct_data)
+    return new_structs, new_funcs, new_tests, impls
+
+_crate_roots: Dict[Tuple[Path, Path], str] = {} # (directory, analysis root) -> crate root relative to the analysis root
+
+def find_crate_root(file_path: Path, repo_root: Path) -> str:
+    """Directory (relative to repo_root, "" for the root itself) of the nearest Cargo.toml above
+    file_path; memoized per directory so each directory is checked once per process."""
+    directory = file_path.parent
+    key = (directory, repo_root)
+    if key not in _crate_roots:
+        if directory == repo_root or repo_root not in directory.parents:
+            _crate_roots[key] = ""
+        elif (directory / "Cargo.toml").is_file():
+            _crate_roots[key] = str(directory.relative_to(repo_root))
+        else:
+            _crate_roots[key] = find_crate_root(directory, repo_root)
+    return _crate_roots[key]
 
-            # print(f"    🧪🦀 Found Rs test: {test_name}")
-            spec = {
-                "id": f"{rel_path_str}::{test_name}", # Basic ID
-                "source_file": rel_path_str,
-                "scenario": test_name,
-                "setup": [], "action": {}, "assertions": [] # Placeholders
-            }
-            specs.append(spec)
-    return specs
\ No newline at end of file
+def attach_rs_impl_methods(components: List[Dict[str, Any]]) -> int:
+    """Moves each component's pending `rust_impls` methods onto their struct/enum.
+
+    One pass builds per-crate hash indexes ((crate, qualified_name) and (crate, type name) ->
+    records); each impl is then a dict lookup. The impl's module-qualified `type_path` wins
+    (`impl Point` inside `mod inner` is `inner::Point`, even with another `Point` in the file).
+    Otherwise (types brought in with `use`) a type of that name in the impl's own component
+    wins, and failing that the name must be unique in the crate.
+    Methods of impls whose type is not found (foreign types, ambiguous names) are kept as the
+    component's functions. Methods are
+    re-qualified under the type's qualified_name. Types that gain methods are replaced by copies,
+    so per-file records held elsewhere (watch mode) are not modified. Returns the number of
+    methods attached.
+    """
+    types_by_path: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    types_by_crate: Dict[Tuple[str, str], List[Tuple[str, Dict[str, Any]]]] = {}
+    for component in components:
+        crate = component.get("rust_crate")
+        if crate is None:
+            continue
+        for struct in component.get("data_structures", []):
+            types_by_path.setdefault((crate, struct["qualified_name"]), struct)
+            types_by_crate.setdefault((crate, struct["name"]), []).append((component["component_id"], struct))
+
+    attached_methods: Dict[int, List[Dict[str, Any]]] = {} # id(struct) -> impl methods
+    for component in components:
+        crate = component.pop("rust_crate", None)
+        for impl in component.pop("rust_impls", []):
+            target = types_by_path.get((crate, impl.get("type_path")))
+            if target is None:
+                candidates = types_by_crate.get((crate, impl["type_name"]), [])
+                local = [struct for component_id, struct in candidates if component_id == component["component_id"]]
+                target = local[0] if local else (candidates[0][1] if len(candidates) == 1 else None)
+            if target is None:
+                component["functions"].extend(impl["methods"])
+                continue
+            for method in impl["methods"]:
+                method["qualified_name"] = f"{target['qualified_name']}::{method['name']}"
+            attached_methods.setdefault(id(target), []).extend(impl["methods"])
+    if attached_methods:
+        for component in components:
+            component["data_structures"] = [
+                {**struct, "methods": struct["methods"] + attached_methods[id(struct)]} if id(struct) in attached_methods else struct
+                for struct in component.get("data_structures", [])]
+    return sum(len(methods) for methods in attached_methods.values())
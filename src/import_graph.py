@@ -0,0 +1,146 @@
+# src/import_graph.py
+# Module-level import graph between components: edge resolution, SCCs and topological order (--emit-import-graph).
+
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
+
+class ModuleResolver:
+    """Maps dotted import targets to component_ids of the analyzed targets, memoized per target.
+
+    An absolute import is a module path as Python would find it on sys.path. For a package
+    target (an installed library, or a repository whose root has an `__init__.py`) that path
+    must start with the target's own name (`_pytest.pathlib`, never `pathlib`); for a
+    repository it is relative to the repository root (`pkg.mod` -> `pkg/mod.py`). The longest
+    dotted prefix that names a module wins, so `from pkg.mod import name` finds `pkg.mod`.
+    Paths become component_ids through the same function the extraction uses
+    (cli.find_component_id_for_lib), so both sides agree on package files. Relative imports
+    are resolved against the importing component beforehand and are already component_ids.
+    """
+
+    def __init__(self, component_ids: Iterable[str], target_names: List[str],
+                 component_id_for_path: Callable[[str, str], str], package_targets: Iterable[str] = ()):
+        self.component_ids = set(component_ids)
+        self.target_names = target_names
+        self.package_targets = set(package_targets)
+        self.component_id_for_path = component_id_for_path
+        self._memo: Dict[str, Optional[Tuple[str, int]]] = {}
+
+    def _lookup(self, parts: List[str]) -> Optional[str]:
+        for target_name in self.target_names:
+            if target_name in self.package_targets:
+                if parts[0] != target_name:
+                    continue
+                rel_parts = parts[1:]
+            else:
+                rel_parts = parts
+            rel_path_str = os.sep.join(rel_parts) + ".py" if rel_parts else "__init__.py"
+            component_id = self.component_id_for_path(rel_path_str, target_name)
+            if component_id in self.component_ids:
+                return component_id
+        return None
+
+    def split(self, target: str, relative: bool = False) -> Optional[Tuple[str, List[str]]]:
+        """(component_id, remaining attribute parts) for the longest dotted prefix of `target`
+        that names a module: `pkg.mod.Parser.parse` -> (`<id of pkg.mod>`, ["Parser", "parse"]).
+        `relative` targets (resolved relative imports) are already component_ids."""
+        memo_key = ("." if relative else "") + target
+        if memo_key not in self._memo:
+            parts = target.split(".")
+            found = None
+            for n in range(len(parts), 0, -1):
+                component_id = ".".join(parts[:n]) if relative else self._lookup(parts[:n])
+                if component_id in self.component_ids:
+                    found = (component_id, n)
+                    break
+            self._memo[memo_key] = found
+        found = self._memo[memo_key]
+        return (found[0], target.split(".")[found[1]:]) if found else None
+
+    def resolve(self, target: str, relative: bool = False) -> Optional[str]:
+        found = self.split(target, relative)
+        return found[0] if found else None
+
+def link_component_imports(components: List[Dict[str, Any]], resolver: ModuleResolver) -> int:
+    """Replaces each component's collected `import_targets` ((name, is_relative) pairs) with
+    `imports`: the component_ids it imports (first-import order, no self edges). Imports
+    outside the analyzed targets are dropped. Returns the number of edges."""
+    edges = 0
+    for component in components:
+        imports: Dict[str, None] = {}
+        for target, relative in component.pop("import_targets", ()):
+            component_id = resolver.resolve(target, relative)
+            if component_id and component_id != component["component_id"]:
+                imports[component_id] = None
+        component["imports"] = list(imports)
+        edges += len(imports)
+    return edges
+
+def strongly_connected_components(graph: Dict[str, List[str]]) -> List[List[str]]:
+    """Tarjan's algorithm with an explicit stack (no recursion limit on deep import chains).
+
+    O(V + E). SCCs are returned in reverse topological order of the condensation: every
+    component comes after all components it has edges to (imported modules first).
+    """
+    index: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack = set()
+    stack: List[str] = []
+    sccs: List[List[str]] = []
+    counter = 0
+
+    for root in graph:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph.get(root, ())))] # (node, iterator over its remaining successors)
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in index:
+                    index[successor] = lowlink[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(graph.get(successor, ()))))
+                    break
+                if successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    scc = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        scc.append(member)
+                        if member == node:
+                            break
+                    sccs.append(scc)
+    return sccs
+
+def build_import_graph(components: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The --emit-import-graph document: nodes and edges, a dependency-first topological order
+    (members of an import cycle are adjacent) and the cycles (SCCs with more than one member)."""
+    graph = {component["component_id"]: component.get("imports", []) for component in components}
+    sccs = strongly_connected_components(graph)
+    return {
+        "components": len(graph),
+        "edges": sum(len(targets) for targets in graph.values()),
+        "topological_order": [member for scc in sccs for member in scc],
+        "cycles": [sorted(scc) for scc in sccs if len(scc) > 1],
+        "imports": graph,
+    }
+
+def save_import_graph(components: List[Dict[str, Any]], output_filepath: Path) -> Dict[str, Any]:
+    graph = build_import_graph(components)
+    with open(output_filepath, 'w', encoding='utf-8') as f:
+        json.dump(graph, f, indent=2)
+    return graph
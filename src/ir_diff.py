@@ -0,0 +1,136 @@
+# src/ir_diff.py
+# `llmos-cli diff OLD NEW`: symbol-level change report between two IR snapshots.
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple, TextIO
+
+from .ir_reader import iter_ir, iter_symbols
+from .source_store import SourceStore
+
+# Compared per symbol; "location" is the source_file (line shifts alone are not changes).
+DIFF_ASPECTS = ("signature", "docstring", "source", "location")
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+def normalize_source(text: str) -> str:
+    """Drops trailing whitespace, blank lines and line-ending differences."""
+    return "\n".join(line.rstrip() for line in text.splitlines() if line.strip())
+
+def _signature_text(symbol: Dict[str, Any], kind: str) -> str:
+    if kind == "class":
+        return json.dumps({"base_classes": symbol.get("base_classes", []), "fields": symbol.get("fields", [])}, sort_keys=True)
+    return json.dumps(symbol.get("signature", {}), sort_keys=True)
+
+def _source_digest(symbol: Dict[str, Any], component: Dict[str, Any], source_store: Optional[SourceStore]) -> bytes:
+    if "source_blob" in symbol:
+        # Blob-store IRs are compared by their (raw text) blob hash; diff them against blob-store IRs.
+        return b"blob:" + symbol["source_blob"].encode('ascii')
+    text = source_store.record_source(symbol, component) if source_store else symbol.get("source_code")
+    return _digest(normalize_source(text)) if text is not None else b""
+
+def iter_fingerprints(ir_filepath: Path) -> Iterator[Tuple[str, Tuple]]:
+    """Streams (key, fingerprint) per symbol. Only one component is decoded at a time and a
+    fingerprint is a few fixed-size digests, so the source text is never retained.
+
+    Keys are qualified names; a repeated name within one IR gets a `#2`, `#3`... suffix.
+    Spans-mode IRs are hashed from the analyzed files via the header's `source_roots`.
+    """
+    source_store: Optional[SourceStore] = None
+    seen: Dict[str, int] = {}
+    for item_kind, item in iter_ir(ir_filepath):
+        if item_kind == "fields":
+            if "source_roots" in item:
+                source_store = SourceStore(item["source_roots"])
+            continue
+        component_id = item.get("component_id")
+        if source_store is None and item.get("source_root"):
+            print(f"Warning: {ir_filepath} is a spans-mode IR without `source_roots` ahead of its components; "
+                  f"source changes cannot be detected.", file=sys.stderr)
+            source_store = SourceStore({})
+        for kind, symbol in iter_symbols(item):
+            qualified_name = symbol.get("qualified_name") or f"{component_id}.{symbol.get('name')}"
+            seen[qualified_name] = seen.get(qualified_name, 0) + 1
+            key = qualified_name if seen[qualified_name] == 1 else f"{qualified_name}#{seen[qualified_name]}"
+            yield key, (
+                kind,
+                _digest(_signature_text(symbol, kind)),
+                _digest(symbol.get("docstring") or ""),
+                _source_digest(symbol, item, source_store),
+                symbol.get("source_file"),
+                symbol.get("line_start"),
+                component_id,
+            )
+
+def changed_aspects(old: Tuple, new: Tuple) -> List[str]:
+    return [aspect for aspect, old_value, new_value in zip(DIFF_ASPECTS, old[1:5], new[1:5]) if old_value != new_value]
+
+def diff_ir(old_filepath: Path, new_filepath: Path) -> Iterator[Dict[str, Any]]:
+    """Yields change records ({change, kind, qualified_name, ...}) for NEW against OLD.
+
+    Only OLD's fingerprints are held in memory; NEW is streamed and its additions/changes are
+    yielded as they are found, followed by OLD's remaining (removed) symbols in OLD order.
+    """
+    old_fingerprints: Dict[str, Tuple] = dict(iter_fingerprints(old_filepath))
+    for key, new in iter_fingerprints(new_filepath):
+        old = old_fingerprints.pop(key, None)
+        source_file, component_id = new[4], new[6]
+        if old is None:
+            yield {"change": "added", "kind": new[0], "qualified_name": key,
+                   "component_id": component_id, "source_file": source_file, "line_start": new[5]}
+            continue
+        aspects = changed_aspects(old, new)
+        if aspects:
+            yield {"change": "changed", "kind": new[0], "qualified_name": key, "aspects": aspects,
+                   "component_id": component_id, "source_file": source_file, "line_start": new[5]}
+    for key, old in old_fingerprints.items():
+        source_file, component_id = old[4], old[6]
+        yield {"change": "removed", "kind": old[0], "qualified_name": key,
+               "component_id": component_id, "source_file": source_file, "line_start": old[5]}
+
+_CHANGE_MARKS = {"added": "+", "removed": "-", "changed": "~"}
+
+def _format_change(change: Dict[str, Any]) -> str:
+    location = f"{change.get('source_file')}:{change.get('line_start')}"
+    aspects = f" [{', '.join(change['aspects'])}]" if change.get("aspects") else ""
+    return f"{_CHANGE_MARKS[change['change']]} {change['kind']:<9} {change['qualified_name']}{aspects}  ({location})"
+
+def write_diff_report(changes: Iterator[Dict[str, Any]], out: TextIO, as_json: bool = False) -> Dict[str, int]:
+    """Writes each change as it arrives (text lines or JSON Lines); returns per-change counts."""
+    counts = {"added": 0, "removed": 0, "changed": 0}
+    for change in changes:
+        counts[change["change"]] += 1
+        out.write(json.dumps(change) + "\n" if as_json else _format_change(change) + "\n")
+    return counts
+
+def diff_main(argv: List[str]):
+    parser = argparse.ArgumentParser(
+        prog="llmos-cli diff",
+        description="Reports symbols added, removed or changed (signature, docstring, normalized source,\n"
+                    "location) between two IR files (YAML or JSONL).",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("old", metavar="OLD", help="Baseline IR file.")
+    parser.add_argument("new", metavar="NEW", help="IR file to compare against the baseline.")
+    parser.add_argument("--json", action="store_true", help="Emit one JSON object per change (JSON Lines).")
+    parser.add_argument("-o", "--output", default=None, help="Write the report to a file instead of stdout.")
+    args = parser.parse_args(argv)
+
+    for ir_path in (args.old, args.new):
+        if not Path(ir_path).is_file():
+            print(f"Error: IR file '{ir_path}' not found.")
+            sys.exit(1)
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        counts = write_diff_report(diff_ir(Path(args.old), Path(args.new)), out, args.json)
+    finally:
+        if args.output:
+            out.close()
+    summary = f"{counts['added']} added, {counts['removed']} removed, {counts['changed']} changed"
+    # Keep stdout a clean report when that is where the report goes.
+    print(summary, file=sys.stdout if args.output else sys.stderr)
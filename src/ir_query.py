@@ -0,0 +1,224 @@
+# src/ir_query.py
+# `llmos-cli query IR ...`: symbol lookups over a previously written IR.
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional
+
+from .ir_reader import iter_ir, iter_symbols, IndexedIRReader
+from .config import default_index_path
+
+QUERY_KINDS = ("name", "fqn", "prefix", "component", "base", "param-type")
+
+_TYPE_NAME_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_.]*")
+
+def _summarize(kind: str, symbol: Dict[str, Any], component_id: str) -> Dict[str, Any]:
+    """The fields queries need, without source text or docstrings."""
+    entry = {
+        "kind": kind, "name": symbol.get("name") or symbol.get("scenario"),
+        "qualified_name": symbol.get("qualified_name"), "component_id": component_id,
+        "source_file": symbol.get("source_file"), "line_start": symbol.get("line_start"),
+    }
+    if "signature" in symbol:
+        entry["signature"] = symbol["signature"]
+    if kind == "class":
+        entry["base_classes"] = symbol.get("base_classes", [])
+    return entry
+
+def format_entry(entry: Dict[str, Any]) -> str:
+    detail = ""
+    if "signature" in entry:
+        sig = entry["signature"]
+        params = ", ".join(f"{p.get('name')}: {p.get('type')}" if p.get('type') not in (None, "unknown") else str(p.get('name'))
+                           for p in sig.get("params", []))
+        detail = f"({params}) -> {sig.get('return_type', 'unknown')}"
+    elif entry.get("base_classes"):
+        detail = f"({', '.join(entry['base_classes'])})"
+    return f"{entry['kind']:<9} {entry['qualified_name']}{detail}  ({entry.get('source_file')}:{entry.get('line_start')})"
+
+class _SegmentTrie:
+    """Trie over dot-separated qualified-name segments (far fewer nodes than a per-character trie).
+
+    A prefix query walks its complete segments and then scans only the children of one node
+    for the trailing partial segment.
+    """
+
+    def __init__(self):
+        self.root: Dict[str, Any] = {"children": {}, "entries": []}
+
+    def insert(self, qualified_name: str, entry: Dict[str, Any]):
+        node = self.root
+        for segment in qualified_name.split("."):
+            node = node["children"].setdefault(segment, {"children": {}, "entries": []})
+        node["entries"].append(entry)
+
+    def _collect(self, node: Dict[str, Any], results: List[Dict[str, Any]], limit: int):
+        stack = [node]
+        while stack and len(results) < limit:
+            node = stack.pop()
+            results.extend(node["entries"][:limit - len(results)])
+            stack.extend(reversed(list(node["children"].values())))
+
+    def search(self, prefix: str, limit: int) -> List[Dict[str, Any]]:
+        *complete, partial = prefix.split(".")
+        node = self.root
+        for segment in complete:
+            node = node["children"].get(segment)
+            if node is None:
+                return []
+        results: List[Dict[str, Any]] = []
+        for segment, child in node["children"].items():
+            if len(results) >= limit:
+                break
+            if segment.startswith(partial):
+                self._collect(child, results, limit)
+        return results
+
+class IRQueryIndex:
+    """In-memory indexes over one IR, built in a single streaming pass.
+
+    Hash indexes map qualified name, name, component, base class (full text and last dotted
+    part) and parameter type (full annotation and every type name inside it) to compact
+    symbol entries; a segment trie serves FQN prefix search. Full records are fetched from
+    the `.idx` sidecar (IndexedIRReader) when the IR has one; otherwise they are kept in memory.
+    """
+
+    def __init__(self, ir_filepath: Path):
+        self.ir_filepath = Path(ir_filepath)
+        self.by_qualified_name: Dict[str, Dict[str, Any]] = {}
+        self.by_name: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_component: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_base: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_param_type: Dict[str, List[Dict[str, Any]]] = {}
+        self.trie = _SegmentTrie()
+        self.reader: Optional[IndexedIRReader] = None
+        self._records: Optional[Dict[str, Dict[str, Any]]] = None
+        if default_index_path(self.ir_filepath).exists():
+            self.reader = IndexedIRReader(self.ir_filepath)
+        else:
+            self._records = {}
+        self._build()
+
+    def _build(self):
+        for item_kind, component in iter_ir(self.ir_filepath):
+            if item_kind != "component":
+                continue
+            component_id = component.get("component_id")
+            for kind, symbol in iter_symbols(component):
+                self._add(_summarize(kind, symbol, component_id), symbol)
+
+    def _add(self, entry: Dict[str, Any], symbol: Dict[str, Any]):
+        qualified_name = entry["qualified_name"]
+        if not qualified_name:
+            return
+        self.by_qualified_name.setdefault(qualified_name, entry)
+        if self._records is not None:
+            self._records.setdefault(qualified_name, symbol)
+        self.by_name.setdefault(entry["name"], []).append(entry)
+        self.by_component.setdefault(entry["component_id"], []).append(entry)
+        self.trie.insert(qualified_name, entry)
+        for base in entry.get("base_classes", []):
+            for key in {base, base.rsplit(".", 1)[-1]}:
+                self.by_base.setdefault(key, []).append(entry)
+        if "signature" in entry:
+            param_types = set()
+            for param in entry["signature"].get("params", []):
+                param_type = param.get("type")
+                if param_type and param_type != "unknown":
+                    param_types.add(param_type.replace(" ", ""))
+                    param_types.update(_TYPE_NAME_RE.findall(param_type))
+            for param_type in param_types:
+                self.by_param_type.setdefault(param_type, []).append(entry)
+
+    def query(self, kind: str, value: str, limit: int = 50) -> List[Dict[str, Any]]:
+        if kind == "fqn":
+            entry = self.by_qualified_name.get(value)
+            return [entry] if entry else []
+        if kind == "prefix":
+            return self.trie.search(value, limit)
+        if kind == "name":
+            return self.by_name.get(value, [])[:limit]
+        if kind == "component":
+            return [entry for entry in self.by_component.get(value, []) if entry["kind"] in ("function", "method")][:limit]
+        if kind == "base":
+            return self.by_base.get(value, [])[:limit]
+        if kind == "param-type":
+            return self.by_param_type.get(value.replace(" ", ""), [])[:limit]
+        raise ValueError(f"Unknown query kind '{kind}', expected one of {QUERY_KINDS}")
+
+    def get_record(self, qualified_name: str) -> Optional[Dict[str, Any]]:
+        """Full IR record (source, docstring, ...) for a qualified name."""
+        if self.reader is not None:
+            return self.reader.get_symbol(qualified_name)
+        return self._records.get(qualified_name)
+
+    def close(self):
+        if self.reader is not None:
+            self.reader.close()
+
+def _print_results(index: IRQueryIndex, results: List[Dict[str, Any]], as_json: bool, full: bool):
+    for entry in results:
+        if full:
+            record = index.get_record(entry["qualified_name"]) or entry
+            print(json.dumps(record, default=sorted) if as_json else json.dumps(record, indent=2, default=sorted))
+        else:
+            print(json.dumps(entry) if as_json else format_entry(entry))
+
+def _interactive(index: IRQueryIndex, args: argparse.Namespace):
+    print(f"Query kinds: {', '.join(QUERY_KINDS)}. Enter `<kind> <value>` (empty line or `quit` to exit).", file=sys.stderr)
+    for line in sys.stdin:
+        line = line.strip()
+        if not line or line == "quit":
+            break
+        kind, _, value = line.partition(" ")
+        if kind not in QUERY_KINDS or not value:
+            print(f"Usage: <{'|'.join(QUERY_KINDS)}> <value>", file=sys.stderr)
+            continue
+        start = time.perf_counter()
+        results = index.query(kind, value.strip(), args.limit)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        _print_results(index, results, args.json, args.full)
+        print(f"-- {len(results)} result(s) in {elapsed_ms:.3f} ms", file=sys.stderr)
+        sys.stdout.flush()
+
+def query_main(argv: List[str]):
+    parser = argparse.ArgumentParser(
+        prog="llmos-cli query",
+        description="Looks up symbols in a previously written IR (YAML or JSONL; uses its .idx sidecar when present).\n"
+                    "Without a query option, reads `<kind> <value>` queries from stdin.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("ir_file", metavar="IR", help="IR file written by llmos-cli.")
+    parser.add_argument("--name", help="Symbols with this exact (unqualified) name.")
+    parser.add_argument("--fqn", help="The symbol with this qualified name.")
+    parser.add_argument("--prefix", help="Symbols whose qualified name starts with this prefix.")
+    parser.add_argument("--component", help="All functions and methods in this component.")
+    parser.add_argument("--base", help="Classes with this base class (full or last dotted name).")
+    parser.add_argument("--param-type", help="Functions with a parameter of this type (or using it inside an annotation).")
+    parser.add_argument("--limit", type=int, default=50, help="Maximum results per query (default: %(default)s).")
+    parser.add_argument("--full", action="store_true", help="Print the full IR records instead of one-line summaries.")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per result.")
+    args = parser.parse_args(argv)
+
+    if not Path(args.ir_file).is_file():
+        print(f"Error: IR file '{args.ir_file}' not found.")
+        sys.exit(1)
+    start = time.perf_counter()
+    index = IRQueryIndex(Path(args.ir_file))
+    print(f"Indexed {len(index.by_qualified_name)} symbols from {args.ir_file} in {time.perf_counter() - start:.2f}s"
+          f"{' (random access via ' + str(default_index_path(Path(args.ir_file))) + ')' if index.reader else ''}.", file=sys.stderr)
+
+    try:
+        queries = [(kind, getattr(args, kind.replace("-", "_"))) for kind in QUERY_KINDS
+                   if getattr(args, kind.replace("-", "_")) is not None]
+        if not queries:
+            _interactive(index, args)
+            return
+        for kind, value in queries:
+            _print_results(index, index.query(kind, value, args.limit), args.json, args.full)
+    finally:
+        index.close()
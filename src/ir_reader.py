@@ -0,0 +1,206 @@
+# src/ir_reader.py
+# Loading previously written IR files (YAML or JSON Lines).
+
+import json
+import mmap
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from .config import default_index_path
+
+_SYMBOL_RECORD_LISTS = {
+    "data_structure": "data_structures",
+    "function": "functions",
+    "test_specification": "test_specifications",
+}
+
+def iter_jsonl_records(ir_filepath: Path) -> Iterator[Dict[str, Any]]:
+    """Streams the records of a JSON Lines IR one line at a time."""
+    with open(ir_filepath, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def load_jsonl_ir(ir_filepath: Path) -> Dict[str, Any]:
+    """Reassembles a JSON Lines IR into the same structure a YAML IR loads to."""
+    data: Dict[str, Any] = {}
+    components: List[Dict[str, Any]] = []
+    components_by_id: Dict[str, Dict[str, Any]] = {}
+    for record in iter_jsonl_records(ir_filepath):
+        record_type = record.pop("record_type", None)
+        if record_type in ("header", "fields"):
+            data.update(record)
+        elif record_type == "component":
+            for list_key in _SYMBOL_RECORD_LISTS.values():
+                record.setdefault(list_key, [])
+            components.append(record)
+            components_by_id[record.get("component_id")] = record
+        elif record_type in _SYMBOL_RECORD_LISTS:
+            component = components_by_id.get(record.pop("component_id", None))
+            if component is None:
+                raise ValueError(f"{ir_filepath}: {record_type} record '{record.get('qualified_name')}' precedes its component")
+            component[_SYMBOL_RECORD_LISTS[record_type]].append(record)
+    data["components"] = components
+    return data
+
+def _iter_jsonl_ir(ir_filepath: Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    pending_component: Optional[Dict[str, Any]] = None
+    for record in iter_jsonl_records(ir_filepath):
+        record_type = record.pop("record_type", None)
+        if record_type in _SYMBOL_RECORD_LISTS and pending_component is not None:
+            record.pop("component_id", None)
+            pending_component[_SYMBOL_RECORD_LISTS[record_type]].append(record)
+            continue
+        if pending_component is not None:
+            yield "component", pending_component
+            pending_component = None
+        if record_type == "component":
+            for list_key in _SYMBOL_RECORD_LISTS.values():
+                record.setdefault(list_key, [])
+            pending_component = record
+        elif record_type in ("header", "fields"):
+            yield "fields", record
+    if pending_component is not None:
+        yield "component", pending_component
+
+def _iter_yaml_ir(ir_filepath: Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Splits a block-style IR document (as written by save_to_yaml/StreamingYamlWriter) into
+    top-level keys and `components:` items, loading one chunk at a time."""
+    import yaml
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    chunk: List[str] = []
+    chunk_kind = None
+
+    def flush():
+        if not chunk:
+            return None
+        loaded = yaml.load("".join(chunk), Loader=loader)
+        if chunk_kind == "component":
+            return "component", loaded[0]
+        if chunk_kind == "fields" and loaded is not None:
+            if loaded.get("components") == []:
+                return None
+            return "fields", loaded
+        return None
+
+    with open(ir_filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            # Continuation lines of a chunk are indented (or blank inside literal blocks).
+            if line[:1] in (" ", "\n", "\r") or not line:
+                chunk.append(line)
+                continue
+            if line.startswith("- ") and chunk_kind == "fields":
+                chunk.append(line) # Block sequences under other top-level keys are not indented either
+                continue
+            result = flush()
+            if result:
+                yield result
+            chunk = []
+            if line.startswith("- "):
+                chunk_kind = "component"
+                chunk.append(line)
+            elif line.rstrip() == "components:":
+                chunk_kind = "components" # Items follow at column 0
+            else:
+                chunk_kind = "fields"
+                chunk.append(line)
+        result = flush()
+        if result:
+            yield result
+
+def iter_ir(ir_filepath: Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Streams an IR as ("fields", {top-level fields}) and ("component", component) items.
+
+    Only one component is decoded at a time, so memory stays bounded by the largest
+    component rather than the IR size. Symbol-granularity JSONL components are reassembled.
+    """
+    if Path(ir_filepath).suffix.lower() in (".jsonl", ".ndjson"):
+        return _iter_jsonl_ir(ir_filepath)
+    return _iter_yaml_ir(ir_filepath)
+
+def iter_symbols(component: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(kind, record) for every symbol of a component; methods follow their class."""
+    for struct in component.get("data_structures", []):
+        yield "class", struct
+        for method in struct.get("methods", []):
+            yield "method", method
+    for func in component.get("functions", []):
+        yield "function", func
+    for test in component.get("test_specifications", []):
+        yield "test", test
+
+def load_yaml_ir(ir_filepath: Path) -> Dict[str, Any]:
+    import yaml
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(ir_filepath, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=loader)
+
+def load_ir(ir_filepath: Path) -> Dict[str, Any]:
+    """Loads an IR file, picking the format from its extension (.jsonl/.ndjson, else YAML)."""
+    if Path(ir_filepath).suffix.lower() in (".jsonl", ".ndjson"):
+        return load_jsonl_ir(ir_filepath)
+    return load_yaml_ir(ir_filepath)
+
+class IndexedIRReader:
+    """Random access to single components/symbols of an IR file via its `.idx` sidecar.
+
+    The IR file is memory-mapped and only the byte range of the requested record is
+    decoded, so lookups cost one record's worth of memory regardless of the IR size.
+    Works for JSON Lines and YAML IRs written with an index (--ir-index); YAML ranges
+    are whole component items, so symbol lookups there decode the owning component.
+    """
+
+    def __init__(self, ir_filepath: Path, index_filepath: Optional[Path] = None):
+        self.ir_filepath = Path(ir_filepath)
+        self.index_filepath = Path(index_filepath) if index_filepath else default_index_path(self.ir_filepath)
+        with open(self.index_filepath, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        self.ir_format = index["format"]
+        self.components: Dict[str, List[int]] = index["components"]
+        self.symbols: Dict[str, List[Any]] = index["symbols"]
+        self._file = open(self.ir_filepath, 'rb')
+        if self._file.seek(0, 2) != index.get("ir_size"):
+            self._file.close()
+            raise ValueError(f"Index {self.index_filepath} does not match {self.ir_filepath} (size changed); regenerate it.")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _decode(self, offset: int, length: int) -> Any:
+        chunk = self._mmap[offset:offset + length]
+        if self.ir_format == "jsonl":
+            record = json.loads(chunk)
+            record.pop("record_type", None)
+            return record
+        import yaml
+        return yaml.load(chunk, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+    def get_component(self, component_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the component record (symbol lists included unless written per symbol)."""
+        entry = self.components.get(component_id)
+        if entry is None:
+            return None
+        record = self._decode(*entry)
+        return record[0] if self.ir_format == "yaml" else record
+
+    def get_symbol(self, qualified_name: str) -> Optional[Dict[str, Any]]:
+        """Returns the function/class/test record for `qualified_name` (methods included)."""
+        entry = self.symbols.get(qualified_name)
+        if entry is None:
+            return None
+        offset, length, path = entry
+        record = self._decode(offset, length)
+        for step in path:
+            record = record[step]
+        return record
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+    def __contains__(self, qualified_name: str) -> bool:
+        return qualified_name in self.symbols
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,5 +1,4 @@
 # src/metadata_parser.py
-import toml
 import json
 from pathlib import Path
 from typing import Dict, List, Any
@@ -19,6 +18,8 @@ def parse_project_metadata(repo_path: Path) -> Dict[str, Any]:
         "parsed_metadata_files": [] # To store content of parsed files
     }
     # print("Parsing project metadata...")
+    if (repo_path / "Cargo.toml").is_file() or (repo_path / "pyproject.toml").is_file():
+        import toml # Deferred: only needed when there is a manifest to parse
 
     # --- Cargo.toml (Rust) ---
     cargo_path = repo_path / "Cargo.toml"
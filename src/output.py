@@ -1,10 +1,16 @@
 # src/output.py
-# Handles saving the extracted Intermediate Representation to YAML and LLM context file.
+# Handles saving the extracted Intermediate Representation to YAML, JSON Lines, SQLite and the LLM context file.
 
 import yaml
+import json
+import re
 import traceback
 from pathlib import Path
-from typing import Dict, Any, List, Set, Union # Added Set for type hinting languages_present
+from typing import Dict, Any, List, Set, Union, Optional # Added Set for type hinting languages_present
+
+from .config import (YAML_EMITTERS, JSONL_GRANULARITIES, LLM_DETAIL_LEVELS, DEFAULT_LLM_SHARD_MAX_TOKENS,
+                     IR_INDEX_SUFFIX, default_index_path)
+from .source_store import SourceStore, record_source
 
 # Custom Dumper to prevent !!python/object tags for sets, etc.
 # and to handle sets by converting them to sorted lists for consistent YAML.
@@ -17,13 +23,169 @@ class NoAliasDumper(yaml.SafeDumper):
 
 NoAliasDumper.add_representer(set, NoAliasDumper.represent_set)
 
-def save_to_yaml(data: Dict[str, Any], output_filepath: Path):
-    """Saves the final IR data structure to a YAML file."""
+# libyaml-backed variant: same set handling and no aliases, plus literal `|` blocks for
+# multi-line strings (source_code, docstrings) so they are written verbatim instead of
+# being re-folded and escaped. Falls back to the pure-Python SafeDumper without libyaml.
+YAML_LIBYAML_AVAILABLE = hasattr(yaml, "CSafeDumper")
+
+class FastNoAliasDumper(yaml.CSafeDumper if YAML_LIBYAML_AVAILABLE else yaml.SafeDumper):
+    def ignore_aliases(self, data):
+        return True
+
+    def represent_set(self, data):
+        return self.represent_list(sorted(list(data)))
+
+    def represent_str_block(self, data):
+        if "\n" in data:
+            # The emitter itself falls back to a quoted style when a literal block can't hold the text.
+            return self.represent_scalar('tag:yaml.org,2002:str', data, style='|')
+        return self.represent_str(data)
+
+FastNoAliasDumper.add_representer(set, FastNoAliasDumper.represent_set)
+FastNoAliasDumper.add_representer(str, FastNoAliasDumper.represent_str_block)
+
+# Per-component symbol lists and the JSONL record_type used when each symbol is its own record.
+_SYMBOL_LISTS = (("data_structures", "data_structure"), ("functions", "function"), ("test_specifications", "test_specification"))
+
+# --- Sidecar offset index ---
+class IROffsetIndex:
+    """Collects byte ranges of the records a writer emits and saves them as a JSON sidecar.
+
+    `components` maps component_id -> [offset, length] of its record. `symbols` maps
+    qualified_name -> [offset, length, path], where `path` locates the symbol inside the
+    decoded record (e.g. ["functions", 3] or ["data_structures", 0, "methods", 2]); it is
+    empty when the range holds the symbol record itself. The first record seen for a
+    duplicated qualified_name wins. `ir_reader.IndexedIRReader` is the consumer.
+    """
+
+    def __init__(self, ir_format: str):
+        self.ir_format = ir_format
+        self.components: Dict[str, List[int]] = {}
+        self.symbols: Dict[str, List[Any]] = {}
+
+    def add_component(self, component_id: str, offset: int, length: int):
+        self.components.setdefault(component_id, [offset, length])
+
+    def add_symbols(self, record: Dict[str, Any], offset: int, length: int, path: tuple = ()):
+        """Indexes the symbols nested in `record` (which occupies offset/length)."""
+        for list_key, _ in _SYMBOL_LISTS:
+            for position, symbol in enumerate(record.get(list_key) or []):
+                self.add_symbol(symbol, offset, length, path + (list_key, position))
+
+    def add_symbol(self, symbol: Dict[str, Any], offset: int, length: int, path: tuple = ()):
+        qualified_name = symbol.get("qualified_name")
+        if qualified_name:
+            self.symbols.setdefault(qualified_name, [offset, length, list(path)])
+        for position, method in enumerate(symbol.get("methods") or []):
+            self.add_symbol(method, offset, length, path + ("methods", position))
+
+    def save(self, index_filepath: Path, ir_filepath: Path):
+        index_filepath.parent.mkdir(parents=True, exist_ok=True)
+        with open(index_filepath, 'w', encoding='utf-8') as f:
+            json.dump({
+                "format": self.ir_format,
+                "ir_file": ir_filepath.name,
+                "ir_size": ir_filepath.stat().st_size,
+                "components": self.components,
+                "symbols": self.symbols,
+            }, f, separators=(',', ':'))
+
+def _dump_yaml(data: Any, emitter: str = "fast") -> str:
+    if emitter == "python":
+        return yaml.dump(data, Dumper=NoAliasDumper, default_flow_style=False, sort_keys=False, allow_unicode=True, width=120)
+    return yaml.dump(data, Dumper=FastNoAliasDumper, default_flow_style=False, sort_keys=False, allow_unicode=True, width=120)
+
+class StreamingYamlWriter:
+    """Writes the IR document incrementally: top-level fields, then one component at a time.
+
+    Each top-level key is dumped on its own and every component is emitted as a single
+    block-sequence item under `components:`, which is exactly how PyYAML lays out the
+    whole document, so the result loads to the same structure as `save_to_yaml`.
+    Fields that are only known at the end of a run (e.g. `languages_present`) can be
+    written after the components. With `index_filepath`, the byte range of every
+    component item is recorded in an IROffsetIndex sidecar (each item loads on its own
+    as a one-element list).
+    """
+
+    def __init__(self, output_filepath: Path, emitter: str = "fast", index_filepath: Optional[Path] = None):
+        self.output_filepath = output_filepath
+        self.emitter = emitter
+        self.index_filepath = index_filepath
+        self._index = IROffsetIndex("yaml") if index_filepath else None
+        output_filepath.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(output_filepath, 'wb')
+        self._offset = 0
+        self._components_state = "pending" # pending -> open -> closed
+        self.components_written = 0
+
+    def _write(self, text: str) -> int:
+        chunk = text.encode('utf-8')
+        self._file.write(chunk)
+        self._offset += len(chunk)
+        return len(chunk)
+
+    def write_fields(self, fields: Dict[str, Any]):
+        self._end_components()
+        for key, value in fields.items():
+            self._write(_dump_yaml({key: value}, self.emitter))
+
+    def write_component(self, component: Dict[str, Any]):
+        if self._components_state == "closed":
+            raise ValueError("Components section of the YAML document was already closed.")
+        if self._components_state == "pending":
+            self._write("components:\n")
+            self._components_state = "open"
+        offset = self._offset
+        length = self._write(_dump_yaml([component], self.emitter))
+        if self._index is not None:
+            self._index.add_component(component.get("component_id"), offset, length)
+            self._index.add_symbols(component, offset, length, (0,))
+        self.components_written += 1
+
+    def _end_components(self):
+        if self._components_state == "open":
+            self._components_state = "closed"
+
+    def close(self):
+        if self._components_state == "pending":
+            self._write(_dump_yaml({"components": []}, self.emitter))
+            self._components_state = "closed"
+        self._file.close()
+        if self._index is not None:
+            self._index.save(self.index_filepath, self.output_filepath)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def _write_ir_document(writer, data: Dict[str, Any]):
+    """Feeds a whole IR dict through a streaming writer, keeping the top-level key order."""
+    for key, value in data.items():
+        if key != "components":
+            writer.write_fields({key: value})
+            continue
+        for component in (value.values() if isinstance(value, dict) else value):
+            writer.write_component(component)
+
+def save_to_yaml(data: Dict[str, Any], output_filepath: Path, emitter: str = "fast", index_filepath: Optional[Path] = None):
+    """Saves the final IR data structure to a YAML file.
+
+    `emitter` is "fast" (libyaml when available, literal blocks for multi-line text) or
+    "python" (the pure-Python SafeDumper with folded, quoted strings). With
+    `index_filepath` the document goes through StreamingYamlWriter to record offsets.
+    """
     print(f"\nSaving Intermediate Representation to {output_filepath}...")
     try:
+        if index_filepath:
+            with StreamingYamlWriter(output_filepath, emitter, index_filepath) as writer:
+                _write_ir_document(writer, data)
+            print(f"YAML IR saved to {output_filepath} (index: {index_filepath})")
+            return
         output_filepath.parent.mkdir(parents=True, exist_ok=True)
         with open(output_filepath, 'w', encoding='utf-8') as f:
-            yaml.dump(data, f, Dumper=NoAliasDumper, default_flow_style=False, sort_keys=False, allow_unicode=True, width=120)
+            f.write(_dump_yaml(data, emitter))
         print(f"YAML IR saved to {output_filepath}")
     except Exception as e:
         print(f"Error writing YAML file '{output_filepath}':")
@@ -33,140 +195,748 @@ def save_to_yaml(data: Dict[str, Any], output_filepath: Path):
         # print(data)
         # print("--- END RAW DATA FALLBACK ---")
 
-def save_to_llm_context_file(data: Dict[str, Any], output_filepath: Path):
-    """Saves extracted code and docstrings to a single text file for LLMs."""
+# --- JSON Lines IR ---
+
+def _json_line(record: Dict[str, Any]) -> bytes:
+    return (json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=sorted) + "\n").encode('utf-8')
+
+class JsonlIRWriter:
+    """Writes the IR as JSON Lines: a `header` record, then component (or per-symbol) records.
+
+    Every line is a self-contained JSON object with a `record_type`, so loaders can stream the
+    file, split it at any newline and decode it with the C-accelerated json module. Top-level
+    fields known only at the end of a run are written as a later `fields` record. With
+    granularity "symbol", a component record carries only its own fields and each class,
+    function and test follows as its own line (record_type data_structure/function/
+    test_specification, tagged with component_id). `ir_reader.load_jsonl_ir` reassembles it.
+    With `index_filepath`, line offsets are recorded in an IROffsetIndex sidecar.
+    """
+
+    def __init__(self, output_filepath: Path, granularity: str = "component", index_filepath: Optional[Path] = None):
+        if granularity not in JSONL_GRANULARITIES:
+            raise ValueError(f"Unknown JSONL granularity '{granularity}', expected one of {JSONL_GRANULARITIES}")
+        self.output_filepath = output_filepath
+        self.granularity = granularity
+        self.index_filepath = index_filepath
+        self._index = IROffsetIndex("jsonl") if index_filepath else None
+        output_filepath.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(output_filepath, 'wb')
+        self._offset = 0
+        self._header_written = False
+        self.components_written = 0
+
+    def _write(self, record: Dict[str, Any]) -> tuple:
+        line = _json_line(record)
+        self._file.write(line)
+        offset = self._offset
+        self._offset += len(line)
+        return offset, len(line)
+
+    def write_fields(self, fields: Dict[str, Any]):
+        record_type = "fields" if self._header_written else "header"
+        self._header_written = True
+        self._write({"record_type": record_type, **fields})
+
+    def write_component(self, component: Dict[str, Any]):
+        if not self._header_written:
+            self.write_fields({})
+        component_id = component.get("component_id")
+        if self.granularity == "component":
+            offset, length = self._write({"record_type": "component", **component})
+            if self._index is not None:
+                self._index.add_component(component_id, offset, length)
+                self._index.add_symbols(component, offset, length)
+        else:
+            symbol_keys = {list_key for list_key, _ in _SYMBOL_LISTS}
+            offset, length = self._write({"record_type": "component", **{key: value for key, value in component.items() if key not in symbol_keys}})
+            if self._index is not None:
+                self._index.add_component(component_id, offset, length)
+            for list_key, record_type in _SYMBOL_LISTS:
+                for symbol in component.get(list_key, []):
+                    offset, length = self._write({"record_type": record_type, "component_id": component_id, **symbol})
+                    if self._index is not None:
+                        self._index.add_symbol(symbol, offset, length)
+        self.components_written += 1
+
+    def close(self):
+        if not self._header_written:
+            self.write_fields({})
+        self._file.close()
+        if self._index is not None:
+            self._index.save(self.index_filepath, self.output_filepath)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def save_to_jsonl(data: Dict[str, Any], output_filepath: Path, granularity: str = "component", index_filepath: Optional[Path] = None):
+    """Saves the final IR data structure as JSON Lines (see JsonlIRWriter)."""
+    print(f"\nSaving Intermediate Representation to {output_filepath}...")
+    try:
+        with JsonlIRWriter(output_filepath, granularity, index_filepath) as writer:
+            writer.write_fields({key: value for key, value in data.items() if key != "components"})
+            components_data = data.get("components", [])
+            for component in (components_data.values() if isinstance(components_data, dict) else components_data):
+                writer.write_component(component)
+        print(f"JSONL IR saved to {output_filepath}")
+    except Exception as e:
+        print(f"Error writing JSONL file '{output_filepath}':")
+        traceback.print_exc()
+
+# --- LLM context text ---
+# Each render function returns one section of the LLM context file; the single-file writer
+# and the token-budgeted shard writer both assemble their output from these pieces.
+
+def _render_llm_header(data: Dict[str, Any]) -> str:
+    """Project summary, metadata section and the CODE ELEMENTS banner."""
+    parts = []
+    parts.append(f"# Project: {data.get('project_name', 'Unknown Project')}\n")
+    parts.append(f"## Schema Version: {data.get('schema_version', 'N/A')}\n")
+
+    primary_lang = data.get('language_primary', 'N/A')
+    parts.append(f"## Primary Language: {primary_lang}\n")
+
+    langs_present_data: Union[Set[str], List[str]] = data.get('languages_present', [])
+    if isinstance(langs_present_data, set):
+        langs_present_list = sorted(list(langs_present_data))
+    else: # Already a list (or other iterable)
+        langs_present_list = sorted(list(langs_present_data))
+    parts.append(f"## Languages Present: {', '.join(langs_present_list)}\n\n")
+
+    # --- Metadata Section ---
+    metadata = data.get("metadata", {})
+    if metadata:
+        parts.append("--- METADATA ---\n")
+        if 'project_name_from_meta' in metadata and metadata['project_name_from_meta'] != data.get('project_name'):
+             parts.append(f"Original Name (from metadata): {metadata.get('project_name_from_meta')}\n")
+        parts.append(f"Version: {metadata.get('version', 'N/A')}\n")
+        parts.append(f"Description: {metadata.get('description', 'N/A')}\n")
+
+        authors_list = metadata.get('authors', [])
+        if isinstance(authors_list, list):
+            parts.append(f"Authors: {', '.join(authors_list)}\n")
+        else: # Handle if it's a single string or other type
+            parts.append(f"Authors: {str(authors_list)}\n")
+
+        parts.append(f"License: {metadata.get('license', 'N/A')}\n") # License can be dict or str
+        parts.append(f"Homepage: {metadata.get('homepage', 'N/A')}\n")
+        parts.append(f"Repository: {metadata.get('repository', 'N/A')}\n")
+
+        keywords_list = metadata.get('keywords', [])
+        if isinstance(keywords_list, list):
+            parts.append(f"Keywords: {', '.join(keywords_list)}\n")
+        else:
+            parts.append(f"Keywords: {str(keywords_list)}\n")
+
+        if metadata.get("parsed_metadata_files"):
+            parts.append("\n### Parsed Metadata Files Content:\n")
+            for meta_file in metadata["parsed_metadata_files"]:
+                parts.append(f"\n#### File: {meta_file['source']}\n")
+                parts.append("```\n") # Generic code block for metadata content
+                parts.append(meta_file.get('content', '[Content not available]'))
+                parts.append("\n```\n")
+
+        dependencies = metadata.get("dependencies", [])
+        if dependencies:
+            parts.append("\n### Dependencies:\n")
+            for dep in dependencies:
+                dep_name = dep.get('name', 'Unknown Dependency')
+                dep_version = dep.get('version_spec', 'any version')
+                dep_source = dep.get('source', 'unknown source')
+                parts.append(f"- {dep_name} (Version: {dep_version}, Source: {dep_source})\n")
+        parts.append("\n") # Extra newline after metadata section
+
+    # --- Code Elements Section ---
+    parts.append("--- CODE ELEMENTS ---\n")
+    return "".join(parts)
+
+def _llm_components_list(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    components_data: Union[Dict[str, Any], List[Dict[str, Any]]] = data.get("components", [])
+    # Ensure components is a list of dictionaries
+    if isinstance(components_data, dict):
+        return list(components_data.values())
+    elif isinstance(components_data, list):
+        return components_data
+    return []
+
+def _render_llm_component_header(component: Dict[str, Any]) -> str:
+    comp_id = component.get('component_id', 'N/A')
+    comp_path = component.get('source_path', '.')
+    comp_type = component.get('component_type', 'unknown')
+    return (f"\n### Component (Module/Package): {comp_id}\n"
+            f"Path Context: {comp_path}\n" # Use a clearer term
+            f"Type: {comp_type}\n")
+
+def _render_llm_data_structure(ds_data: Dict[str, Any], component: Dict[str, Any], source_store: Optional[SourceStore]) -> str:
+    """Data Structures (Classes, Structs, Enums)."""
+    lang_name = ds_data.get('language', 'code') # Default to 'code' if no language
+    ds_kind = ds_data.get('kind','STRUCTURE').upper()
+    ds_name = ds_data.get('name', 'N/A')
+    text = (f"\n#### {lang_name.upper()} {ds_kind}: {ds_name}\n"
+            f"In File: {ds_data.get('source_file', 'N/A')}\n"
+            f"Qualified Name: {ds_data.get('qualified_name', 'N/A')}\n"
+            f"Lines: {ds_data.get('line_start', '?')}-{ds_data.get('line_end', '?')}\n"
+            f"##### DOCSTRING:\n```\n{(ds_data.get('docstring') or '(No docstring found)')}\n```\n"
+            f"##### SOURCE CODE:\n```{lang_name.lower()}\n{(record_source(ds_data, component, source_store) or '# Source code not available')}\n```\n")
+    if lang_name == "rust":
+        # Rust methods live in separate impl blocks, outside the struct/enum source above.
+        text += "".join(_render_llm_function(method, component, source_store) for method in ds_data.get('methods') or [])
+    return text
+
+def _render_llm_function(func_data: Dict[str, Any], component: Dict[str, Any], source_store: Optional[SourceStore]) -> str:
+    """Functions / Methods."""
+    lang_name = func_data.get('language', 'code')
+    func_name = func_data.get('name', 'N/A')
+
+    # Signature formatting
+    sig = func_data.get('signature', {})
+    params_str_parts = []
+    for p in sig.get('params', []):
+        p_name = p.get('name', '_')
+        p_type = p.get('type', 'any')
+        if p_type and p_type != 'unknown':
+            params_str_parts.append(f"{p_name}: {p_type}")
+        else:
+            params_str_parts.append(p_name)
+    params_str = ", ".join(params_str_parts)
+    return_type_str = sig.get('return_type', 'unknown')
+    async_str = "async " if sig.get('async') else ""
+    unsafe_str = "unsafe " if sig.get('unsafe') else "" # For Rust
+    keyword = "fn" if lang_name == "rust" else "def"
+
+    return (f"\n#### {lang_name.upper()} FUNCTION: {func_name}\n"
+            f"In File: {func_data.get('source_file', 'N/A')}\n"
+            f"Qualified Name: {func_data.get('qualified_name', 'N/A')}\n"
+            f"Lines: {func_data.get('line_start', '?')}-{func_data.get('line_end', '?')}\n"
+            f"Signature: {unsafe_str}{async_str}{keyword} {func_name}({params_str}) -> {return_type_str}\n"
+            f"##### DOCSTRING:\n```\n{(func_data.get('docstring') or '(No docstring found)')}\n```\n"
+            f"##### SOURCE CODE:\n```{lang_name.lower()}\n{(record_source(func_data, component, source_store) or '# Source code not available')}\n```\n")
+
+# --- Skeleton / signature-only rendering ---
+# Stubs are built from the IR fields alone (signature, base_classes, fields, methods, docstring),
+# so no source text is read or materialized. Each language has its own stub syntax; the
+# renderers are picked by the component's language (see _STUB_RENDERERS).
+
+def _render_stub_params(sig: Dict[str, Any]) -> str:
+    params_str_parts = []
+    for p in sig.get('params', []):
+        p_name = p.get('name', '_')
+        p_type = p.get('type', 'unknown')
+        part = p_name
+        # *args/**kwargs types are inferred as tuple/dict, which would be misleading in a stub.
+        if p_type and p_type != 'unknown' and not p_name.startswith('*'):
+            part += f": {p_type}"
+        if p.get('default_value') is not None:
+            part += f" = {p['default_value']}" if ':' in part else f"={p['default_value']}"
+        params_str_parts.append(part)
+    return ", ".join(params_str_parts)
+
+def _render_stub_def(func_data: Dict[str, Any]) -> str:
+    sig = func_data.get('signature', {})
+    return_type = sig.get('return_type', 'unknown')
+    return_str = f" -> {return_type}" if return_type and return_type != 'unknown' else ""
+    async_str = "async " if sig.get('async') else ""
+    return f"{async_str}def {func_data.get('name', 'N/A')}({_render_stub_params(sig)}){return_str}:"
+
+def _render_stub_docstring(docstring: Optional[str], indent: str) -> str:
+    if not docstring:
+        return ""
+    # Python docstrings are stored as the raw literal (quotes and original indentation included).
+    if docstring[:1] in ('"', "'") or docstring[:2].lower() in ('r"', "r'", 'u"', "u'"):
+        return f"{indent}{docstring}\n"
+    body = docstring.replace('"""', '\\"\\"\\"').replace("\n", "\n" + indent)
+    return f'{indent}"""{body}"""\n'
+
+def _render_stub_function(func_data: Dict[str, Any], indent: str, with_docstrings: bool) -> str:
+    stub_def = f"{indent}{_render_stub_def(func_data)}"
+    docstring = _render_stub_docstring(func_data.get('docstring'), indent + "    ") if with_docstrings else ""
+    if not docstring:
+        return f"{stub_def} ...\n"
+    return f"{stub_def}\n{docstring}{indent}    ...\n"
+
+def _render_stub_class(ds_data: Dict[str, Any], with_docstrings: bool) -> str:
+    bases = ds_data.get('base_classes') or []
+    parts = [f"class {ds_data.get('name', 'N/A')}({', '.join(bases)}):\n" if bases else f"class {ds_data.get('name', 'N/A')}:\n"]
+    if with_docstrings:
+        parts.append(_render_stub_docstring(ds_data.get('docstring'), "    "))
+    for field in ds_data.get('fields') or []:
+        field_type = field.get('type', 'unknown')
+        parts.append(f"    {field.get('name')}: {field_type}\n" if field_type and field_type != 'unknown' else f"    {field.get('name')} = ...\n")
+    for method in ds_data.get('methods') or []:
+        parts.append(_render_stub_function(method, "    ", with_docstrings))
+    if len(parts) == 1 or (len(parts) == 2 and not parts[1]):
+        parts.append("    ...\n")
+    return "".join(parts)
+
+def _render_rs_stub_params(sig: Dict[str, Any]) -> str:
+    params_str_parts = []
+    for p in sig.get('params', []):
+        p_name = p.get('name', '_')
+        p_type = p.get('type', 'unknown')
+        if p_name == 'self':
+            params_str_parts.append(p_type or 'self') # The whole receiver: `&self`, `mut self`, `self: Box<Self>`
+        else:
+            params_str_parts.append(f"{p_name}: {p_type}" if p_type and p_type != 'unknown' else p_name)
+    return ", ".join(params_str_parts)
+
+def _render_rs_stub_def(func_data: Dict[str, Any]) -> str:
+    sig = func_data.get('signature', {})
+    return_type = sig.get('return_type', 'unknown')
+    return_str = f" -> {return_type}" if return_type and return_type != 'unknown' else ""
+    async_str = "async " if sig.get('async') else ""
+    unsafe_str = "unsafe " if sig.get('unsafe') else ""
+    return f"{async_str}{unsafe_str}fn {func_data.get('name', 'N/A')}({_render_rs_stub_params(sig)}){return_str};"
+
+def _render_rs_stub_docstring(docstring: Optional[str], indent: str) -> str:
+    if not docstring:
+        return ""
+    return "".join(f"{indent}/// {line}".rstrip() + "\n" for line in docstring.split("\n"))
+
+def _render_rs_stub_function(func_data: Dict[str, Any], indent: str, with_docstrings: bool) -> str:
+    docstring = _render_rs_stub_docstring(func_data.get('docstring'), indent) if with_docstrings else ""
+    return f"{docstring}{indent}{_render_rs_stub_def(func_data)}\n"
+
+def _render_rs_stub_fields(fields: List[Dict[str, Any]], indent: str) -> str:
+    """`(T, U)` for positional fields, a `{ name: T }` block for named ones, "" for none."""
+    if not fields:
+        return ""
+    if all(field.get('name', '').isdigit() for field in fields):
+        return f"({', '.join(field.get('type', '_') for field in fields)})"
+    field_lines = "".join(f"{indent}    {field.get('name')}: {field.get('type', '_')},\n" for field in fields)
+    return f" {{\n{field_lines}{indent}}}"
+
+def _render_rs_stub_type(ds_data: Dict[str, Any], with_docstrings: bool) -> str:
+    """`struct X { field: T }` / `enum X { A, B(..) }`, then one `impl` block per trait (inherent first)."""
+    name = ds_data.get('name', 'N/A')
+    parts = [_render_rs_stub_docstring(ds_data.get('docstring'), "") if with_docstrings else ""]
+    if ds_data.get('kind') == "enum":
+        variant_lines = "".join(f"    {variant.get('name')}{_render_rs_stub_fields(variant.get('fields') or [], '    ')},\n"
+                                for variant in ds_data.get('variants') or [])
+        parts.append(f"enum {name} {{\n{variant_lines}}}\n")
+    else:
+        fields = _render_rs_stub_fields(ds_data.get('fields') or [], "")
+        parts.append(f"struct {name}{fields}{';' if not fields.endswith('}') else ''}\n")
+    methods_by_trait: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for method in ds_data.get('methods') or []:
+        methods_by_trait.setdefault(method.get('impl_trait'), []).append(method)
+    for trait in sorted(methods_by_trait, key=lambda trait: trait is not None):
+        header = f"impl {trait} for {name}" if trait else f"impl {name}"
+        method_lines = "".join(_render_rs_stub_function(method, "    ", with_docstrings) for method in methods_by_trait[trait])
+        parts.append(f"{header} {{\n{method_lines}}}\n")
+    return "".join(parts)
+
+# language -> (data structure stub, function stub)
+_STUB_RENDERERS = {
+    "python": (_render_stub_class, _render_stub_function),
+    "rust": (_render_rs_stub_type, _render_rs_stub_function),
+}
+
+def _component_language(component: Dict[str, Any]) -> str:
+    component_type = component.get('component_type') or ""
+    return component_type[:-len("_module")] if component_type.endswith("_module") else "python"
+
+def _render_llm_skeleton_symbol(symbol: Dict[str, Any], is_data_structure: bool, lang: str = "python") -> str:
+    """Heading plus a docstring-carrying stub with the body elided."""
+    lang_name = symbol.get('language', 'code')
+    render_type, render_function = _STUB_RENDERERS.get(lang, _STUB_RENDERERS["python"])
+    if is_data_structure:
+        heading = f"{lang_name.upper()} {symbol.get('kind', 'STRUCTURE').upper()}: {symbol.get('name', 'N/A')}"
+        stub = render_type(symbol, with_docstrings=True)
+    else:
+        heading = f"{lang_name.upper()} FUNCTION: {symbol.get('name', 'N/A')}"
+        stub = render_function(symbol, "", with_docstrings=True)
+    return (f"\n#### {heading}\n"
+            f"Qualified Name: {symbol.get('qualified_name', 'N/A')} ({symbol.get('source_file', 'N/A')}:{symbol.get('line_start', '?')})\n"
+            f"```{lang_name.lower()}\n{stub}```\n")
+
+def _render_llm_signature_symbol(symbol: Dict[str, Any], is_data_structure: bool, lang: str = "python") -> str:
+    """Bare stub lines (no docstrings, no headings)."""
+    render_type, render_function = _STUB_RENDERERS.get(lang, _STUB_RENDERERS["python"])
+    if is_data_structure:
+        return "\n" + render_type(symbol, with_docstrings=False)
+    return "\n" + render_function(symbol, "", with_docstrings=False)
+
+def _render_llm_symbols(component: Dict[str, Any], source_store: Optional[SourceStore], detail: str = "full") -> List[tuple]:
+    """(qualified_name, text) for every symbol of a component, in output order."""
+    if detail == "full":
+        render_ds = lambda ds_data: _render_llm_data_structure(ds_data, component, source_store)
+        render_func = lambda func_data: _render_llm_function(func_data, component, source_store)
+    elif detail == "skeleton":
+        lang = _component_language(component)
+        render_ds = lambda ds_data: _render_llm_skeleton_symbol(ds_data, True, lang)
+        render_func = lambda func_data: _render_llm_skeleton_symbol(func_data, False, lang)
+    elif detail == "signatures":
+        lang = _component_language(component)
+        render_ds = lambda ds_data: _render_llm_signature_symbol(ds_data, True, lang)
+        render_func = lambda func_data: _render_llm_signature_symbol(func_data, False, lang)
+    else:
+        raise ValueError(f"Unknown LLM detail level '{detail}', expected one of {LLM_DETAIL_LEVELS}")
+    symbols = [(ds_data.get('qualified_name'), render_ds(ds_data)) for ds_data in component.get("data_structures", [])]
+    symbols.extend((func_data.get('qualified_name'), render_func(func_data)) for func_data in component.get("functions", []))
+    # Test Specifications (optional, can be verbose) are not rendered.
+    return symbols
+
+def save_to_llm_context_file(data: Dict[str, Any], output_filepath: Path, source_store: Optional[SourceStore] = None,
+                             detail: str = "full"):
+    """Saves extracted code and docstrings to a single text file for LLMs.
+
+    `source_store` materializes symbol text for IRs built with source spans (--ir-mode spans).
+    `detail` is "full" (source code), "skeleton" (stubs with docstrings, bodies elided) or
+    "signatures" (stub lines only).
+    """
     print(f"\nSaving LLM context to {output_filepath}...")
     try:
         output_filepath.parent.mkdir(parents=True, exist_ok=True)
         with open(output_filepath, 'w', encoding='utf-8') as outfile:
-            outfile.write(f"# Project: {data.get('project_name', 'Unknown Project')}\n")
-            outfile.write(f"## Schema Version: {data.get('schema_version', 'N/A')}\n")
-            
-            primary_lang = data.get('language_primary', 'N/A')
-            outfile.write(f"## Primary Language: {primary_lang}\n")
-            
-            langs_present_data: Union[Set[str], List[str]] = data.get('languages_present', [])
-            if isinstance(langs_present_data, set):
-                langs_present_list = sorted(list(langs_present_data))
-            else: # Already a list (or other iterable)
-                langs_present_list = sorted(list(langs_present_data))
-            outfile.write(f"## Languages Present: {', '.join(langs_present_list)}\n\n")
-
-            # --- Metadata Section ---
-            metadata = data.get("metadata", {})
-            if metadata:
-                outfile.write("--- METADATA ---\n")
-                if 'project_name_from_meta' in metadata and metadata['project_name_from_meta'] != data.get('project_name'):
-                     outfile.write(f"Original Name (from metadata): {metadata.get('project_name_from_meta')}\n")
-                outfile.write(f"Version: {metadata.get('version', 'N/A')}\n")
-                outfile.write(f"Description: {metadata.get('description', 'N/A')}\n")
-                
-                authors_list = metadata.get('authors', [])
-                if isinstance(authors_list, list):
-                    outfile.write(f"Authors: {', '.join(authors_list)}\n")
-                else: # Handle if it's a single string or other type
-                    outfile.write(f"Authors: {str(authors_list)}\n")
-
-                outfile.write(f"License: {metadata.get('license', 'N/A')}\n") # License can be dict or str
-                outfile.write(f"Homepage: {metadata.get('homepage', 'N/A')}\n")
-                outfile.write(f"Repository: {metadata.get('repository', 'N/A')}\n")
-                
-                keywords_list = metadata.get('keywords', [])
-                if isinstance(keywords_list, list):
-                    outfile.write(f"Keywords: {', '.join(keywords_list)}\n")
-                else:
-                    outfile.write(f"Keywords: {str(keywords_list)}\n")
-                
-                if metadata.get("parsed_metadata_files"):
-                    outfile.write("\n### Parsed Metadata Files Content:\n")
-                    for meta_file in metadata["parsed_metadata_files"]:
-                        outfile.write(f"\n#### File: {meta_file['source']}\n")
-                        outfile.write("```\n") # Generic code block for metadata content
-                        outfile.write(meta_file.get('content', '[Content not available]'))
-                        outfile.write("\n```\n")
-                
-                dependencies = metadata.get("dependencies", [])
-                if dependencies:
-                    outfile.write("\n### Dependencies:\n")
-                    for dep in dependencies:
-                        dep_name = dep.get('name', 'Unknown Dependency')
-                        dep_version = dep.get('version_spec', 'any version')
-                        dep_source = dep.get('source', 'unknown source')
-                        outfile.write(f"- {dep_name} (Version: {dep_version}, Source: {dep_source})\n")
-                outfile.write("\n") # Extra newline after metadata section
-
-            # --- Code Elements Section ---
-            outfile.write("--- CODE ELEMENTS ---\n")
-            components_data: Union[Dict[str, Any], List[Dict[str, Any]]] = data.get("components", [])
-            
-            # Ensure components is a list of dictionaries
-            if isinstance(components_data, dict):
-                components_list = list(components_data.values())
-            elif isinstance(components_data, list):
-                components_list = components_data
-            else:
-                components_list = []
-
-            for component in components_list:
-                comp_id = component.get('component_id', 'N/A')
-                comp_path = component.get('source_path', '.')
-                comp_type = component.get('component_type', 'unknown')
-                outfile.write(f"\n### Component (Module/Package): {comp_id}\n")
-                outfile.write(f"Path Context: {comp_path}\n") # Use a clearer term
-                outfile.write(f"Type: {comp_type}\n")
-
-                # Data Structures (Classes, Structs, Enums)
-                for ds_data in component.get("data_structures", []):
-                    lang_name = ds_data.get('language', 'code') # Default to 'code' if no language
-                    ds_kind = ds_data.get('kind','STRUCTURE').upper()
-                    ds_name = ds_data.get('name', 'N/A')
-                    outfile.write(f"\n#### {lang_name.upper()} {ds_kind}: {ds_name}\n")
-                    outfile.write(f"In File: {ds_data.get('source_file', 'N/A')}\n")
-                    outfile.write(f"Qualified Name: {ds_data.get('qualified_name', 'N/A')}\n")
-                    outfile.write(f"Lines: {ds_data.get('line_start', '?')}-{ds_data.get('line_end', '?')}\n")
-                    outfile.write(f"##### DOCSTRING:\n```\n{(ds_data.get('docstring') or '(No docstring found)')}\n```\n")
-                    outfile.write(f"##### SOURCE CODE:\n```{lang_name.lower()}\n{(ds_data.get('source_code') or '# Source code not available')}\n```\n")
-                
-                # Functions / Methods
-                for func_data in component.get("functions", []):
-                    lang_name = func_data.get('language', 'code')
-                    func_name = func_data.get('name', 'N/A')
-                    outfile.write(f"\n#### {lang_name.upper()} FUNCTION: {func_name}\n")
-                    outfile.write(f"In File: {func_data.get('source_file', 'N/A')}\n")
-                    outfile.write(f"Qualified Name: {func_data.get('qualified_name', 'N/A')}\n")
-                    outfile.write(f"Lines: {func_data.get('line_start', '?')}-{func_data.get('line_end', '?')}\n")
-                    
-                    # Signature formatting
-                    sig = func_data.get('signature', {})
-                    params_str_parts = []
-                    for p in sig.get('params', []):
-                        p_name = p.get('name', '_')
-                        p_type = p.get('type', 'any')
-                        if p_type and p_type != 'unknown':
-                            params_str_parts.append(f"{p_name}: {p_type}")
-                        else:
-                            params_str_parts.append(p_name)
-                    params_str = ", ".join(params_str_parts)
-                    return_type_str = sig.get('return_type', 'unknown')
-                    async_str = "async " if sig.get('async') else ""
-                    unsafe_str = "unsafe " if sig.get('unsafe') else "" # For Rust
-                    outfile.write(f"Signature: {unsafe_str}{async_str}def {func_name}({params_str}) -> {return_type_str}\n")
-
-                    outfile.write(f"##### DOCSTRING:\n```\n{(func_data.get('docstring') or '(No docstring found)')}\n```\n")
-                    outfile.write(f"##### SOURCE CODE:\n```{lang_name.lower()}\n{(func_data.get('source_code') or '# Source code not available')}\n```\n")
-
-                # Test Specifications (optional, can be verbose)
-                # if component.get("test_specifications"):
-                #     outfile.write("\n--- TEST SPECIFICATIONS ---\n")
-                #     for test_spec in component.get("test_specifications", []):
-                #         outfile.write(f"\n#### TEST: {test_spec.get('scenario', 'N/A')} (ID: {test_spec.get('id')})\n")
-                #         outfile.write(f"Source File: {test_spec.get('source_file')}\n")
-                #         # outfile.write(f"Setup: {test_spec.get('setup', [])}\n") # Could be too verbose
-                #         # outfile.write(f"Action: {test_spec.get('action', {})}\n")
-                #         # outfile.write(f"Assertions: {test_spec.get('assertions', [])}\n")
-
-
+            outfile.write(_render_llm_header(data))
+            for component in _llm_components_list(data):
+                outfile.write(_render_llm_component_header(component))
+                for _, symbol_text in _render_llm_symbols(component, source_store, detail):
+                    outfile.write(symbol_text)
         print(f"LLM context file saved to {output_filepath}")
     except Exception as e:
         print(f"Error writing LLM context file '{output_filepath}':")
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()
+
+# --- Token-budgeted LLM context shards ---
+LLM_SHARD_MANIFEST_FILENAME = "manifest.json"
+
+def estimate_tokens(text: str) -> int:
+    """Cheap, tokenizer-free estimate (~4 characters per token for code and English)."""
+    return (len(text) + 3) // 4
+
+class LlmShardWriter:
+    """Splits the LLM context into files of at most `max_tokens` (estimated) each.
+
+    Shards break only between components or, when a component alone exceeds the budget,
+    between its symbols; the component header is repeated at the top of every shard it
+    continues into. The first shard carries the project header, later ones a one-line
+    continuation header. A symbol larger than the whole budget gets a shard of its own
+    and is flagged `oversize` in the manifest. `close()` writes manifest.json.
+    """
+
+    def __init__(self, shard_dir: Path, max_tokens: int = DEFAULT_LLM_SHARD_MAX_TOKENS,
+                 source_store: Optional[SourceStore] = None, detail: str = "full"):
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be positive")
+        self.shard_dir = shard_dir
+        self.max_tokens = max_tokens
+        self.source_store = source_store
+        self.detail = detail
+        self.shards: List[Dict[str, Any]] = []
+        self.project_name = "Unknown Project"
+        self._parts: List[str] = []
+        self._tokens = 0
+        self._entry: Optional[Dict[str, Any]] = None
+        shard_dir.mkdir(parents=True, exist_ok=True)
+
+    def write_header(self, data: Dict[str, Any]):
+        self.project_name = data.get('project_name', self.project_name)
+        self._start_shard(_render_llm_header(data))
+
+    def _start_shard(self, preamble: Optional[str] = None):
+        self._flush()
+        if preamble is None:
+            preamble = f"# Project: {self.project_name} (continued)\n--- CODE ELEMENTS ---\n"
+        self._parts = [preamble]
+        self._tokens = estimate_tokens(preamble)
+        self._entry = {"file": f"llm_context_{len(self.shards) + 1:04d}.txt", "components": [],
+                       "symbols": 0, "first_symbol": None, "last_symbol": None, "oversize": False}
+
+    def _has_content(self) -> bool:
+        return self._entry is not None and (self._entry["symbols"] > 0 or bool(self._entry["components"]))
+
+    def _append(self, text: str, tokens: int):
+        self._parts.append(text)
+        self._tokens += tokens
+
+    def write_component(self, component: Dict[str, Any]):
+        if self._entry is None:
+            self._start_shard()
+        comp_id = component.get('component_id', 'N/A')
+        comp_header = _render_llm_component_header(component)
+        header_tokens = estimate_tokens(comp_header)
+        symbols = [(qualified_name, text, estimate_tokens(text))
+                   for qualified_name, text in _render_llm_symbols(component, self.source_store, self.detail)]
+        component_tokens = header_tokens + sum(tokens for _, _, tokens in symbols)
+
+        # Keep the component whole when it fits in a shard of its own.
+        if self._has_content() and self._tokens + component_tokens > self.max_tokens:
+            self._start_shard()
+        self._append(comp_header, header_tokens)
+        self._entry["components"].append(comp_id)
+
+        for qualified_name, text, tokens in symbols:
+            if self._tokens + tokens > self.max_tokens and self._entry["symbols"] > 0:
+                self._start_shard()
+                self._append(comp_header, header_tokens)
+                self._entry["components"].append(comp_id)
+            self._append(text, tokens)
+            self._entry["symbols"] += 1
+            self._entry["first_symbol"] = self._entry["first_symbol"] or qualified_name
+            self._entry["last_symbol"] = qualified_name
+            if self._tokens > self.max_tokens:
+                self._entry["oversize"] = True
+
+    def _flush(self):
+        if self._entry is None:
+            return
+        text = "".join(self._parts)
+        with open(self.shard_dir / self._entry["file"], 'w', encoding='utf-8') as outfile:
+            outfile.write(text)
+        self._entry["tokens"] = self._tokens
+        self._entry["chars"] = len(text)
+        self.shards.append(self._entry)
+        self._entry = None
+        self._parts = []
+
+    def close(self):
+        self._flush()
+        manifest = {
+            "project_name": self.project_name,
+            "max_tokens": self.max_tokens,
+            "token_estimate": "chars/4",
+            "detail": self.detail,
+            "total_tokens": sum(shard["tokens"] for shard in self.shards),
+            "shards": self.shards,
+        }
+        with open(self.shard_dir / LLM_SHARD_MANIFEST_FILENAME, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+def save_to_llm_shards(data: Dict[str, Any], shard_dir: Path, max_tokens: int = DEFAULT_LLM_SHARD_MAX_TOKENS,
+                       source_store: Optional[SourceStore] = None, detail: str = "full"):
+    """Saves the LLM context as token-budgeted shards plus a manifest (see LlmShardWriter)."""
+    print(f"\nSaving LLM context shards (max ~{max_tokens} tokens each) to {shard_dir}...")
+    try:
+        writer = LlmShardWriter(shard_dir, max_tokens, source_store, detail)
+        writer.write_header(data)
+        for component in _llm_components_list(data):
+            writer.write_component(component)
+        writer.close()
+        print(f"LLM context saved as {len(writer.shards)} shards in {shard_dir} (manifest: {LLM_SHARD_MANIFEST_FILENAME})")
+    except Exception as e:
+        print(f"Error writing LLM context shards to '{shard_dir}':")
+        traceback.print_exc()
+
+# --- Per-component LLM context files (parallel) ---
+LLM_COMPONENT_INDEX_FILENAME = "index.txt"
+
+_llm_worker_source_store: Optional[SourceStore] = None
+_llm_worker_detail = "full"
+
+def _init_llm_component_worker(source_roots: Optional[Dict[str, str]], detail: str):
+    """ProcessPoolExecutor initializer: each worker opens its own SourceStore for spans-mode IRs."""
+    global _llm_worker_source_store, _llm_worker_detail
+    _llm_worker_source_store = SourceStore(source_roots) if source_roots is not None else None
+    _llm_worker_detail = detail
+
+def _llm_component_filename(position: int, component_id: str) -> str:
+    return f"{position:05d}_{re.sub(r'[^A-Za-z0-9._-]', '_', component_id)[:100]}.txt"
+
+def _write_llm_component_task(task: tuple) -> tuple:
+    """Renders one component with a single join and writes it; returns (filename, chars, tokens)."""
+    position, component, output_dir = task
+    filename = _llm_component_filename(position, component.get('component_id', 'N/A'))
+    text = _render_llm_component_header(component) + "".join(
+        symbol_text for _, symbol_text in _render_llm_symbols(component, _llm_worker_source_store, _llm_worker_detail))
+    with open(Path(output_dir) / filename, 'w', encoding='utf-8') as outfile:
+        outfile.write(text)
+    return filename, len(text), estimate_tokens(text)
+
+def save_to_llm_component_files(data: Dict[str, Any], output_dir: Path, jobs: int = 1, detail: str = "full"):
+    """Writes the LLM context as one file per component, rendered in a process pool.
+
+    File names carry the component's position, and `index.txt` holds the project header
+    followed by `<file>\t<component_id>\t<estimated tokens>` lines in the original order, so
+    the header plus the files concatenated in index order equal the --llm-file output.
+    Spans-mode IRs are materialized by each worker from `source_roots`.
+    """
+    print(f"\nSaving per-component LLM context files to {output_dir}...")
+    try:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        components_list = _llm_components_list(data)
+        tasks = [(position, component, str(output_dir)) for position, component in enumerate(components_list, 1)]
+        initargs = (data.get("source_roots"), detail)
+        if jobs > 1 and len(tasks) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            chunksize = max(1, min(64, len(tasks) // (jobs * 8) or 1))
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_llm_component_worker, initargs=initargs) as executor:
+                results = list(executor.map(_write_llm_component_task, tasks, chunksize=chunksize))
+        else:
+            _init_llm_component_worker(*initargs)
+            results = [_write_llm_component_task(task) for task in tasks]
+
+        index_lines = [_render_llm_header(data), "--- COMPONENT FILES ---\n"]
+        index_lines.extend(f"{filename}\t{component.get('component_id', 'N/A')}\t{tokens}\n"
+                           for (filename, _, tokens), component in zip(results, components_list))
+        with open(output_dir / LLM_COMPONENT_INDEX_FILENAME, 'w', encoding='utf-8') as index_file:
+            index_file.write("".join(index_lines))
+        print(f"LLM context written as {len(results)} component files in {output_dir} (index: {LLM_COMPONENT_INDEX_FILENAME})")
+    except Exception as e:
+        print(f"Error writing per-component LLM context files to '{output_dir}':")
+        traceback.print_exc()
+
+# --- SQLite indexed IR store ---
+_SQLITE_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE components (
+    component_id TEXT PRIMARY KEY, component_type TEXT, source_path TEXT, summary TEXT, source_root TEXT, imports TEXT
+);
+CREATE TABLE data_structures (
+    id INTEGER PRIMARY KEY, component_id TEXT, name TEXT, qualified_name TEXT, kind TEXT,
+    source_file TEXT, language TEXT, line_start INTEGER, line_end INTEGER, docstring TEXT,
+    source_code TEXT, span_start INTEGER, span_end INTEGER,
+    base_classes TEXT, fields TEXT, dependencies TEXT, used_by TEXT, test_specs_covering TEXT
+);
+CREATE TABLE functions (
+    id INTEGER PRIMARY KEY, component_id TEXT, parent_qualified_name TEXT, name TEXT, qualified_name TEXT,
+    source_file TEXT, language TEXT, line_start INTEGER, line_end INTEGER, return_type TEXT, is_async INTEGER,
+    docstring TEXT, source_code TEXT, span_start INTEGER, span_end INTEGER,
+    dependencies TEXT, used_by TEXT, test_specs_covering TEXT
+);
+CREATE TABLE params (
+    function_id INTEGER REFERENCES functions(id), position INTEGER, name TEXT, type TEXT, default_value TEXT
+);
+CREATE TABLE tests (
+    id INTEGER PRIMARY KEY, component_id TEXT, test_id TEXT, scenario TEXT, qualified_name TEXT,
+    source_file TEXT, language TEXT, line_start INTEGER, line_end INTEGER, docstring TEXT,
+    source_code TEXT, span_start INTEGER, span_end INTEGER, setup TEXT, action TEXT, assertions TEXT
+);
+"""
+# Created after the bulk load, which is cheaper than maintaining them row by row.
+_SQLITE_INDEXES = """
+CREATE INDEX idx_data_structures_qualified_name ON data_structures(qualified_name);
+CREATE INDEX idx_data_structures_name ON data_structures(name);
+CREATE INDEX idx_data_structures_source_file ON data_structures(source_file);
+CREATE INDEX idx_data_structures_component ON data_structures(component_id);
+CREATE INDEX idx_functions_qualified_name ON functions(qualified_name);
+CREATE INDEX idx_functions_name ON functions(name);
+CREATE INDEX idx_functions_source_file ON functions(source_file);
+CREATE INDEX idx_functions_component ON functions(component_id);
+CREATE INDEX idx_functions_parent ON functions(parent_qualified_name);
+CREATE INDEX idx_params_function ON params(function_id);
+CREATE INDEX idx_params_type ON params(type);
+CREATE INDEX idx_tests_qualified_name ON tests(qualified_name);
+CREATE INDEX idx_tests_name ON tests(scenario);
+CREATE INDEX idx_tests_source_file ON tests(source_file);
+"""
+
+def _json_column(value: Any) -> Optional[str]:
+    return json.dumps(value, ensure_ascii=False) if value is not None else None
+
+def _span_columns(record: Dict[str, Any]) -> tuple:
+    span = record.get("source_span") or {}
+    return span.get("start_byte"), span.get("end_byte")
+
+class SqliteIRWriter:
+    """Writes the IR into normalized SQLite tables (components, data_structures, functions,
+    params, tests) with indexes on qualified_name, source_file and name. List and mapping
+    fields (fields, dependencies, used_by, test_specs_covering, a test's setup/action/assertions,
+    a component's imports) are JSON text columns.
+
+    Rows are buffered per component and inserted with executemany inside one transaction;
+    indexes are built at close. Methods (and nested functions from --py-engine cursor) are rows
+    in `functions` with parent_qualified_name set.
+    """
+
+    def __init__(self, output_filepath: Path):
+        import sqlite3 # Deferred: only --output-sqlite needs it
+        self.output_filepath = output_filepath
+        output_filepath.parent.mkdir(parents=True, exist_ok=True)
+        if output_filepath.exists():
+            output_filepath.unlink()
+        self._conn = sqlite3.connect(str(output_filepath))
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.executescript(_SQLITE_SCHEMA)
+        self._conn.execute("BEGIN")
+        self._next_function_id = 1
+        self.components_written = 0
+
+    def write_fields(self, fields: Dict[str, Any]):
+        self._conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                               [(key, json.dumps(value, ensure_ascii=False, default=sorted)) for key, value in fields.items()])
+
+    def _function_row(self, component_id: str, func: Dict[str, Any], parent_qualified_name: Optional[str],
+                      function_rows: List[tuple], param_rows: List[tuple]):
+        function_id = self._next_function_id
+        self._next_function_id += 1
+        sig = func.get("signature") or {}
+        function_rows.append((
+            function_id, component_id, parent_qualified_name, func.get("name"), func.get("qualified_name"),
+            func.get("source_file"), func.get("language"), func.get("line_start"), func.get("line_end"),
+            sig.get("return_type"), int(bool(sig.get("async"))), func.get("docstring"), func.get("source_code"),
+            *_span_columns(func), _json_column(func.get("dependencies")), _json_column(func.get("used_by")),
+            _json_column(func.get("test_specs_covering")),
+        ))
+        for position, param in enumerate(sig.get("params", [])):
+            param_rows.append((function_id, position, param.get("name"), param.get("type"), param.get("default_value")))
+
+    def write_component(self, component: Dict[str, Any]):
+        component_id = component.get("component_id")
+        self._conn.execute(
+            "INSERT OR REPLACE INTO components (component_id, component_type, source_path, summary, source_root, imports)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (component_id, component.get("component_type"), component.get("source_path"),
+             component.get("summary"), component.get("source_root"), _json_column(component.get("imports"))))
+        struct_rows, function_rows, param_rows, test_rows = [], [], [], []
+        for ds in component.get("data_structures", []):
+            struct_rows.append((
+                component_id, ds.get("name"), ds.get("qualified_name"), ds.get("kind"), ds.get("source_file"),
+                ds.get("language"), ds.get("line_start"), ds.get("line_end"), ds.get("docstring"), ds.get("source_code"),
+                *_span_columns(ds), _json_column(ds.get("base_classes")), _json_column(ds.get("fields")),
+                _json_column(ds.get("dependencies")), _json_column(ds.get("used_by")), _json_column(ds.get("test_specs_covering")),
+            ))
+            for method in ds.get("methods", []):
+                self._function_row(component_id, method, ds.get("qualified_name"), function_rows, param_rows)
+        for func in component.get("functions", []):
+            self._function_row(component_id, func, func.get("parent_qualified_name"), function_rows, param_rows)
+        for test in component.get("test_specifications", []):
+            test_rows.append((
+                component_id, test.get("id"), test.get("scenario"), test.get("qualified_name"), test.get("source_file"),
+                test.get("language"), test.get("line_start"), test.get("line_end"), test.get("docstring"),
+                test.get("source_code"), *_span_columns(test), _json_column(test.get("setup")),
+                _json_column(test.get("action")), _json_column(test.get("assertions")),
+            ))
+        self._conn.executemany(
+            "INSERT INTO data_structures (component_id, name, qualified_name, kind, source_file, language, line_start, line_end,"
+            " docstring, source_code, span_start, span_end, base_classes, fields, dependencies, used_by, test_specs_covering)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", struct_rows)
+        self._conn.executemany(
+            "INSERT INTO functions (id, component_id, parent_qualified_name, name, qualified_name, source_file, language,"
+            " line_start, line_end, return_type, is_async, docstring, source_code, span_start, span_end, dependencies,"
+            " used_by, test_specs_covering) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", function_rows)
+        self._conn.executemany(
+            "INSERT INTO params (function_id, position, name, type, default_value) VALUES (?, ?, ?, ?, ?)", param_rows)
+        self._conn.executemany(
+            "INSERT INTO tests (component_id, test_id, scenario, qualified_name, source_file, language, line_start, line_end,"
+            " docstring, source_code, span_start, span_end, setup, action, assertions)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", test_rows)
+        self.components_written += 1
+
+    def close(self):
+        self._conn.executescript(_SQLITE_INDEXES) # executescript commits the open transaction first
+        self._conn.commit()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def save_to_sqlite(data: Dict[str, Any], output_filepath: Path):
+    """Saves the IR to an indexed SQLite database (see SqliteIRWriter)."""
+    print(f"\nSaving Intermediate Representation to SQLite {output_filepath}...")
+    try:
+        with SqliteIRWriter(output_filepath) as writer:
+            writer.write_fields({key: value for key, value in data.items() if key != "components"})
+            components_data = data.get("components", [])
+            for component in (components_data.values() if isinstance(components_data, dict) else components_data):
+                writer.write_component(component)
+        print(f"SQLite IR saved to {output_filepath}")
+    except Exception as e:
+        print(f"Error writing SQLite file '{output_filepath}':")
+        traceback.print_exc()
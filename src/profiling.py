@@ -0,0 +1,100 @@
+# src/profiling.py
+# Per-stage timers, counters and slowest-file tracking for --profile.
+
+import heapq
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+COUNTER_LABELS = {
+    "files_seen": "Files seen",
+    "files_skipped": "Files skipped",
+    "dirs_pruned": "Ignored dirs pruned",
+    "files_extracted": "Files extracted",
+    "files_failed": "Files failed",
+    "bytes_read": "Bytes read",
+    "ast_nodes": "AST nodes parsed",
+    "symbols_emitted": "Symbols emitted",
+    "cache_hits": "Cache hits",
+    "cache_misses": "Cache misses",
+    "files_deduplicated": "Files deduplicated",
+}
+
+class RunStats:
+    """Cumulative per-stage timings and counters for one run.
+
+    Worker processes fill their own instance per task and ship `to_dict()` back to the
+    parent, which folds it in with `merge`; stage times are therefore summed CPU-side
+    work across workers, not wall time.
+    """
+
+    def __init__(self, top_n: int = 10):
+        self.top_n = top_n
+        self.stage_seconds: Dict[str, float] = {}
+        self.stage_calls: Dict[str, int] = {}
+        self.counters: Dict[str, int] = {}
+        self._slowest_files: List[Tuple[float, str]] = [] # min-heap of (seconds, path)
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name: str, seconds: float, calls: int = 1):
+        self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+        self.stage_calls[name] = self.stage_calls.get(name, 0) + calls
+
+    def incr(self, counter: str, amount: int = 1):
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def record_file(self, path: str, seconds: float):
+        entry = (seconds, path)
+        if len(self._slowest_files) < self.top_n:
+            heapq.heappush(self._slowest_files, entry)
+        elif entry > self._slowest_files[0]:
+            heapq.heapreplace(self._slowest_files, entry)
+
+    def slowest_files(self) -> List[Tuple[float, str]]:
+        return sorted(self._slowest_files, reverse=True)
+
+    def merge(self, other: Dict[str, Any]):
+        for name, seconds in other.get("stage_seconds", {}).items():
+            self.add_time(name, seconds, other.get("stage_calls", {}).get(name, 1))
+        for counter, amount in other.get("counters", {}).items():
+            self.incr(counter, amount)
+        for entry in other.get("slowest_files", []):
+            self.record_file(entry["path"], entry["seconds"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage_seconds": self.stage_seconds,
+            "stage_calls": self.stage_calls,
+            "counters": self.counters,
+            "slowest_files": [{"path": path, "seconds": seconds} for seconds, path in self.slowest_files()],
+        }
+
+    def summary_lines(self) -> List[str]:
+        lines = ["--- PROFILE SUMMARY ---", f"{'Stage':<24} {'Seconds':>10} {'Calls':>8}"]
+        for name, seconds in sorted(self.stage_seconds.items(), key=lambda item: item[1], reverse=True):
+            lines.append(f"{name:<24} {seconds:>10.3f} {self.stage_calls.get(name, 0):>8}")
+        lines.append("")
+        for counter, label in COUNTER_LABELS.items():
+            if counter in self.counters:
+                lines.append(f"{label + ':':<24} {self.counters[counter]}")
+        for counter in sorted(set(self.counters) - set(COUNTER_LABELS)):
+            lines.append(f"{counter + ':':<24} {self.counters[counter]}")
+        if self._slowest_files:
+            lines.append(f"\nSlowest {len(self._slowest_files)} files (read + parse + extract):")
+            for seconds, path in self.slowest_files():
+                lines.append(f"  {seconds:>8.4f}s  {path}")
+        return lines
+
+    def write_json(self, output_filepath: Path):
+        output_filepath.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_filepath, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
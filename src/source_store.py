@@ -0,0 +1,104 @@
+# src/source_store.py
+# Shared per-file text store used to materialize source spans (--ir-mode spans) and
+# content-addressed source blobs (--blob-store).
+
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+class SourceStore:
+    """Reads analyzed files on demand and slices symbol text out of them.
+
+    In spans mode, IR records carry `source_span: {start_byte, end_byte}` relative to their
+    `source_file`, and each component names its analysis target in `source_root`; the IR
+    header maps target names to directories (`source_roots`). File contents are kept in a
+    small LRU so rendering a component's symbols reads each file once. Records written with
+    a blob store carry `source_blob` instead, resolved against the IR's `blobs` table.
+    """
+
+    def __init__(self, source_roots: Dict[str, str], max_cached_files: int = 64,
+                 blobs: Optional[Dict[str, str]] = None):
+        self.source_roots = {target: Path(root) for target, root in source_roots.items()}
+        self.blobs = blobs or {}
+        self.max_cached_files = max_cached_files
+        self._file_cache: "OrderedDict[Path, bytes]" = OrderedDict()
+
+    def _read(self, file_path: Path) -> Optional[bytes]:
+        content = self._file_cache.get(file_path)
+        if content is not None:
+            self._file_cache.move_to_end(file_path)
+            return content
+        try:
+            with open(file_path, 'rb') as f:
+                content = f.read()
+        except OSError as e:
+            print(f"Warning: Could not read {file_path} to materialize source: {e}")
+            return None
+        self._file_cache[file_path] = content
+        if len(self._file_cache) > self.max_cached_files:
+            self._file_cache.popitem(last=False)
+        return content
+
+    def get_text(self, source_root: str, source_file: str, span: Dict[str, int]) -> Optional[str]:
+        root = self.source_roots.get(source_root)
+        if root is None:
+            return None
+        content = self._read(root / source_file)
+        if content is None:
+            return None
+        return content[span["start_byte"]:span["end_byte"]].decode('utf-8', errors='replace')
+
+    def record_source(self, record: Dict[str, Any], component: Dict[str, Any]) -> Optional[str]:
+        """Returns a record's source text, whether stored inline or as a span."""
+        if "source_code" in record:
+            return record["source_code"]
+        if "source_blob" in record:
+            return self.blobs.get(record["source_blob"])
+        span = record.get("source_span")
+        if span is None or not component.get("source_root"):
+            return None
+        return self.get_text(component["source_root"], record.get("source_file", ""), span)
+
+def record_source(record: Dict[str, Any], component: Dict[str, Any], source_store: Optional[SourceStore]) -> Optional[str]:
+    if source_store is None:
+        return record.get("source_code")
+    return source_store.record_source(record, component)
+
+class BlobStore:
+    """Content-addressed store for symbol source text (--blob-store).
+
+    `externalize` returns a copy of a component whose records reference their text by
+    `source_blob` (sha1 of the text) instead of carrying `source_code`; each distinct text is
+    kept once in `blobs`, which is written to the IR as a trailing top-level field.
+    """
+
+    def __init__(self):
+        self.blobs: Dict[str, str] = {}
+        self.references = 0
+
+    def add(self, text: str) -> str:
+        key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        self.blobs.setdefault(key, text)
+        self.references += 1
+        return key
+
+    def _externalize_record(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        if "source_code" not in record and not record.get("methods"):
+            return record
+        new_record = {}
+        for key, value in record.items():
+            if key == "source_code" and value is not None:
+                new_record["source_blob"] = self.add(value)
+            elif key == "methods":
+                new_record[key] = [self._externalize_record(method) for method in value]
+            else:
+                new_record[key] = value
+        return new_record
+
+    def externalize(self, component: Dict[str, Any]) -> Dict[str, Any]:
+        new_component = dict(component)
+        for list_key in ("data_structures", "functions", "test_specifications"):
+            if list_key in component:
+                new_component[list_key] = [self._externalize_record(record) for record in component[list_key]]
+        return new_component
@@ -0,0 +1,161 @@
+# src/symbols.py
+# Symbol table over the merged IR: resolves collected references into `dependencies`/`used_by`
+# (--resolve-deps) and `test_specs_covering` (--link-tests).
+
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from .import_graph import ModuleResolver
+
+def resolve_relative_import(target: str, package: str) -> str:
+    """Resolves `.x`, `..x.y` (as written in a from-import) against the importing file's package."""
+    stripped = target.lstrip(".")
+    level = len(target) - len(stripped)
+    if level == 0:
+        return target
+    package_parts = package.split(".") if package else []
+    if level > 1:
+        package_parts = package_parts[:len(package_parts) - (level - 1)]
+    return ".".join(package_parts + ([stripped] if stripped else []))
+
+def module_package(component_id: str, file_stem: str) -> str:
+    """The package relative imports in a file start from: the component itself for `__init__`
+    (and other files folded into their package's component_id), otherwise its parent."""
+    if file_stem == "__init__" or component_id.rsplit(".", 1)[-1] != file_stem:
+        return component_id
+    return component_id.rsplit(".", 1)[0] if "." in component_id else ""
+
+def iter_symbol_records(component: Dict[str, Any]) -> Iterator[Tuple[Dict[str, Any], Optional[str]]]:
+    """Yields (record, enclosing class qualified_name) for the component's classes, methods and functions."""
+    for struct in component.get("data_structures", []):
+        yield struct, None
+        for method in struct.get("methods", []):
+            yield method, struct.get("qualified_name")
+    for func in component.get("functions", []):
+        yield func, None
+
+class SymbolIndex:
+    """Hash indexes for reference resolution, built in one pass over the components.
+
+    `records` maps qualified_name to its record. Imported module paths are mapped to
+    components by the import graph's ModuleResolver, so absolute imports resolve only where
+    Python would find them (`import json` never reaches a local `mylib/json.py`). Names a module
+    re-exports (`from .core import Parser` in a package `__init__`) are followed through its
+    import table. A reference costs a handful of dict lookups (one per dotted segment), never
+    a scan.
+
+    Import tables map local names to (target, is_relative): relative imports are already
+    resolved to component_ids, absolute ones are module paths as written.
+    """
+
+    def __init__(self, components: List[Dict[str, Any]], module_resolver: ModuleResolver):
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.module_resolver = module_resolver
+        self.import_tables: Dict[str, Dict[str, Tuple[str, bool]]] = {}
+        for component in components:
+            self.import_tables[component["component_id"]] = component.get("import_table", {})
+            for record, _ in iter_symbol_records(component):
+                qualified_name = record.get("qualified_name")
+                if qualified_name:
+                    self.records.setdefault(qualified_name, record)
+
+    def _longest_symbol(self, parts: List[str], min_parts: int) -> Optional[str]:
+        """Longest known qualified name among parts[:n] for n >= min_parts (`a.B.method.attr` -> `a.B.method`)."""
+        for n in range(len(parts), min_parts - 1, -1):
+            candidate = ".".join(parts[:n])
+            if candidate in self.records:
+                return candidate
+        return None
+
+    def resolve_imported(self, target: str, relative: bool, max_reexports: int = 3) -> Optional[str]:
+        """Resolves an imported dotted name (module path plus attributes) to a symbol qualified_name."""
+        found = self.module_resolver.split(target, relative)
+        if found is None or not found[1]:
+            return None # Outside the analyzed targets, or a module rather than a symbol
+        component_id, attributes = found
+        resolved = self._longest_symbol(component_id.split(".") + attributes, len(component_id.split(".")) + 1)
+        reexport = self.import_tables.get(component_id, {}).get(attributes[0])
+        if resolved is None and reexport and max_reexports > 0:
+            reexport_target, reexport_relative = reexport
+            return self.resolve_imported(".".join([reexport_target] + attributes[1:]), reexport_relative, max_reexports - 1)
+        return resolved
+
+    def resolve(self, reference: str, component_id: str, imports: Dict[str, Tuple[str, bool]],
+                class_qn: Optional[str]) -> Optional[str]:
+        head, _, rest = reference.partition(".")
+        if head in ("self", "cls") and class_qn:
+            if not rest:
+                return None
+            candidate = f"{class_qn}.{rest.split('.')[0]}" # Methods only; attributes are not indexed
+            return candidate if candidate in self.records else None
+        if head in imports:
+            target, relative = imports[head]
+            return self.resolve_imported(target + (f".{rest}" if rest else ""), relative)
+        parts = component_id.split(".") + reference.split(".")
+        return self._longest_symbol(parts, len(component_id.split(".")) + 1)
+
+def resolve_dependencies(components: List[Dict[str, Any]], index: SymbolIndex) -> Dict[str, int]:
+    """Replaces each record's collected `references` with resolved `dependencies` and adds
+    the reverse `used_by` edges. Linear in the number of references. Returns counts for the
+    summary line.
+    """
+    used_by: Dict[str, Dict[str, None]] = {}
+    stats = {"references": 0, "resolved": 0, "edges": 0}
+    for component in components:
+        component_id = component["component_id"]
+        imports = component.get("import_table", {})
+        for record, class_qn in iter_symbol_records(component):
+            qualified_name = record.get("qualified_name")
+            dependencies: Dict[str, None] = {}
+            for reference in record.pop("references", ()):
+                stats["references"] += 1
+                resolved = index.resolve(reference, component_id, imports, class_qn)
+                if resolved is None:
+                    continue
+                stats["resolved"] += 1
+                if resolved != qualified_name and not (qualified_name and qualified_name.startswith(resolved + ".")):
+                    dependencies[resolved] = None # Not itself or an enclosing definition
+            record["dependencies"] = list(dependencies)
+            stats["edges"] += len(dependencies)
+            for dependency in dependencies:
+                used_by.setdefault(dependency, {})[qualified_name] = None
+    for component in components:
+        for record, _ in iter_symbol_records(component):
+            record["used_by"] = list(used_by.get(record.get("qualified_name"), ()))
+    return stats
+
+def link_test_coverage(components: List[Dict[str, Any]], index: SymbolIndex) -> Dict[str, int]:
+    """Fills `test_specs_covering` from the `references` collected in each test body.
+
+    The tests' references form an inverted index (resolved qualified_name -> test ids), which
+    is joined against the symbol table by hash lookup. A method is also covered by a test that
+    covers its class and uses the method's name as an attribute (`parser = Parser(); parser.parse()`),
+    which needs a second index (attribute name -> test ids). Cost is linear in references plus,
+    per method, the tests covering its class. Returns counts for the summary line.
+    """
+    covering: Dict[str, Dict[str, None]] = {}
+    tests_by_attribute: Dict[str, set] = {}
+    test_count = 0
+    for component in components:
+        component_id = component["component_id"]
+        imports = component.get("import_table", {})
+        for test in component.get("test_specifications", []):
+            test_count += 1
+            test_id = test.get("id") or test.get("qualified_name")
+            for reference in test.pop("references", ()):
+                if "." in reference:
+                    tests_by_attribute.setdefault(reference.rsplit(".", 1)[-1], set()).add(test_id)
+                resolved = index.resolve(reference, component_id, imports, None)
+                if resolved is not None:
+                    covering.setdefault(resolved, {})[test_id] = None
+    links = 0
+    for component in components:
+        for record, class_qn in iter_symbol_records(component):
+            tests = dict(covering.get(record.get("qualified_name"), {}))
+            if class_qn is not None:
+                attribute_tests = tests_by_attribute.get(record.get("name"), ())
+                for test_id in covering.get(class_qn, ()):
+                    if test_id in attribute_tests:
+                        tests[test_id] = None
+            record["test_specs_covering"] = list(tests)
+            links += len(tests)
+    return {"tests": test_count, "links": links, "symbols_covered": len(covering)}
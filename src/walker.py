@@ -0,0 +1,65 @@
+# src/walker.py
+# Pruning directory walker that yields only candidate source files.
+
+import os
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Mapping, AbstractSet
+
+from .config import LANG_MAP, IGNORE_DIRS, IGNORE_FILES
+
+def new_walk_stats() -> Dict[str, int]:
+    return {"dirs_walked": 0, "dirs_pruned": 0, "files_yielded": 0,
+            "files_ignored": 0, "files_unsupported": 0}
+
+def is_ignored_path(rel_path: Path) -> bool:
+    """Per-file form of the walker's ignore rules, for callers that bypass the walk."""
+    return any(part in IGNORE_DIRS for part in rel_path.parts) or rel_path.name in IGNORE_FILES
+
+def walk_source_files(root: Path, stats: Optional[Dict[str, int]] = None,
+                      lang_map: Optional[Mapping[str, str]] = None,
+                      ignore_dirs: AbstractSet[str] = IGNORE_DIRS,
+                      ignore_files: AbstractSet[str] = IGNORE_FILES) -> Iterator[Path]:
+    """Walks `root` with os.scandir, yielding files whose extension is in `lang_map`.
+
+    Directories in `ignore_dirs` are pruned before descending, so vendored virtualenvs,
+    .git and node_modules are never listed. Files are yielded in the same order as
+    `root.rglob('*')` (a directory's files first, then its subdirectories depth-first).
+    Symlinked directories are not followed. If given, `stats` (see `new_walk_stats`)
+    is updated with counts of what was walked and skipped.
+    """
+    if lang_map is None:
+        lang_map = LANG_MAP # Looked up at call time so --include-pyi is honoured
+    if stats is None:
+        stats = new_walk_stats()
+
+    pending_dirs = [os.fspath(root)]
+    while pending_dirs:
+        current_dir = pending_dirs.pop()
+        stats["dirs_walked"] += 1
+        subdirs = []
+        try:
+            with os.scandir(current_dir) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name in ignore_dirs:
+                                stats["dirs_pruned"] += 1
+                            else:
+                                subdirs.append(entry.path)
+                            continue
+                        if not entry.is_file():
+                            continue
+                    except OSError:
+                        continue
+                    if entry.name in ignore_files:
+                        stats["files_ignored"] += 1
+                    elif os.path.splitext(entry.name)[1].lower() not in lang_map:
+                        stats["files_unsupported"] += 1
+                    else:
+                        stats["files_yielded"] += 1
+                        yield Path(entry.path)
+        except OSError as e:
+            print(f"  Warning: Could not list directory {current_dir}: {e}")
+            continue
+        # Reverse so the stack pops subdirectories in scandir order (depth-first, like rglob).
+        pending_dirs.extend(reversed(subdirs))
@@ -0,0 +1,221 @@
+# src/watch.py
+# `llmos-cli watch`: keeps trees and the IR resident and re-extracts only changed files.
+
+import argparse
+import os
+import sys
+import time
+import traceback
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from .config import LANG_MAP, SCHEMA_VERSION, DEFAULT_YAML_OUTPUT_FILENAME
+from .ast_utils import parse_tree
+from .metadata_parser import parse_project_metadata
+from .walker import walk_source_files
+from .source_store import SourceStore
+from . import ast_utils as astu
+from . import cli
+from .extract_rust import attach_rs_impl_methods
+
+def _common_prefix_len(a: bytes, b: bytes) -> int:
+    """Length of the common prefix, by binary search over slice comparisons (memcmp speed)."""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def _common_suffix_len(a: bytes, b: bytes, limit: int) -> int:
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:] == b[len(b) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def _point_at(content: bytes, byte_offset: int) -> Tuple[int, int]:
+    row = content.count(b"\n", 0, byte_offset)
+    line_start = content.rfind(b"\n", 0, byte_offset) + 1
+    return (row, byte_offset - line_start)
+
+def compute_edit(old: bytes, new: bytes) -> Dict[str, Any]:
+    """Describes old -> new as one replaced byte range, in the form `Tree.edit` expects."""
+    start = _common_prefix_len(old, new)
+    suffix = _common_suffix_len(old, new, min(len(old), len(new)) - start)
+    old_end, new_end = len(old) - suffix, len(new) - suffix
+    return {
+        "start_byte": start, "old_end_byte": old_end, "new_end_byte": new_end,
+        "start_point": _point_at(old, start),
+        "old_end_point": _point_at(old, old_end),
+        "new_end_point": _point_at(new, new_end),
+    }
+
+class WatchSession:
+    """Resident state for one watched repository: per-file content, Tree and record."""
+
+    def __init__(self, repo_path: Path, target_name: str):
+        self.repo_path = repo_path
+        self.target_name = target_name
+        self.files: Dict[Path, Dict[str, Any]] = {} # path -> {stat, content, tree, lang, record}
+        self.metadata = parse_project_metadata(repo_path)
+        self.incremental_parses = 0
+        self.full_parses = 0
+
+    def scan(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        for file_path in walk_source_files(self.repo_path):
+            try:
+                st = file_path.stat()
+            except OSError:
+                continue
+            snapshot[file_path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def changed_files(self, snapshot: Dict[Path, Tuple[int, int]]) -> Tuple[List[Path], List[Path]]:
+        changed = [path for path, stat in snapshot.items()
+                   if path not in self.files or self.files[path]["stat"] != stat]
+        removed = [path for path in self.files if path not in snapshot]
+        return changed, removed
+
+    def update_file(self, file_path: Path, stat: Tuple[int, int]):
+        lang = LANG_MAP.get(file_path.suffix.lower())
+        if not lang:
+            return
+        try:
+            with open(file_path, 'rb') as f:
+                content = f.read()
+        except OSError as e:
+            print(f"  Warning: Could not read {file_path}: {e}")
+            return
+        state = self.files.get(file_path)
+        if state is not None and state["content"] == content:
+            state["stat"] = stat # Touched but unchanged
+            return
+        if state is not None and state["tree"] is not None:
+            old_tree = state["tree"]
+            old_tree.edit(**compute_edit(state["content"], content))
+            tree = parse_tree(content, lang, old_tree)
+            self.incremental_parses += 1
+        else:
+            tree = parse_tree(content, lang)
+            self.full_parses += 1
+        if tree is None:
+            print(f"  Warning: Could not parse {file_path}. Skipping AST extraction.")
+            # Remember the stat so the file is not re-flagged on every poll; it is retried once it changes.
+            self.files[file_path] = {"stat": stat, "content": content, "tree": None, "lang": lang, "record": None}
+            return
+        try:
+            record = cli.extract_parsed_file(tree.root_node, content, file_path, self.repo_path, self.target_name, lang)
+        except Exception as e:
+            print(f"ERROR processing file {file_path}: {type(e).__name__} - {e}")
+            if cli.DEBUG_MODE: traceback.print_exc()
+            record = None
+        self.files[file_path] = {"stat": stat, "content": content, "tree": tree, "lang": lang, "record": record}
+
+    def remove_file(self, file_path: Path):
+        self.files.pop(file_path, None)
+
+    def build_ir(self, ordered_paths: List[Path]) -> Dict[str, Any]:
+        cli.repo_ir = {
+            "schema_version": SCHEMA_VERSION,
+            "project_name": self.metadata.get("project_name_from_meta", self.repo_path.name),
+            "language_primary": "python",
+            "languages_present": set(),
+            "metadata": self.metadata,
+            "components": {},
+        }
+        if astu.source_mode == "spans":
+            cli.repo_ir["source_roots"] = {self.target_name: str(self.repo_path)}
+        for file_path in ordered_paths:
+            state = self.files.get(file_path)
+            if state and state["record"]:
+                cli.merge_file_record(state["record"])
+        repo_ir = cli.repo_ir
+        repo_ir["languages_present"] = sorted(repo_ir["languages_present"])
+        repo_ir["language_primary"] = cli.primary_language(repo_ir["languages_present"])
+        repo_ir["components"] = list(repo_ir["components"].values())
+        attach_rs_impl_methods(repo_ir["components"])
+        return repo_ir
+
+def _write_outputs(repo_ir: Dict[str, Any], args: argparse.Namespace):
+    from .output import save_to_yaml, save_to_llm_context_file
+    save_to_yaml(repo_ir, Path(args.output_yaml))
+    if args.llm_file:
+        source_store = SourceStore(repo_ir["source_roots"]) if "source_roots" in repo_ir else None
+        save_to_llm_context_file(repo_ir, Path(args.llm_file), source_store)
+
+def watch_main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="llmos-cli watch",
+        description="Watch a repository and keep the IR and LLM context files up to date. Trees and per-file\n"
+                    "records stay in memory; changed files are re-parsed incrementally with Tree.edit().",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--repo-path", metavar="PATH", required=True, help="Repository root to watch.")
+    parser.add_argument("-o", "--output-yaml", default=DEFAULT_YAML_OUTPUT_FILENAME,
+                        help=f"Output YAML IR file path (default: {DEFAULT_YAML_OUTPUT_FILENAME})")
+    parser.add_argument("--llm-file", type=str, default=None, help="Output path for the LLM context text file.")
+    parser.add_argument("--interval", type=float, default=0.5, help="Seconds between mtime polls (default: 0.5).")
+    parser.add_argument("--debounce", type=float, default=0.3,
+                        help="Wait until no further changes are seen for this many seconds before re-extracting (default: 0.3).")
+    parser.add_argument("--ir-mode", choices=astu.SOURCE_MODES, default="inline", help="See `llmos-cli --help`.")
+    parser.add_argument("--include-pyi", action="store_true", help="Include .pyi stub files.")
+    parser.add_argument("-d", "--debug", action="store_true", help="Enable verbose debug printing.")
+    args = parser.parse_args(argv)
+
+    cli.DEBUG_MODE = args.debug
+    astu.set_source_mode(args.ir_mode) # Grammars load on the first parse of each language
+    if args.include_pyi:
+        LANG_MAP[".pyi"] = "python"
+
+    repo_path = Path(args.repo_path).resolve()
+    if not repo_path.is_dir():
+        print(f"Error: Repository path '{repo_path}' not found or is not a directory.")
+        sys.exit(1)
+    session = WatchSession(repo_path, repo_path.name)
+    # Keep our own outputs out of the change detection if they land inside the repo.
+    ignored_outputs = {Path(args.output_yaml).resolve()} | ({Path(args.llm_file).resolve()} if args.llm_file else set())
+
+    start = time.perf_counter()
+    snapshot = {path: stat for path, stat in session.scan().items() if path not in ignored_outputs}
+    for file_path, stat in snapshot.items():
+        session.update_file(file_path, stat)
+    _write_outputs(session.build_ir(list(snapshot)), args)
+    print(f"Initial extraction of {len(snapshot)} files took {time.perf_counter() - start:.2f}s. "
+          f"Watching {repo_path} (Ctrl+C to stop)...")
+
+    try:
+        while True:
+            time.sleep(args.interval)
+            snapshot = {path: stat for path, stat in session.scan().items() if path not in ignored_outputs}
+            changed, removed = session.changed_files(snapshot)
+            if not changed and not removed:
+                continue
+            # Debounce: keep polling until a full debounce window passes with no new changes.
+            quiet_since = time.perf_counter()
+            while time.perf_counter() - quiet_since < args.debounce:
+                time.sleep(min(args.interval, args.debounce))
+                new_snapshot = {path: stat for path, stat in session.scan().items() if path not in ignored_outputs}
+                if new_snapshot != snapshot:
+                    snapshot = new_snapshot
+                    quiet_since = time.perf_counter()
+            changed, removed = session.changed_files(snapshot)
+
+            batch_start = time.perf_counter()
+            parses_before = session.incremental_parses
+            for file_path in removed:
+                session.remove_file(file_path)
+            for file_path in changed:
+                session.update_file(file_path, snapshot[file_path])
+            _write_outputs(session.build_ir(list(snapshot)), args)
+            print(f"Updated {len(changed)} changed and {len(removed)} removed files "
+                  f"({session.incremental_parses - parses_before} incremental reparses) "
+                  f"in {time.perf_counter() - batch_start:.3f}s.")
+    except KeyboardInterrupt:
+        print("\nWatch stopped.")
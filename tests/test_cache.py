@@ -0,0 +1,40 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.synth_repo import generate_synthetic_repo
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+def _run_cli(repo_root, output_path, *extra_args):
+    profile_path = output_path.with_suffix(".profile.json")
+    subprocess.run([sys.executable, "-m", "src.cli", "--repo-path", str(repo_root), "-o", str(output_path),
+                    "--profile-json", str(profile_path), *extra_args], cwd=PROJECT_ROOT, check=True, capture_output=True)
+    counters = json.loads(profile_path.read_text())["counters"]
+    return output_path.read_bytes(), counters.get("cache_hits", 0), counters.get("cache_misses", 0)
+
+def test_warm_cache_run_matches_cold_and_uncached_runs(tmp_path):
+    repo_root = tmp_path / "repo"
+    generate_synthetic_repo(repo_root, files=12, packages=2)
+    cache_args = ("--cache-dir", str(tmp_path / "cache"))
+    uncached, _, _ = _run_cli(repo_root, tmp_path / "uncached.yaml")
+    cold, cold_hits, cold_misses = _run_cli(repo_root, tmp_path / "cold.yaml", *cache_args)
+    warm, warm_hits, warm_misses = _run_cli(repo_root, tmp_path / "warm.yaml", *cache_args)
+    assert cold == warm == uncached
+    assert (cold_hits, warm_misses) == (0, 0)
+    assert warm_hits == cold_misses > 0
+
+def test_edited_file_misses_the_cache(tmp_path):
+    repo_root = tmp_path / "repo"
+    (repo_root / "pkg").mkdir(parents=True)
+    (repo_root / "pkg" / "a.py").write_text("def a():\n    return 1\n")
+    (repo_root / "pkg" / "b.py").write_text("def b():\n    return 2\n")
+    cache_args = ("--cache-dir", str(tmp_path / "cache"))
+    _run_cli(repo_root, tmp_path / "cold.yaml", *cache_args)
+    (repo_root / "pkg" / "b.py").write_text("def b_renamed():\n    return 2\n")
+    warm, warm_hits, warm_misses = _run_cli(repo_root, tmp_path / "warm.yaml", *cache_args)
+    uncached, _, _ = _run_cli(repo_root, tmp_path / "uncached.yaml")
+    assert (warm_hits, warm_misses) == (1, 1)
+    assert warm == uncached
+    assert b"b_renamed" in warm
@@ -0,0 +1,57 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.extract_python import PY_FILE_ENGINES
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+MODULE_SOURCE = '''
+class Traceback:
+    """Outer class."""
+    def __init__(self, entries):
+        def f(entry):
+            return entry
+        class Frame:
+            def show(self):
+                return 1
+        self.entries = [f(e) for e in entries]
+
+def helper():
+    def inner():
+        return 2
+    return inner()
+'''
+
+TEST_SOURCE = '''
+def test_helper():
+    def check(value):
+        assert value
+    check(1)
+'''
+
+def _write_tree(root: Path):
+    # Identical content at different depths and under different packages
+    for rel_path in ("pkg/_code/code.py", "vendor/lib/pkg/_code/code.py"):
+        (root / rel_path).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel_path).write_text(MODULE_SOURCE)
+    for rel_path in ("tests/test_helper.py", "vendor/lib/tests/test_helper.py"):
+        (root / rel_path).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel_path).write_text(TEST_SOURCE)
+
+def _run(repo_root: Path, output_path: Path, *extra: str) -> str:
+    subprocess.run([sys.executable, "-m", "src.cli", "--repo-path", str(repo_root), "-o", str(output_path), *extra],
+                   cwd=PROJECT_ROOT, check=True, capture_output=True)
+    return output_path.read_text()
+
+@pytest.mark.parametrize("engine", sorted(PY_FILE_ENGINES))
+def test_dedupe_output_matches_plain_extraction(tmp_path, engine):
+    repo_root = tmp_path / "dd"
+    _write_tree(repo_root)
+    plain = _run(repo_root, tmp_path / "plain.yaml", "--py-engine", engine)
+    deduped = _run(repo_root, tmp_path / "dedupe.yaml", "--py-engine", engine, "--dedupe")
+    assert deduped == plain
+    if engine == "cursor":
+        assert "dd.vendor.lib.pkg._code.code.Traceback.__init__.f" in plain
@@ -0,0 +1,32 @@
+from src.cli import find_component_id_for_lib
+from src.import_graph import ModuleResolver, link_component_imports, build_import_graph
+
+def _resolver(component_ids, target_name, package_target):
+    return ModuleResolver(component_ids, [target_name], find_component_id_for_lib,
+                          [target_name] if package_target else [])
+
+def test_stdlib_name_colliding_with_library_module_is_not_an_edge():
+    resolver = _resolver(["_pytest.pathlib", "_pytest.warnings", "_pytest.main"], "_pytest", package_target=True)
+    assert resolver.resolve("pathlib.Path") is None
+    assert resolver.resolve("warnings") is None
+    assert resolver.resolve("_pytest.pathlib.absolutepath") == "_pytest.pathlib"
+
+def test_repo_imports_resolve_relative_to_repo_root():
+    resolver = _resolver(["myrepo.pkg.core", "myrepo.pkg", "myrepo.pkg.pathlib"], "myrepo", package_target=False)
+    assert resolver.resolve("pkg.core.name") == "myrepo.pkg.core"
+    assert resolver.resolve("pkg") == "myrepo.pkg"
+    assert resolver.resolve("pathlib") is None # Only pkg/pathlib.py exists, not pathlib.py at the root
+    assert resolver.resolve("core") is None
+
+def test_relative_imports_and_cycles():
+    components = [
+        {"component_id": "_pytest.main", "import_targets": [("pathlib", False), ("_pytest.nodes", True)]},
+        {"component_id": "_pytest.nodes", "import_targets": [("_pytest.main.Session", False), ("warnings", False)]},
+        {"component_id": "_pytest.pathlib", "import_targets": [("os", False)]},
+    ]
+    resolver = _resolver([c["component_id"] for c in components], "_pytest", package_target=True)
+    assert link_component_imports(components, resolver) == 2
+    graph = build_import_graph(components)
+    assert graph["imports"]["_pytest.main"] == ["_pytest.nodes"]
+    assert graph["imports"]["_pytest.pathlib"] == []
+    assert graph["cycles"] == [["_pytest.main", "_pytest.nodes"]]
@@ -0,0 +1,78 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from src.ir_diff import diff_ir
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+OLD_SOURCE = '''
+class Parser:
+    def parse(self, text):
+        """Parses text."""
+        return text.strip()
+
+    def reset(self):
+        pass
+
+def helper(value):
+    return value
+
+def removed():
+    return None
+'''
+
+NEW_SOURCE = '''
+class Parser:
+    def parse(self, text):
+        """Parses the given text."""
+        return text.strip()
+
+    def reset(self):   
+
+        pass
+
+def helper(value, default=None):
+    return value
+
+def added():
+    return 1
+'''
+
+def _ir(tmp_path, name, source, *extra_args, suffix=".yaml"):
+    repo_root = tmp_path / name / "proj"
+    (repo_root / "pkg").mkdir(parents=True)
+    (repo_root / "pkg" / "core.py").write_text(source)
+    output_path = tmp_path / f"{name}{suffix}"
+    subprocess.run([sys.executable, "-m", "src.cli", "--repo-path", str(repo_root), "-o", str(output_path), *extra_args],
+                   cwd=PROJECT_ROOT, check=True, capture_output=True)
+    return output_path
+
+def _changes(old_path, new_path):
+    return {(change["change"], change["qualified_name"], tuple(change.get("aspects", ())))
+            for change in diff_ir(old_path, new_path)}
+
+def test_diff_reports_added_removed_and_changed_symbols(tmp_path):
+    changes = _changes(_ir(tmp_path, "old", OLD_SOURCE), _ir(tmp_path, "new", NEW_SOURCE))
+    # Blank lines and trailing whitespace in reset() are not source changes, nor is helper() moving down a line
+    assert changes == {
+        ("changed", "proj.pkg.core.Parser", ("source",)),
+        ("changed", "proj.pkg.core.Parser.parse", ("docstring", "source")),
+        ("changed", "proj.pkg.core.helper", ("signature", "source")),
+        ("added", "proj.pkg.core.added", ()),
+        ("removed", "proj.pkg.core.removed", ()),
+    }
+
+def test_identical_irs_have_no_changes_across_formats(tmp_path):
+    yaml_path = _ir(tmp_path, "yaml", OLD_SOURCE)
+    jsonl_path = _ir(tmp_path, "jsonl", OLD_SOURCE, "--format", "jsonl", "--jsonl-granularity", "symbol", suffix=".jsonl")
+    assert _changes(yaml_path, jsonl_path) == set()
+
+def test_diff_subcommand_writes_json_lines(tmp_path):
+    old_path, new_path = _ir(tmp_path, "old", OLD_SOURCE), _ir(tmp_path, "new", NEW_SOURCE)
+    result = subprocess.run([sys.executable, "-m", "src.cli", "diff", str(old_path), str(new_path), "--json"],
+                            cwd=PROJECT_ROOT, check=True, capture_output=True, text=True)
+    changes = [json.loads(line) for line in result.stdout.splitlines()]
+    assert sorted(change["change"] for change in changes) == ["added", "changed", "changed", "changed", "removed"]
+    assert result.stderr.strip().endswith("1 added, 1 removed, 3 changed")
@@ -0,0 +1,77 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.ir_query import IRQueryIndex
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+SOURCE = '''
+from typing import Dict, List
+
+class Base:
+    pass
+
+class Parser(Base):
+    def parse(self, text: str) -> List[str]:
+        return text.split()
+
+class Loader(models.Base):
+    def load(self, paths: Dict[str, Parser]):
+        return paths
+
+def parse(text: str):
+    return Parser().parse(text)
+'''
+
+@pytest.fixture(params=[(), ("--ir-index",)], ids=["in_memory", "indexed"])
+def index(tmp_path, request):
+    repo_root = tmp_path / "proj"
+    (repo_root / "pkg").mkdir(parents=True)
+    (repo_root / "pkg" / "core.py").write_text(SOURCE)
+    output_path = tmp_path / "ir.yaml"
+    subprocess.run([sys.executable, "-m", "src.cli", "--repo-path", str(repo_root), "-o", str(output_path), *request.param],
+                   cwd=PROJECT_ROOT, check=True, capture_output=True)
+    index = IRQueryIndex(output_path)
+    yield index
+    index.close()
+
+def _names(results):
+    return sorted(entry["qualified_name"] for entry in results)
+
+def test_fqn_query(index):
+    assert _names(index.query("fqn", "proj.pkg.core.Parser.parse")) == ["proj.pkg.core.Parser.parse"]
+    assert index.query("fqn", "proj.pkg.core.Missing") == []
+
+def test_prefix_query(index):
+    assert _names(index.query("prefix", "proj.pkg.core.Parser")) == ["proj.pkg.core.Parser", "proj.pkg.core.Parser.parse"]
+    assert _names(index.query("prefix", "proj.pkg.core.Lo")) == ["proj.pkg.core.Loader", "proj.pkg.core.Loader.load"]
+    assert index.query("prefix", "proj.other") == []
+    assert len(index.query("prefix", "proj.pkg", limit=2)) == 2
+
+def test_name_query(index):
+    assert _names(index.query("name", "parse")) == ["proj.pkg.core.Parser.parse", "proj.pkg.core.parse"]
+
+def test_component_query_lists_functions_and_methods(index):
+    assert _names(index.query("component", "proj.pkg.core")) == [
+        "proj.pkg.core.Loader.load", "proj.pkg.core.Parser.parse", "proj.pkg.core.parse"]
+
+def test_base_query_matches_full_and_last_dotted_name(index):
+    assert _names(index.query("base", "Base")) == ["proj.pkg.core.Loader", "proj.pkg.core.Parser"]
+    assert _names(index.query("base", "models.Base")) == ["proj.pkg.core.Loader"]
+
+def test_param_type_query_matches_names_inside_annotations(index):
+    assert _names(index.query("param-type", "str")) == [
+        "proj.pkg.core.Loader.load", "proj.pkg.core.Parser.parse", "proj.pkg.core.parse"]
+    assert _names(index.query("param-type", "Parser")) == ["proj.pkg.core.Loader.load"]
+    assert _names(index.query("param-type", "Dict[str, Parser]")) == ["proj.pkg.core.Loader.load"]
+
+def test_get_record_returns_the_full_symbol(index):
+    record = index.get_record("proj.pkg.core.parse")
+    assert record["source_code"].startswith("def parse(text: str):")
+
+def test_unknown_kind_is_rejected(index):
+    with pytest.raises(ValueError):
+        index.query("docstring", "x")
@@ -0,0 +1,58 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+from benchmarks.synth_repo import generate_synthetic_repo
+from src.config import JSONL_GRANULARITIES
+from src.ir_reader import load_ir, iter_symbols, IndexedIRReader
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+def _run_cli(repo_root, output_path, *extra_args):
+    subprocess.run([sys.executable, "-m", "src.cli", "--repo-path", str(repo_root), "-o", str(output_path), *extra_args],
+                   cwd=PROJECT_ROOT, check=True, capture_output=True)
+    return output_path
+
+@pytest.fixture
+def repo_root(tmp_path):
+    generate_synthetic_repo(tmp_path / "repo", files=8, packages=2)
+    return tmp_path / "repo"
+
+@pytest.mark.parametrize("granularity", JSONL_GRANULARITIES)
+def test_jsonl_ir_loads_equal_to_yaml_ir(tmp_path, repo_root, granularity):
+    yaml_ir = yaml.safe_load(_run_cli(repo_root, tmp_path / "ir.yaml").read_text())
+    jsonl_path = _run_cli(repo_root, tmp_path / "ir.jsonl", "--format", "jsonl", "--jsonl-granularity", granularity)
+    assert yaml_ir["components"]
+    assert load_ir(jsonl_path) == yaml_ir
+
+INDEXED_FORMATS = (("ir.yaml", ()), ("ir.jsonl", ("--format", "jsonl", "--jsonl-granularity", "component")),
+                   ("ir.jsonl", ("--format", "jsonl", "--jsonl-granularity", "symbol")))
+
+@pytest.mark.parametrize("streamed", (False, True))
+@pytest.mark.parametrize("filename, format_args", INDEXED_FORMATS)
+def test_indexed_reader_returns_the_ir_records(tmp_path, repo_root, filename, format_args, streamed):
+    extra_args = format_args + ("--ir-index",) + (("--stream-yaml",) if streamed else ())
+    ir_path = _run_cli(repo_root, tmp_path / filename, *extra_args)
+    ir = load_ir(ir_path)
+    with IndexedIRReader(ir_path) as reader:
+        for component in ir["components"]:
+            component_record = reader.get_component(component["component_id"])
+            assert component_record["component_id"] == component["component_id"]
+            for _, symbol in iter_symbols(component):
+                assert symbol["qualified_name"] in reader
+                record = reader.get_symbol(symbol["qualified_name"])
+                # Per-symbol JSONL records name their component
+                assert record.pop("component_id", component["component_id"]) == component["component_id"]
+                assert record == symbol
+        assert reader.get_symbol("no.such.symbol") is None
+        assert reader.get_component("no.such.component") is None
+
+def test_stale_index_is_rejected(tmp_path, repo_root):
+    ir_path = _run_cli(repo_root, tmp_path / "ir.jsonl", "--format", "jsonl", "--ir-index")
+    with open(ir_path, "a", encoding="utf-8") as f:
+        f.write("\n")
+    with pytest.raises(ValueError, match="regenerate"):
+        IndexedIRReader(ir_path)
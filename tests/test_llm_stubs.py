@@ -0,0 +1,40 @@
+from src.output import _render_llm_symbols
+
+def _rs_method(name, params, return_type="unknown", impl_trait=None, **flags):
+    method = {"name": name, "language": "rust", "signature": {"params": params, "return_type": return_type, **flags}}
+    if impl_trait:
+        method["impl_trait"] = impl_trait
+    return method
+
+RUST_COMPONENT = {
+    "component_id": "crate.shapes", "component_type": "rust_module",
+    "data_structures": [
+        {"name": "Shape", "qualified_name": "shapes::Shape", "kind": "enum", "language": "rust", "fields": [],
+         "variants": [{"name": "Unit", "fields": []}, {"name": "Circle", "fields": [{"name": "0", "type": "f64"}]}],
+         "methods": [_rs_method("area", [{"name": "self", "type": "&self"}], "f64", **{"async": True, "unsafe": True}),
+                     _rs_method("fmt", [{"name": "self", "type": "&self"}, {"name": "f", "type": "&mut Formatter"}],
+                                "fmt::Result", impl_trait="fmt::Display")]},
+        {"name": "Point", "qualified_name": "shapes::Point", "kind": "struct", "language": "rust",
+         "fields": [{"name": "x", "type": "i32"}], "variants": [], "methods": []},
+    ],
+    "functions": [_rs_method("origin", [], "Point")],
+}
+
+def test_rust_signatures_render_rust_stubs():
+    text = "".join(rendered for _, rendered in _render_llm_symbols(RUST_COMPONENT, None, "signatures"))
+    assert text == (
+        "\nenum Shape {\n    Unit,\n    Circle(f64),\n}\n"
+        "impl Shape {\n    async unsafe fn area(&self) -> f64;\n}\n"
+        "impl fmt::Display for Shape {\n    fn fmt(&self, f: &mut Formatter) -> fmt::Result;\n}\n"
+        "\nstruct Point {\n    x: i32,\n}\n"
+        "\nfn origin() -> Point;\n"
+    )
+
+def test_python_signatures_still_render_python_stubs():
+    component = {"component_id": "pkg.mod", "component_type": "python_module", "functions": [],
+                 "data_structures": [{"name": "Parser", "qualified_name": "pkg.mod.Parser", "language": "python",
+                                      "base_classes": ["Base"], "fields": [], "methods": [
+                                          {"name": "parse", "language": "python",
+                                           "signature": {"params": [{"name": "self"}], "return_type": "str"}}]}]}
+    text = "".join(rendered for _, rendered in _render_llm_symbols(component, None, "signatures"))
+    assert text == "\nclass Parser(Base):\n    def parse(self) -> str: ...\n"
@@ -0,0 +1,24 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.synth_repo import generate_synthetic_repo
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+def _run_cli(repo_root, output_path, *extra_args):
+    subprocess.run([sys.executable, "-m", "src.cli", "--repo-path", str(repo_root), "-o", str(output_path), *extra_args],
+                   cwd=PROJECT_ROOT, check=True, capture_output=True)
+    return output_path.read_bytes()
+
+def test_parallel_output_matches_serial(tmp_path):
+    repo_root = tmp_path / "repo"
+    generate_synthetic_repo(repo_root, files=24, packages=3)
+    serial = _run_cli(repo_root, tmp_path / "serial.yaml")
+    assert _run_cli(repo_root, tmp_path / "parallel.yaml", "-j", "3") == serial
+
+def test_parallel_output_matches_serial_when_streaming(tmp_path):
+    repo_root = tmp_path / "repo"
+    generate_synthetic_repo(repo_root, files=24, packages=3)
+    serial = _run_cli(repo_root, tmp_path / "serial.yaml", "--stream-yaml")
+    assert _run_cli(repo_root, tmp_path / "parallel.yaml", "--stream-yaml", "-j", "3") == serial
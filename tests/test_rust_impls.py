@@ -0,0 +1,30 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+LIB_SOURCE = '''
+pub struct Point { x: i32 }
+impl Point { pub fn outer_m(&self) -> i32 { self.x } }
+mod inner {
+    pub struct Point { y: i32 }
+    impl Point { pub fn inner_m(&self) -> i32 { self.y } }
+    impl super::Point { pub fn via_super(&self) {} }
+}
+'''
+
+def test_impl_in_inline_module_attaches_to_that_modules_type(tmp_path):
+    crate_dir = tmp_path / "ws" / "package_a"
+    (crate_dir / "src").mkdir(parents=True)
+    (crate_dir / "Cargo.toml").write_text('[package]\nname = "package_a"\n')
+    (crate_dir / "src" / "lib.rs").write_text(LIB_SOURCE)
+    output_path = tmp_path / "ir.yaml"
+    subprocess.run([sys.executable, "-m", "src.cli", "--repo-path", str(tmp_path / "ws"), "-o", str(output_path)],
+                   cwd=PROJECT_ROOT, check=True, capture_output=True)
+    ir = yaml.safe_load(output_path.read_text())
+    methods = {struct["qualified_name"]: [method["name"] for method in struct["methods"]]
+               for component in ir["components"] for struct in component["data_structures"]}
+    assert methods == {"package_a::Point": ["outer_m", "via_super"], "package_a::inner::Point": ["inner_m"]}
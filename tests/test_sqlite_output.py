@@ -0,0 +1,77 @@
+import json
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import yaml
+
+from benchmarks.synth_repo import generate_synthetic_repo
+from src.output import save_to_sqlite
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+COMPONENT = {
+    "component_id": "pkg.mod", "component_type": "python_module", "source_path": "pkg/mod", "summary": "",
+    "data_structures": [{"name": "Parser", "qualified_name": "pkg.mod.Parser", "kind": "class",
+                         "dependencies": [], "used_by": ["pkg.mod.run"], "test_specs_covering": [],
+                         "methods": [{"name": "parse", "qualified_name": "pkg.mod.Parser.parse", "signature": {},
+                                      "dependencies": [], "used_by": ["pkg.mod.run"], "test_specs_covering": []}]}],
+    "functions": [{"name": "run", "qualified_name": "pkg.mod.run", "signature": {"params": []},
+                   "dependencies": ["pkg.mod.Parser", "pkg.mod.Parser.parse"], "used_by": [], "test_specs_covering": []}],
+    "test_specifications": [],
+}
+
+def _save(tmp_path, components):
+    db_path = tmp_path / "ir.db"
+    save_to_sqlite({"schema_version": "test", "components": components}, db_path)
+    return sqlite3.connect(str(db_path))
+
+def test_used_by_is_persisted(tmp_path):
+    conn = _save(tmp_path, [COMPONENT])
+    rows = dict(conn.execute("SELECT qualified_name, used_by FROM functions"))
+    assert json.loads(rows["pkg.mod.Parser.parse"]) == ["pkg.mod.run"]
+    assert json.loads(rows["pkg.mod.run"]) == []
+    (struct_used_by,) = conn.execute("SELECT used_by FROM data_structures").fetchone()
+    assert json.loads(struct_used_by) == ["pkg.mod.run"]
+
+def test_test_details_and_component_imports_are_persisted(tmp_path):
+    test_component = {
+        "component_id": "tests.test_mod", "component_type": "python_module", "imports": ["pkg.mod"],
+        "data_structures": [], "functions": [],
+        "test_specifications": [{"id": "tests.test_mod.test_parse", "scenario": "test_parse",
+                                 "qualified_name": "tests.test_mod.test_parse",
+                                 "setup": ["parser = Parser()"], "action": {"calls": ["parser.parse"]},
+                                 "assertions": ["assert parser.parse() == 1"]}],
+    }
+    conn = _save(tmp_path, [dict(COMPONENT, imports=[]), test_component])
+    imports = {component_id: json.loads(value) for component_id, value in conn.execute("SELECT component_id, imports FROM components")}
+    assert imports == {"pkg.mod": [], "tests.test_mod": ["pkg.mod"]}
+    setup, action, assertions = conn.execute("SELECT setup, action, assertions FROM tests").fetchone()
+    assert json.loads(setup) == ["parser = Parser()"]
+    assert json.loads(action) == {"calls": ["parser.parse"]}
+    assert json.loads(assertions) == ["assert parser.parse() == 1"]
+
+def _cli_sqlite(tmp_path, repo_root, name, *extra_args):
+    output_path, db_path = tmp_path / f"{name}.yaml", tmp_path / f"{name}.db"
+    subprocess.run([sys.executable, "-m", "src.cli", "--repo-path", str(repo_root), "-o", str(output_path),
+                    "--output-sqlite", str(db_path), *extra_args], cwd=PROJECT_ROOT, check=True, capture_output=True)
+    return yaml.safe_load(output_path.read_text()), sqlite3.connect(str(db_path))
+
+def _table(conn, table):
+    return sorted(conn.execute(f"SELECT * FROM {table}"), key=repr)
+
+def test_cli_sqlite_store_matches_yaml_ir_in_both_write_modes(tmp_path):
+    repo_root = tmp_path / "repo"
+    generate_synthetic_repo(repo_root, files=8, packages=2)
+    ir, conn = _cli_sqlite(tmp_path, repo_root, "in_memory")
+    _, streamed_conn = _cli_sqlite(tmp_path, repo_root, "streamed", "--stream-yaml")
+    yaml_functions = sorted(func["qualified_name"] for component in ir["components"] for func in component["functions"])
+    yaml_methods = sorted(method["qualified_name"] for component in ir["components"]
+                          for struct in component["data_structures"] for method in struct["methods"])
+    rows = conn.execute("SELECT qualified_name, parent_qualified_name FROM functions").fetchall()
+    assert sorted(name for name, parent in rows if parent is None) == yaml_functions
+    assert sorted(name for name, parent in rows if parent is not None) == yaml_methods
+    assert json.loads(dict(conn.execute("SELECT key, value FROM meta"))["languages_present"]) == ir["languages_present"]
+    for table in ("meta", "components", "data_structures", "functions", "params", "tests"):
+        assert _table(streamed_conn, table) == _table(conn, table), table
@@ -0,0 +1,40 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+from benchmarks.synth_repo import generate_synthetic_repo
+from src.config import YAML_EMITTERS
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+def _run_cli(repo_root, output_path, *extra_args):
+    subprocess.run([sys.executable, "-m", "src.cli", "--repo-path", str(repo_root), "-o", str(output_path), *extra_args],
+                   cwd=PROJECT_ROOT, check=True, capture_output=True)
+    return yaml.safe_load(output_path.read_text())
+
+def _rust_crate(tmp_path):
+    crate_dir = tmp_path / "ws" / "shapes"
+    (crate_dir / "src").mkdir(parents=True)
+    (crate_dir / "Cargo.toml").write_text('[package]\nname = "shapes"\n')
+    (crate_dir / "src" / "lib.rs").write_text("pub struct Point { x: i32 }\npub fn origin() -> Point { Point { x: 0 } }\n")
+    return tmp_path / "ws"
+
+def test_streamed_language_primary_matches_non_streamed(tmp_path):
+    repo_root = _rust_crate(tmp_path)
+    streamed = _run_cli(repo_root, tmp_path / "streamed.yaml", "--stream-yaml")
+    in_memory = _run_cli(repo_root, tmp_path / "in_memory.yaml")
+    assert in_memory["language_primary"] == "rust"
+    assert streamed["language_primary"] == "rust"
+    assert streamed["languages_present"] == in_memory["languages_present"] == ["rust"]
+
+@pytest.mark.parametrize("emitter", YAML_EMITTERS)
+def test_streamed_ir_loads_equal_to_in_memory_ir(tmp_path, emitter):
+    repo_root = tmp_path / "repo"
+    generate_synthetic_repo(repo_root, files=8, packages=2)
+    streamed = _run_cli(repo_root, tmp_path / "streamed.yaml", "--stream-yaml", "--yaml-emitter", emitter)
+    in_memory = _run_cli(repo_root, tmp_path / "in_memory.yaml", "--yaml-emitter", emitter)
+    assert streamed["components"]
+    assert streamed == in_memory
@@ -0,0 +1,56 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+FILES = {
+    "mylib/__init__.py": "from .core import Parser\n",
+    "mylib/json.py": "def loads(text):\n    return text\n",
+    "mylib/core.py": (
+        "import json\n"
+        "from .json import loads as local_loads\n\n"
+        "class Parser:\n"
+        "    def parse(self, text):\n"
+        "        return json.loads(text)\n\n"
+        "    def parse_local(self, text):\n"
+        "        return local_loads(text)\n"
+    ),
+    "tests/test_core.py": (
+        "from mylib import Parser\n\n"
+        "def test_parse():\n"
+        "    parser = Parser()\n"
+        "    assert parser.parse('1') == 1\n"
+    ),
+}
+
+def _symbols(tmp_path):
+    repo_root = tmp_path / "proj"
+    for rel_path, text in FILES.items():
+        (repo_root / rel_path).parent.mkdir(parents=True, exist_ok=True)
+        (repo_root / rel_path).write_text(text)
+    output_path = tmp_path / "ir.yaml"
+    subprocess.run([sys.executable, "-m", "src.cli", "--repo-path", str(repo_root), "-o", str(output_path),
+                    "--resolve-deps", "--link-tests"], cwd=PROJECT_ROOT, check=True, capture_output=True)
+    ir = yaml.safe_load(output_path.read_text())
+    symbols = {}
+    for component in ir["components"]:
+        for struct in component["data_structures"]:
+            symbols[struct["qualified_name"]] = struct
+            symbols.update((method["qualified_name"], method) for method in struct["methods"])
+        symbols.update((func["qualified_name"], func) for func in component["functions"])
+    return symbols
+
+def test_stdlib_import_does_not_resolve_to_same_named_local_module(tmp_path):
+    symbols = _symbols(tmp_path)
+    assert symbols["proj.mylib.core.Parser.parse"]["dependencies"] == []
+    assert symbols["proj.mylib.core.Parser.parse_local"]["dependencies"] == ["proj.mylib.json.loads"]
+    assert symbols["proj.mylib.json.loads"]["used_by"] == ["proj.mylib.core.Parser.parse_local"]
+
+def test_repo_imports_and_reexports_link_tests(tmp_path):
+    symbols = _symbols(tmp_path)
+    # `from mylib import Parser` resolves from the repo root and follows the package's re-export
+    assert symbols["proj.mylib.core.Parser"]["test_specs_covering"] == ["tests.test_core.test_parse"]
+    assert symbols["proj.mylib.core.Parser.parse"]["test_specs_covering"] == ["tests.test_core.test_parse"]
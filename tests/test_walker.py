@@ -0,0 +1,42 @@
+import os
+
+from src.walker import walk_source_files, new_walk_stats, is_ignored_path
+
+TREE = (
+    "top.py", "README.md", "setup.py",
+    "pkg/__init__.py", "pkg/a.py", "pkg/lib.rs", "pkg/data.json",
+    "pkg/sub/b.py", "pkg/sub/deeper/c.py",
+    "pkg/__pycache__/a.cpython-311.py",
+    ".git/hooks/pre_commit.py", "node_modules/dep/index.py", "venv/lib/site.py",
+    "other/d.py",
+)
+
+def _make_tree(root):
+    for rel_path in TREE:
+        (root / rel_path).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel_path).write_text("")
+
+def test_ignored_dirs_are_pruned_and_files_filtered(tmp_path):
+    _make_tree(tmp_path)
+    stats = new_walk_stats()
+    found = {path.relative_to(tmp_path).as_posix() for path in walk_source_files(tmp_path, stats)}
+    assert found == {"top.py", "pkg/__init__.py", "pkg/a.py", "pkg/lib.rs", "pkg/sub/b.py", "pkg/sub/deeper/c.py", "other/d.py"}
+    assert stats["dirs_pruned"] == 4 # .git, node_modules, venv, pkg/__pycache__
+    assert stats["files_ignored"] == 1 # setup.py
+    assert stats["files_unsupported"] == 2 # README.md, pkg/data.json
+    assert stats["files_yielded"] == len(found)
+
+def test_walk_order_matches_rglob(tmp_path):
+    _make_tree(tmp_path)
+    expected = [path for path in tmp_path.rglob("*")
+                if path.is_file() and path.suffix in (".py", ".rs")
+                and not is_ignored_path(path.relative_to(tmp_path))]
+    walked = list(walk_source_files(tmp_path))
+    assert walked == expected
+    assert walked == list(walk_source_files(tmp_path))
+
+def test_symlinked_dirs_are_not_followed(tmp_path):
+    _make_tree(tmp_path)
+    os.symlink(tmp_path / "pkg", tmp_path / "pkg_link", target_is_directory=True)
+    found = {path.relative_to(tmp_path).as_posix() for path in walk_source_files(tmp_path)}
+    assert not any(rel_path.startswith("pkg_link/") for rel_path in found)
@@ -0,0 +1,24 @@
+from src import watch
+from src.watch import WatchSession
+
+def test_unparseable_file_is_not_reflagged_every_poll(tmp_path, monkeypatch):
+    (tmp_path / "mod.py").write_text("def f():\n    return 1\n")
+    monkeypatch.setattr(watch, "parse_tree", lambda content, lang, old_tree=None: None)
+    session = WatchSession(tmp_path, tmp_path.name)
+    snapshot = session.scan()
+    changed, _ = session.changed_files(snapshot)
+    assert len(changed) == 1
+    for file_path in changed:
+        session.update_file(file_path, snapshot[file_path])
+    assert session.changed_files(session.scan()) == ([], [])
+    assert session.build_ir(list(snapshot))["components"] == []
+
+def test_build_ir_sets_language_primary_from_parsed_files(tmp_path):
+    (tmp_path / "lib.rs").write_text("pub fn origin() -> i32 { 0 }\n")
+    session = WatchSession(tmp_path, tmp_path.name)
+    snapshot = session.scan()
+    for file_path in snapshot:
+        session.update_file(file_path, snapshot[file_path])
+    repo_ir = session.build_ir(list(snapshot))
+    assert repo_ir["languages_present"] == ["rust"]
+    assert repo_ir["language_primary"] == "rust"